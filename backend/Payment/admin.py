@@ -1,8 +1,21 @@
 from django.contrib import admin
-from .models import Payment
+from .models import Payment, ReconcileCheckpoint, SalesBucket
 
 @admin.register(Payment)
 class PaymentAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'event', 'amount', 'chapa_tx_ref', 'chapa_status', 'created_at')
     search_fields = ('user__username', 'event__title', 'chapa_tx_ref')
     list_filter = ('chapa_status', 'created_at')
+
+
+@admin.register(ReconcileCheckpoint)
+class ReconcileCheckpointAdmin(admin.ModelAdmin):
+    list_display = ('name', 'cursor_created_at', 'cursor_id', 'updated_at')
+    readonly_fields = ('metrics',)
+
+
+@admin.register(SalesBucket)
+class SalesBucketAdmin(admin.ModelAdmin):
+    list_display = ('event', 'granularity', 'start', 'tickets_sold', 'gross_revenue', 'failed_payments')
+    list_filter = ('granularity',)
+    raw_id_fields = ('event',)
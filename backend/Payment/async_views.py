@@ -0,0 +1,125 @@
+"""
+Async versions of the Chapa views, routed instead of the DRF ones when the
+app is served over ASGI (ASGI_MODE). The Chapa round-trip is awaited on the
+event loop's pooled httpx client rather than blocking a worker, so one
+worker keeps many checkouts in flight while Chapa is slow. Reads use async
+querysets; the short locking transactions run via sync_to_async, as Django
+has no async transactions. The callback only queues the notification in the
+callback inbox (Payment.inbox). Responses match the sync views.
+"""
+import json
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import AuthenticationFailed
+
+from events.models import Event
+from tickets.inventory import SoldOut
+from tickets.models import Ticket
+from users.authentication import aauthenticate
+from .chapa import ChapaError, get_async_client
+from .inbox import areceive, notification
+from .models import Payment
+from .services import PAID, averify_payment, fail_payment, start_checkout
+from .views import callback_result, checkout_data, verification_result
+
+
+def json_response(data, status=200):
+    return JsonResponse(data, status=status, encoder=DjangoJSONEncoder)
+
+
+def request_data(request):
+    if request.content_type == 'application/json':
+        try:
+            return json.loads(request.body or b'{}')
+        except ValueError:
+            return {}
+    return request.POST
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncChapaInitializePaymentView(View):
+    http_method_names = ['post']
+
+    async def post(self, request):
+        try:
+            user = await aauthenticate(request)
+        except AuthenticationFailed as exc:
+            return json_response({'detail': str(exc.detail)}, status=401)
+        if user is None:
+            return json_response({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+        try:
+            event = await Event.objects.aget(id=request_data(request).get('event_id'))
+        except (Event.DoesNotExist, ValueError, TypeError):
+            return json_response({'error': 'Event not found'}, status=404)
+
+        # Prevent multiple tickets per user per event
+        if await Ticket.objects.filter(attendee=user, event=event).aexists():
+            return json_response({'error': 'You have already purchased a ticket for this event.'}, status=400)
+
+        tx_ref = str(uuid.uuid4())
+        try:
+            payment = await sync_to_async(start_checkout)(user, event, tx_ref)
+        except SoldOut:
+            return json_response({'error': 'This event is sold out.'}, status=409)
+
+        try:
+            resp_json = await get_async_client().initialize(checkout_data(request, user, event, tx_ref))
+        except ChapaError:
+            resp_json = {'message': 'Payment gateway unavailable, please try again.'}
+
+        if resp_json.get('status') == 'success':
+            return json_response({'payment_url': resp_json['data']['checkout_url'], 'tx_ref': tx_ref})
+        await sync_to_async(fail_payment)(payment)
+        return json_response({'error': resp_json.get('message', 'Chapa error')}, status=400)
+
+
+async def verified_payment(tx_ref):
+    """(payment, None) or (None, error response)."""
+    if not tx_ref:
+        return None, json_response({'error': 'tx_ref required'}, status=400)
+    try:
+        return await averify_payment(tx_ref), None
+    except Payment.DoesNotExist:
+        return None, json_response({'error': 'Payment not found'}, status=404)
+    except ChapaError:
+        return None, json_response({'error': 'Payment gateway unavailable'}, status=502)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncChapaCallbackView(View):
+    http_method_names = ['get', 'post']
+
+    async def post(self, request):
+        # Chapa sends the reference back as trx_ref
+        data = request_data(request)
+        tx_ref = (
+            data.get('tx_ref') or data.get('trx_ref')
+            or request.GET.get('tx_ref') or request.GET.get('trx_ref')
+        )
+        if not tx_ref:
+            return json_response({'error': 'tx_ref required'}, status=400)
+        payment_status = await areceive(tx_ref, notification(request.GET, data))
+        if payment_status is None:
+            return json_response({'error': 'Payment not found'}, status=404)
+        return json_response(*callback_result(payment_status))
+
+    async def get(self, request):
+        return await self.post(request)
+
+
+class AsyncChapaVerifyPaymentView(View):
+    http_method_names = ['get']
+
+    async def get(self, request):
+        payment, error = await verified_payment(request.GET.get('tx_ref'))
+        if error:
+            return error
+        tickets = await Ticket.objects.filter(payment=payment).acount() if payment.chapa_status == PAID else 0
+        return json_response(*verification_result(payment, tickets))
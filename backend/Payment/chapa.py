@@ -0,0 +1,156 @@
+"""
+Client for the Chapa payment gateway.
+
+One pooled keep-alive session is shared per process, so each call reuses an
+open TLS connection instead of doing a fresh handshake. Calls have strict
+connect/read timeouts, so a slow Chapa cannot pin a worker indefinitely.
+Transient failures are retried with exponential backoff. Initialize
+(a POST) is only retried when the connection could not be made, so a
+request that may have reached Chapa is never replayed.
+
+AsyncChapaClient is the same client for async views, built on httpx.
+"""
+import asyncio
+import threading
+import weakref
+
+import httpx
+import requests
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from core.perf import timed
+
+RETRY_STATUSES = (429, 502, 503, 504)
+
+
+class ChapaError(Exception):
+    """Chapa could not be reached or answered with something other than JSON."""
+
+
+class ChapaClient:
+    def __init__(self, base_url=None, secret_key=None):
+        self.base_url = (base_url or settings.CHAPA_BASE_URL).rstrip('/')
+        self.timeout = (settings.CHAPA_CONNECT_TIMEOUT, settings.CHAPA_READ_TIMEOUT)
+        self.session = requests.Session()
+        self.session.headers['Authorization'] = f"Bearer {secret_key or settings.CHAPA_SECRET_KEY}"
+        retry = Retry(
+            total=settings.CHAPA_MAX_RETRIES,
+            backoff_factor=settings.CHAPA_RETRY_BACKOFF,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({'GET'}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=settings.CHAPA_POOL_SIZE, max_retries=retry
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _request(self, method, path, **kwargs):
+        try:
+            with timed('http'):
+                response = self.session.request(
+                    method, f"{self.base_url}{path}", timeout=self.timeout, **kwargs
+                )
+            if method == 'GET' and response.status_code >= 500:
+                # An outage says nothing about the transaction; don't let it read as a failure
+                raise ChapaError(f"Chapa answered {response.status_code}")
+            return response.json()
+        except (requests.RequestException, ValueError) as exc:
+            raise ChapaError(str(exc)) from exc
+
+    def initialize(self, data):
+        return self._request('POST', '/transaction/initialize', json=data)
+
+    def verify(self, tx_ref):
+        return self._request('GET', f'/transaction/verify/{tx_ref}')
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncChapaClient:
+    """
+    asyncio counterpart of ChapaClient. Create one per event loop; the
+    underlying connection pool is bound to the loop.
+    """
+
+    def __init__(self, base_url=None, secret_key=None):
+        self.client = httpx.AsyncClient(
+            base_url=(base_url or settings.CHAPA_BASE_URL).rstrip('/'),
+            headers={'Authorization': f"Bearer {secret_key or settings.CHAPA_SECRET_KEY}"},
+            timeout=httpx.Timeout(settings.CHAPA_READ_TIMEOUT, connect=settings.CHAPA_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=settings.CHAPA_POOL_SIZE,
+                max_keepalive_connections=settings.CHAPA_POOL_SIZE,
+            ),
+        )
+
+    async def _request(self, method, path, **kwargs):
+        retries = settings.CHAPA_MAX_RETRIES
+        for attempt in range(retries + 1):
+            try:
+                with timed('http'):
+                    response = await self.client.request(method, path, **kwargs)
+                retry = method == 'GET' and response.status_code in RETRY_STATUSES and attempt < retries
+                if not retry:
+                    if method == 'GET' and response.status_code >= 500:
+                        raise ChapaError(f"Chapa answered {response.status_code}")
+                    return response.json()
+            except httpx.ConnectError as exc:
+                if attempt == retries:
+                    raise ChapaError(str(exc)) from exc
+            except httpx.HTTPError as exc:
+                if method != 'GET' or attempt == retries:
+                    raise ChapaError(str(exc)) from exc
+            except ValueError as exc:
+                raise ChapaError(str(exc)) from exc
+            await asyncio.sleep(settings.CHAPA_RETRY_BACKOFF * (2 ** attempt))
+
+    async def initialize(self, data):
+        return await self._request('POST', '/transaction/initialize', json=data)
+
+    async def verify(self, tx_ref):
+        return await self._request('GET', f'/transaction/verify/{tx_ref}')
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+_client = None
+_client_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_client():
+    """The process-wide ChapaClient."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = ChapaClient()
+    return _client
+
+
+def get_async_client():
+    """The AsyncChapaClient for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = AsyncChapaClient()
+    return client
+
+
+@receiver(setting_changed)
+def reset_client(setting, **kwargs):
+    global _client
+    if setting.startswith('CHAPA_'):
+        if _client is not None:
+            _client.close()
+            _client = None
+        # Async clients are bound to their loop; let them be rebuilt lazily
+        _async_clients.clear()
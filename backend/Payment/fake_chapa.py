@@ -0,0 +1,106 @@
+"""
+A local stand-in for the Chapa API, for tests and benchmarks.
+
+Runs a keep-alive HTTP server on a background thread that implements
+`POST /transaction/initialize` and `GET /transaction/verify/<tx_ref>`, with
+configurable latency, per-transaction outcomes and injected 503s:
+
+    with FakeChapaServer(latency=0.2) as chapa:
+        with override_settings(CHAPA_BASE_URL=chapa.url):
+            ...
+        chapa.requests  # number of calls served
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeChapaHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Send each response in one segment; split writes on a keep-alive
+    # connection stall on delayed ACKs and would skew benchmarks
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        chapa = self.server.chapa
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        if not chapa.served(self.path):
+            self.send_json(503, {'status': 'failed', 'message': 'Service unavailable'})
+        elif self.path.rstrip('/').endswith('/transaction/initialize'):
+            tx_ref = body.get('tx_ref', '')
+            self.send_json(200, {
+                'status': 'success',
+                'message': 'Hosted Link',
+                'data': {'checkout_url': f'{chapa.url}/checkout/{tx_ref}'},
+            })
+        else:
+            self.send_json(404, {'status': 'failed', 'message': 'Not found'})
+
+    def do_GET(self):
+        chapa = self.server.chapa
+        prefix = '/transaction/verify/'
+        if not chapa.served(self.path):
+            self.send_json(503, {'status': 'failed', 'message': 'Service unavailable'})
+        elif self.path.startswith(prefix):
+            tx_ref = self.path[len(prefix):].rstrip('/')
+            outcome = chapa.outcomes.get(tx_ref, chapa.default_outcome)
+            self.send_json(200, {
+                'status': 'success',
+                'message': 'Payment details',
+                'data': {'tx_ref': tx_ref, 'status': outcome},
+            })
+        else:
+            self.send_json(404, {'status': 'failed', 'message': 'Not found'})
+
+
+class FakeChapaServer:
+    def __init__(self, latency=0.0, default_outcome='success'):
+        self.latency = latency
+        self.default_outcome = default_outcome
+        self.outcomes = {}
+        self.failures = 0
+        self.requests = 0
+        self.paths = []
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), FakeChapaHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.chapa = self
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}'
+
+    def served(self, path):
+        """Record a call; returns False if it should fail with a 503."""
+        with self._lock:
+            self.requests += 1
+            self.paths.append(path)
+            failing = self.failures > 0
+            self.failures -= failing
+        if self.latency:
+            time.sleep(self.latency)
+        return not failing
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,154 @@
+"""
+Inbox for Chapa callbacks.
+
+During an on-sale Chapa sends callbacks in bursts, and one that is answered
+slowly gets sent again. So the callback views only record the notification:
+they look up the payment's status and, while it is pending, insert a
+ChapaCallback row keyed by tx_ref (INSERT ... ON CONFLICT DO NOTHING), then
+answer 202. Repeats of a queued callback add nothing, and callbacks for a
+settled payment are answered from the database as before. Only unprocessed
+rows are unique per tx_ref, so a callback for a payment whose earlier
+callback was already processed, yet is still pending, is queued afresh.
+
+InboxWorker processes the inbox in batches. Each batch is claimed with
+SELECT ... FOR UPDATE SKIP LOCKED and leased for CHAPA_CALLBACK_LEASE
+seconds in a short transaction, so several workers share the queue without
+holding locks across Chapa calls, and the batch of a worker that dies comes
+back when its lease runs out. The payments are then verified with at most
+`concurrency` Chapa calls in flight and settled together, as the reconciler
+does (Payment.reconcile.settle_batch). A callback is done once its payment
+is settled. If Chapa still reports the payment as pending, or cannot be
+reached, the callback is retried with backoff; after
+CHAPA_CALLBACK_MAX_ATTEMPTS it is left to the reconciler. Processed
+callbacks are pruned after CHAPA_CALLBACK_RETENTION_HOURS.
+"""
+import logging
+import time
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ChapaCallback, Payment
+from .reconcile import settle_batch
+from .services import PENDING
+
+logger = logging.getLogger(__name__)
+
+# Result of a callback whose payment no longer exists
+MISSING = 'missing'
+# Retry delays double from CHAPA_CALLBACK_RETRY_BACKOFF up to this
+MAX_BACKOFF = timedelta(minutes=5)
+
+
+def notification(query, data):
+    """The callback as stored: its query string and body, as plain dicts."""
+    def plain(values):
+        if hasattr(values, 'dict'):
+            return values.dict()
+        return values if isinstance(values, dict) else {}
+    return {'query': plain(query), 'data': plain(data)}
+
+
+def receive(tx_ref, payload):
+    """
+    Queue the callback for `tx_ref` unless its payment is already settled.
+    Returns the payment's status (PENDING when queued), or None if there is
+    no such payment.
+    """
+    status = Payment.objects.filter(chapa_tx_ref=tx_ref).values_list('chapa_status', flat=True).first()
+    if status == PENDING:
+        ChapaCallback.objects.bulk_create([ChapaCallback(tx_ref=tx_ref, payload=payload)], ignore_conflicts=True)
+    return status
+
+
+async def areceive(tx_ref, payload):
+    """receive() for async views."""
+    status = await Payment.objects.filter(chapa_tx_ref=tx_ref).values_list('chapa_status', flat=True).afirst()
+    if status == PENDING:
+        await ChapaCallback.objects.abulk_create(
+            [ChapaCallback(tx_ref=tx_ref, payload=payload)], ignore_conflicts=True,
+        )
+    return status
+
+
+def backoff(attempts):
+    return min(timedelta(seconds=settings.CHAPA_CALLBACK_RETRY_BACKOFF * 2 ** (attempts - 1)), MAX_BACKOFF)
+
+
+class InboxWorker:
+    def __init__(self, batch_size=100, concurrency=8):
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_attempts = settings.CHAPA_CALLBACK_MAX_ATTEMPTS
+
+    def due(self):
+        return ChapaCallback.objects.filter(
+            processed_at__isnull=True, available_at__lte=timezone.now(),
+        ).order_by('available_at', 'id')
+
+    def run_pass(self):
+        """Process every callback that is due, then prune old ones. Returns the pass totals."""
+        started = time.monotonic()
+        totals = Counter()
+        while True:
+            batch = self.claim()
+            if batch:
+                totals.update(self.process_batch(batch))
+            if len(batch) < self.batch_size:
+                break
+        totals['pruned'] = self.prune()
+        logger.info("Chapa callback inbox pass in %.3fs: %s", time.monotonic() - started, dict(totals))
+        return totals
+
+    def claim(self):
+        """Lease up to batch_size due callbacks. Returns their (id, tx_ref, attempts)."""
+        with transaction.atomic():
+            batch = list(
+                self.due().select_for_update(skip_locked=True)
+                .values_list('id', 'tx_ref', 'attempts')[:self.batch_size]
+            )
+            if batch:
+                ChapaCallback.objects.filter(id__in=[callback_id for callback_id, _, _ in batch]).update(
+                    available_at=timezone.now() + timedelta(seconds=settings.CHAPA_CALLBACK_LEASE),
+                )
+        return batch
+
+    def process_batch(self, batch):
+        tx_refs = [tx_ref for _, tx_ref, _ in batch]
+        pending = list(
+            Payment.objects.filter(chapa_tx_ref__in=tx_refs, chapa_status=PENDING).values_list('id', 'chapa_tx_ref')
+        )
+        counts = settle_batch(pending, self.concurrency) if pending else Counter()
+        counts['claimed'] = len(batch)
+
+        statuses = dict(Payment.objects.filter(chapa_tx_ref__in=tx_refs).values_list('chapa_tx_ref', 'chapa_status'))
+        now = timezone.now()
+        done = defaultdict(list)
+        retry = []
+        for callback_id, tx_ref, attempts in batch:
+            status = statuses.get(tx_ref, MISSING)
+            if status != PENDING:
+                done[status].append(callback_id)
+            elif attempts + 1 >= self.max_attempts:
+                # Still pending upstream; the reconciler will pick the payment up
+                done[PENDING].append(callback_id)
+                counts['gave_up'] += 1
+            else:
+                retry.append(ChapaCallback(
+                    id=callback_id, attempts=attempts + 1, available_at=now + backoff(attempts + 1),
+                ))
+        for status, ids in done.items():
+            ChapaCallback.objects.filter(id__in=ids).update(processed_at=now, result=status)
+            counts['processed'] += len(ids)
+        if retry:
+            ChapaCallback.objects.bulk_update(retry, ['attempts', 'available_at'])
+            counts['retried'] += len(retry)
+        return counts
+
+    def prune(self):
+        cutoff = timezone.now() - timedelta(hours=settings.CHAPA_CALLBACK_RETENTION_HOURS)
+        deleted, _ = ChapaCallback.objects.filter(processed_at__lt=cutoff).delete()
+        return deleted
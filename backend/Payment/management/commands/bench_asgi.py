@@ -0,0 +1,120 @@
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from events.models import Event
+from Payment.fake_chapa import FakeChapaServer
+from Payment.models import Payment
+from users.models import CustomUser
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the payment verify endpoint served by sync WSGI workers and by "
+        "ASGI (uvicorn) workers while a local fake Chapa answers slowly. Starts "
+        "gunicorn for each mode against the configured database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=50, help="Client requests in flight.")
+        parser.add_argument('--latency', type=float, default=200, help="Upstream latency in ms.")
+        parser.add_argument('--workers', type=int, default=2, help="Gunicorn workers per mode.")
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        user, _ = CustomUser.objects.get_or_create(username='bench-asgi', defaults={'role': 'attendee'})
+        event = Event.objects.create(
+            title='ASGI benchmark', description='Benchmark', location='Addis Ababa',
+            date='2099-01-01T00:00:00Z', organizer=user, price=100,
+        )
+        refs = [f'bench-asgi-{uuid.uuid4()}' for _ in range(total)]
+        Payment.objects.bulk_create(
+            Payment(user=user, event=event, amount=100, chapa_tx_ref=ref, chapa_status='pending') for ref in refs
+        )
+        try:
+            # Pending payments stay pending (202), so every request goes to Chapa
+            with FakeChapaServer(latency=options['latency'] / 1000, default_outcome='pending') as chapa:
+                for label, asgi in (('WSGI, sync workers', False), ('ASGI, uvicorn workers', True)):
+                    self.report(label, self.bench(asgi, chapa.url, refs, options))
+        finally:
+            Payment.objects.filter(event=event).delete()
+            event.delete()
+            user.delete()
+
+    def bench(self, asgi, chapa_url, refs, options):
+        port = free_port()
+        env = dict(
+            os.environ,
+            ASGI_MODE=str(asgi),
+            CHAPA_BASE_URL=chapa_url,
+            CHAPA_PENDING_CACHE_SECONDS='0',
+            PORT=str(port),
+            WEB_CONCURRENCY=str(options['workers']),
+        )
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '--log-level', 'warning'],
+            cwd=settings.BASE_DIR, env=env,
+        )
+        try:
+            url = f'http://127.0.0.1:{port}/api/payments/chapa/verify/'
+            self.wait_until_up(url, server)
+            return asyncio.run(self.load(url, refs, options['concurrency']))
+        finally:
+            server.terminate()
+            server.wait()
+
+    def wait_until_up(self, url, server, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError("gunicorn exited during startup")
+            try:
+                httpx.get(url, timeout=1)
+                return
+            except httpx.HTTPError:
+                time.sleep(0.2)
+        raise CommandError("gunicorn did not start")
+
+    async def load(self, url, refs, concurrency):
+        slots = asyncio.Semaphore(concurrency)
+        latencies = []
+        errors = 0
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+            async def verify(ref):
+                nonlocal errors
+                async with slots:
+                    started = time.perf_counter()
+                    response = await client.get(url, params={'tx_ref': ref})
+                    latencies.append(time.perf_counter() - started)
+                    errors += response.status_code >= 400
+
+            started = time.perf_counter()
+            await asyncio.gather(*(verify(ref) for ref in refs))
+            elapsed = time.perf_counter() - started
+        return latencies, errors, elapsed
+
+    def report(self, label, result):
+        latencies, errors, elapsed = result
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        self.stdout.write(
+            f"{label:<24} {len(latencies) / elapsed:8.1f} req/s  "
+            f"p50 {statistics.median(latencies) * 1000:7.0f}ms  p99 {p99 * 1000:7.0f}ms  errors {errors}"
+        )
@@ -0,0 +1,59 @@
+import asyncio
+import time
+
+import requests
+from django.core.management.base import BaseCommand
+
+from Payment.chapa import AsyncChapaClient, ChapaClient
+from Payment.fake_chapa import FakeChapaServer
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure how many Chapa verify calls one worker completes per second "
+        "against a local fake Chapa with artificial latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument('--latency', type=float, default=200, help="Upstream latency in ms.")
+        parser.add_argument('--concurrency', type=int, default=25, help="In-flight calls for the async client.")
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        with FakeChapaServer(latency=options['latency'] / 1000) as chapa:
+            self.report('sync, new connection per call', total, self.unpooled, chapa.url, total)
+            self.report('sync, pooled session', total, self.pooled, chapa.url, total)
+            self.report(
+                f"async, pooled, {options['concurrency']} in flight", total,
+                lambda url, count: asyncio.run(self.concurrent(url, count, options['concurrency'])),
+                chapa.url, total,
+            )
+
+    def report(self, label, total, run, *args):
+        started = time.perf_counter()
+        run(*args)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{label:<36} {total:>5} calls  {elapsed:8.2f}s  {total / elapsed:8.1f} calls/s")
+
+    def unpooled(self, url, count):
+        # What the views did before: a bare requests.get per call
+        for n in range(count):
+            requests.get(f"{url}/transaction/verify/bench-{n}").json()
+
+    def pooled(self, url, count):
+        client = ChapaClient(base_url=url)
+        for n in range(count):
+            client.verify(f"bench-{n}")
+        client.close()
+
+    async def concurrent(self, url, count, concurrency):
+        client = AsyncChapaClient(base_url=url)
+        slots = asyncio.Semaphore(concurrency)
+
+        async def verify(n):
+            async with slots:
+                await client.verify(f"bench-{n}")
+
+        await asyncio.gather(*(verify(n) for n in range(count)))
+        await client.aclose()
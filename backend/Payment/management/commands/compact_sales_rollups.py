@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from Payment.rollups import compact
+
+
+class Command(BaseCommand):
+    help = "Fold hourly sales buckets older than the retention period into daily buckets."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, default=settings.SALES_HOURLY_RETENTION_DAYS,
+            help="Days of hourly buckets to keep (default SALES_HOURLY_RETENTION_DAYS).",
+        )
+
+    def handle(self, *args, **options):
+        removed = compact(timezone.now() - timedelta(days=options['older_than']))
+        self.stdout.write(f"Compacted {removed} hourly buckets into daily buckets.")
@@ -0,0 +1,55 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from Payment.inbox import InboxWorker
+
+
+class Command(BaseCommand):
+    help = (
+        "Settle the payments of queued Chapa callbacks: claim them from the "
+        "callback inbox in batches, verify them against Chapa and issue tickets "
+        "or return seats. With --loop it keeps running as a worker pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help="Callbacks claimed at a time.")
+        parser.add_argument('--concurrency', type=int, default=8, help="Chapa calls in flight per worker.")
+        parser.add_argument('--workers', type=int, default=1, help="Worker threads, each with its own batches.")
+        parser.add_argument('--loop', action='store_true', help="Keep running, one pass every --interval.")
+        parser.add_argument('--interval', type=float, default=1, help="Seconds between passes with --loop.")
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        if workers > 1 and connection.vendor == 'sqlite':
+            # No row locks to share the queue with; concurrent claims would overlap
+            self.stderr.write("SQLite cannot share the inbox between workers; running one.")
+            workers = 1
+        threads = [threading.Thread(target=self.work, args=(options,)) for _ in range(workers - 1)]
+        for thread in threads:
+            thread.start()
+        self.work(options)
+        for thread in threads:
+            thread.join()
+
+    def work(self, options):
+        worker = InboxWorker(batch_size=options['batch_size'], concurrency=options['concurrency'])
+        try:
+            while True:
+                totals = worker.run_pass()
+                if totals['claimed'] or totals['pruned'] or not options['loop']:
+                    self.stdout.write(
+                        "claimed {claimed}, paid {paid}, failed {failed}, unfulfilled {unfulfilled}, "
+                        "retried {retried}, gave up {gave_up}, pruned {pruned}".format_map(
+                            {key: totals.get(key, 0) for key in
+                             ('claimed', 'paid', 'failed', 'unfulfilled', 'retried', 'gave_up', 'pruned')}
+                        )
+                    )
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                connection.close()
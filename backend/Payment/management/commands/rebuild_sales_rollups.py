@@ -0,0 +1,14 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from Payment.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute every event's sales buckets from the payment table, then compact old hours."
+
+    def handle(self, *args, **options):
+        buckets = rebuild(retention=timedelta(days=settings.SALES_HOURLY_RETENTION_DAYS))
+        self.stdout.write(f"Rebuilt sales rollups from {buckets} hourly buckets.")
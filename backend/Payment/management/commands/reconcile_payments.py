@@ -0,0 +1,40 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from Payment.reconcile import Reconciler
+
+
+class Command(BaseCommand):
+    help = (
+        "Verify payments that are still pending after a grace period against "
+        "Chapa, issuing tickets or returning seats. Resumes from its last "
+        "checkpoint; with --loop it keeps running as a worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=15, help="Grace period in minutes.")
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--concurrency', type=int, default=8, help="Chapa calls in flight.")
+        parser.add_argument('--loop', action='store_true', help="Keep running, one pass every --interval.")
+        parser.add_argument('--interval', type=int, default=60, help="Seconds between passes with --loop.")
+
+    def handle(self, *args, **options):
+        reconciler = Reconciler(
+            older_than=timedelta(minutes=options['older_than']),
+            batch_size=options['batch_size'],
+            concurrency=options['concurrency'],
+        )
+        while True:
+            totals = reconciler.run_pass()
+            self.stdout.write(
+                "scanned {scanned}, paid {paid}, failed {failed}, unfulfilled {unfulfilled}, "
+                "still pending {pending}, errors {errors}".format_map(
+                    {key: totals.get(key, 0) for key in
+                     ('scanned', 'paid', 'failed', 'unfulfilled', 'pending', 'errors')}
+                )
+            )
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
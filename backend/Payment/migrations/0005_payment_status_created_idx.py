@@ -0,0 +1,19 @@
+# Generated by Django 5.2.15 on 2026-10-18 18:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Payment', '0004_alter_payment_amount'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['chapa_status', 'created_at'], name='payment_status_created_idx'),
+        ),
+    ]
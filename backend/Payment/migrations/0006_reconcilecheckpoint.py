@@ -0,0 +1,24 @@
+# Generated by Django 5.2.15 on 2026-10-18 18:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Payment', '0005_payment_status_created_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReconcileCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('cursor_created_at', models.DateTimeField(blank=True, null=True)),
+                ('cursor_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('metrics', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.15 on 2026-10-18 19:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from Payment.rollups import rebuild
+
+
+def backfill_sales(apps, schema_editor):
+    # Hourly only; `manage.py compact_sales_rollups` folds the old hours
+    rebuild(
+        payment_model=apps.get_model('Payment', 'Payment'),
+        bucket_model=apps.get_model('Payment', 'SalesBucket'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Payment', '0006_reconcilecheckpoint'),
+        ('events', '0008_event_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateTimeField()),
+                ('granularity', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=4)),
+                ('tickets_sold', models.PositiveIntegerField(default=0)),
+                ('gross_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('failed_payments', models.PositiveIntegerField(default=0)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_buckets', to='events.event')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('event', 'start', 'granularity'), name='unique_sales_bucket')],
+            },
+        ),
+        migrations.RunPython(backfill_sales, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.15 on 2026-10-18 19:58
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Payment', '0007_salesbucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChapaCallback',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tx_ref', models.CharField(max_length=100, unique=True)),
+                ('payload', models.JSONField(default=dict)),
+                ('received_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('result', models.CharField(blank=True, max_length=50)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('processed_at__isnull', True)), fields=['available_at', 'id'], name='callback_queue_idx'), models.Index(condition=models.Q(('processed_at__isnull', False)), fields=['processed_at'], name='callback_processed_idx')],
+            },
+        ),
+    ]
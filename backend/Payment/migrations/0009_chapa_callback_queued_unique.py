@@ -0,0 +1,22 @@
+# Generated by Django 5.2.15 on 2026-10-18 20:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Payment', '0008_chapa_callback_inbox'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='chapacallback',
+            name='tx_ref',
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AddConstraint(
+            model_name='chapacallback',
+            constraint=models.UniqueConstraint(condition=models.Q(('processed_at__isnull', True)), fields=('tx_ref',), name='unique_queued_callback'),
+        ),
+    ]
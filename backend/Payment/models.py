@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from events.models import Event
 
 class Payment(models.Model):
@@ -11,6 +12,89 @@ class Payment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['chapa_status', 'created_at'], name='payment_status_created_idx'),
+        ]
+
+class SalesBucket(models.Model):
+    """
+    Sales of one event over one hour or one (UTC) day, maintained
+    incrementally as payments settle (see Payment.rollups). Recent sales are
+    kept hourly; older hours are compacted into days.
+    """
+    HOUR = 'hour'
+    DAY = 'day'
+    GRANULARITY_CHOICES = [(HOUR, 'Hour'), (DAY, 'Day')]
+
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='sales_buckets')
+    start = models.DateTimeField()
+    granularity = models.CharField(max_length=4, choices=GRANULARITY_CHOICES)
+    tickets_sold = models.PositiveIntegerField(default=0)
+    gross_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    failed_payments = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # Also serves the analytics range scans: event, then start
+            models.UniqueConstraint(fields=['event', 'start', 'granularity'], name='unique_sales_bucket'),
+        ]
+
+    def __str__(self):
+        return f'{self.event.title}: {self.granularity} from {self.start}'
+
+
+class ChapaCallback(models.Model):
+    """
+    A Chapa callback waiting to be processed (see Payment.inbox). One
+    unprocessed row per tx_ref: repeated callbacks for a payment that is
+    already queued are dropped, but a callback arriving after an earlier one
+    was processed (e.g. given up on while still pending) is queued again.
+    """
+    tx_ref = models.CharField(max_length=100)
+    # The notification as received: query string and body
+    payload = models.JSONField(default=dict)
+    received_at = models.DateTimeField(default=timezone.now)
+    # Not claimed again before this: leased while a worker holds it, then backing off
+    available_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    # The payment status the callback was settled to
+    result = models.CharField(max_length=50, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tx_ref'], name='unique_queued_callback', condition=models.Q(processed_at__isnull=True),
+            ),
+        ]
+        indexes = [
+            # The workers' queue: only unprocessed rows, in claim order
+            models.Index(
+                fields=['available_at', 'id'], name='callback_queue_idx',
+                condition=models.Q(processed_at__isnull=True),
+            ),
+            models.Index(
+                fields=['processed_at'], name='callback_processed_idx',
+                condition=models.Q(processed_at__isnull=False),
+            ),
+        ]
+
+    def __str__(self):
+        return self.tx_ref
+
+
+class ReconcileCheckpoint(models.Model):
+    """Where the pending-payment reconciler got to, and what it has done so far."""
+    name = models.CharField(max_length=50, unique=True)
+    cursor_created_at = models.DateTimeField(null=True, blank=True)
+    cursor_id = models.PositiveBigIntegerField(null=True, blank=True)
+    metrics = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
 def save(self, *args, **kwargs):
         if self.event:
             self.amount = self.event.price
@@ -0,0 +1,167 @@
+"""
+Settling payments whose callback never arrived.
+
+The reconciler walks pending payments older than a grace period in
+(created_at, id) order, a batch at a time. Each batch is verified against
+Chapa with a bounded number of calls in flight, then settled one payment
+per transaction, so a row lock is only held while that payment settles:
+tickets are issued for successful payments, and failed ones are marked and
+have their seats returned. Payments a request is settling at the same
+moment are skipped, not waited for. The callback inbox (Payment.inbox)
+settles its batches the same way, through settle_batch().
+
+Progress is checkpointed after every payment in a ReconcileCheckpoint row,
+so a restarted worker resumes where it stopped. When a pass reaches the end the
+cursor is cleared and the next pass starts over, picking up payments that
+were still pending. Running totals are kept in the checkpoint's `metrics`.
+"""
+import logging
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from core.outbox import PAYMENT_PAID, publish
+from tickets.inventory import SoldOut, issue_ticket, return_seats
+from tickets.models import TicketHold
+from .chapa import ChapaError, get_client
+from .models import Payment, ReconcileCheckpoint
+from .rollups import record_sales
+from .services import FAILED, PAID, PENDING, UNFULFILLED, chapa_outcome, payment_paid
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT = 'pending-payments'
+
+
+class Reconciler:
+    def __init__(self, older_than=timedelta(minutes=15), batch_size=100, concurrency=8, name=CHECKPOINT):
+        self.older_than = older_than
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.checkpoint, _ = ReconcileCheckpoint.objects.get_or_create(name=name)
+
+    def pending(self):
+        payments = Payment.objects.filter(
+            chapa_status=PENDING, created_at__lte=timezone.now() - self.older_than
+        )
+        checkpoint = self.checkpoint
+        if checkpoint.cursor_id is not None:
+            payments = payments.filter(
+                Q(created_at__gt=checkpoint.cursor_created_at)
+                | Q(created_at=checkpoint.cursor_created_at, id__gt=checkpoint.cursor_id)
+            )
+        return payments.order_by('created_at', 'id')
+
+    def run_pass(self):
+        """Reconcile every payment that is due, resuming from the checkpoint. Returns the pass totals."""
+        started = time.monotonic()
+        totals = Counter()
+        while True:
+            batch = list(self.pending().values_list('id', 'chapa_tx_ref', 'created_at')[:self.batch_size])
+            if not batch:
+                break
+            totals.update(self.reconcile_batch(batch))
+            last_id, _, last_created_at = batch[-1]
+            self.save_checkpoint(last_created_at, last_id, Counter(batches=1))
+
+        self.save_checkpoint(
+            None, None, Counter(passes=1), last_pass=dict(totals),
+            last_pass_seconds=round(time.monotonic() - started, 3),
+        )
+        logger.info("Payment reconciliation pass: %s", dict(totals))
+        return totals
+
+    def reconcile_batch(self, batch):
+        created = {payment_id: created_at for payment_id, _, created_at in batch}
+
+        def settled(payment_id, counts):
+            self.save_checkpoint(created[payment_id], payment_id, counts + Counter(scanned=1))
+
+        return settle_batch([(payment_id, tx_ref) for payment_id, tx_ref, _ in batch], self.concurrency, settled)
+
+    def save_checkpoint(self, cursor_created_at, cursor_id, counts, **extra):
+        checkpoint = self.checkpoint
+        checkpoint.cursor_created_at = cursor_created_at
+        checkpoint.cursor_id = cursor_id
+        totals = Counter(checkpoint.metrics.get('totals', {}))
+        totals.update(counts)
+        checkpoint.metrics = {**checkpoint.metrics, **extra, 'totals': dict(totals)}
+        checkpoint.save()
+
+
+def verify_all(tx_refs, concurrency):
+    """Ask Chapa about each tx_ref, `concurrency` calls at a time. Errors map to None."""
+    client = get_client()
+
+    def verify(tx_ref):
+        try:
+            return chapa_outcome(client.verify(tx_ref))
+        except ChapaError as exc:
+            logger.warning("Could not verify payment %s: %s", tx_ref, exc)
+            return None
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return dict(zip(tx_refs, pool.map(verify, tx_refs)))
+
+
+def settle_batch(batch, concurrency, settled=None):
+    """
+    Verify (payment id, tx_ref) pairs with Chapa, `concurrency` calls at a
+    time, and settle those still pending, each in its own transaction (see
+    settle_payment). `settled(payment_id, counts)` is called after each one
+    commits. Returns the counts by outcome.
+    """
+    outcomes = verify_all([tx_ref for _, tx_ref in batch], concurrency)
+    counts = Counter(scanned=len(batch))
+    for payment_id, tx_ref in batch:
+        payment_counts = settle_payment(payment_id, outcomes[tx_ref])
+        counts.update(payment_counts)
+        if settled is not None:
+            settled(payment_id, payment_counts)
+    return counts
+
+
+def settle_payment(payment_id, outcome):
+    """
+    Settle a payment with its Chapa `outcome` (None when it could not be
+    verified), if it is still pending and no concurrent settlement holds it.
+    Returns the counts by outcome.
+    """
+    if outcome is None:
+        return Counter(errors=1)
+    if outcome == PENDING:
+        return Counter({PENDING: 1})
+
+    with transaction.atomic():
+        payment = (
+            Payment.objects.select_for_update(skip_locked=True, of=('self',))
+            .select_related('user', 'event')
+            .filter(id=payment_id, chapa_status=PENDING)
+            .first()
+        )
+        if payment is None:
+            return Counter()
+        if outcome == FAILED:
+            status = FAILED
+            holds = TicketHold.objects.filter(payment=payment)
+            seats = list(holds.values('event_id').annotate(count=Count('id')).order_by())
+            holds.delete()
+            for row in seats:
+                return_seats(row['event_id'], row['count'])
+        else:
+            try:
+                issue_ticket(payment)
+                status = PAID
+            except SoldOut:
+                status = UNFULFILLED
+        now = timezone.now()
+        Payment.objects.filter(id=payment.id).update(chapa_status=status, updated_at=now)
+        record_sales(now, paid=[payment] if status == PAID else [], failed=[payment] if status == FAILED else [])
+        if status == PAID:
+            publish(PAYMENT_PAID, payment_paid(payment))
+    return Counter({status: 1})
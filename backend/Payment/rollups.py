@@ -0,0 +1,170 @@
+"""
+Time-bucketed sales rollups for organizer analytics.
+
+When a payment settles, its outcome is added to the event's SalesBucket for
+that hour with a single conditional UPDATE inside the settling transaction,
+as ratings are (see feedback.ratings): a paid payment adds a ticket sold and
+its amount to the gross revenue, a failed one counts as a failed payment.
+Payments only ever settle once, so every outcome is counted exactly once.
+
+Hourly buckets older than SALES_HOURLY_RETENTION_DAYS are compacted into
+daily ones by `manage.py compact_sales_rollups`, which keeps the table
+small enough for any date range to be answered from a few hundred rows per
+event. Bucket boundaries are UTC. Writes that bypass the services
+(queryset.update(), raw SQL) are not tracked; `manage.py
+rebuild_sales_rollups` recomputes everything from the payment table.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDay, TruncHour
+
+from .models import Payment, SalesBucket
+
+HOUR = SalesBucket.HOUR
+DAY = SalesBucket.DAY
+COUNTERS = ('tickets_sold', 'gross_revenue', 'failed_payments')
+BATCH_SIZE = 1000
+
+
+def hour_start(moment):
+    return moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def day_start(moment):
+    return datetime.combine(moment.astimezone(dt_timezone.utc).date(), time.min, tzinfo=dt_timezone.utc)
+
+
+def record_sales(at, paid=(), failed=()):
+    """
+    Add payments that settled at `at`, as `paid` or `failed`, to their
+    events' hourly buckets: one UPDATE per event.
+    """
+    deltas = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    for payment in paid:
+        delta = deltas[payment.event_id]
+        delta['tickets_sold'] += 1
+        delta['gross_revenue'] += payment.amount
+    for payment in failed:
+        deltas[payment.event_id]['failed_payments'] += 1
+    start = hour_start(at)
+    for event_id, delta in deltas.items():
+        SalesBucket.objects.get_or_create(event_id=event_id, start=start, granularity=HOUR)
+        SalesBucket.objects.filter(event_id=event_id, start=start, granularity=HOUR).update(
+            **{field: F(field) + value for field, value in delta.items() if value}
+        )
+
+
+def upsert(buckets, bucket_model=SalesBucket):
+    """Write `buckets` (unsaved SalesBuckets), replacing the counters of existing ones."""
+    bucket_model.objects.bulk_create(
+        buckets,
+        batch_size=BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['event', 'start', 'granularity'],
+        update_fields=list(COUNTERS),
+    )
+
+
+def compact(before, bucket_model=SalesBucket):
+    """
+    Fold hourly buckets for days ending before `before` into daily buckets,
+    adding to daily buckets already there. Returns the number of hourly
+    buckets removed.
+    """
+    # Sales are recorded in the current hour, which is never before the
+    # cutoff, so nothing writes to the hours being folded
+    cutoff = day_start(before)
+    with transaction.atomic():
+        hours = bucket_model.objects.filter(granularity=HOUR, start__lt=cutoff)
+        rows = list(
+            hours.annotate(day=TruncDay('start', tzinfo=dt_timezone.utc))
+            .values('event_id', 'day')
+            .annotate(**{field: Sum(field) for field in COUNTERS})
+            .order_by()
+        )
+        if not rows:
+            return 0
+        days = {
+            (bucket.event_id, bucket.start): bucket
+            for bucket in bucket_model.objects.filter(
+                granularity=DAY, start__lt=cutoff,
+                start__gte=min(row['day'] for row in rows),
+                event_id__in={row['event_id'] for row in rows},
+            )
+        }
+        merged = []
+        for row in rows:
+            bucket = days.get((row['event_id'], row['day'])) or bucket_model(
+                event_id=row['event_id'], start=row['day'], granularity=DAY,
+            )
+            for field in COUNTERS:
+                setattr(bucket, field, getattr(bucket, field) + row[field])
+            merged.append(bucket)
+        upsert(merged, bucket_model)
+        removed, _ = hours.delete()
+    return removed
+
+
+def rebuild(retention=None, payment_model=Payment, bucket_model=SalesBucket):
+    """
+    Recompute every bucket from the settled payments, hourly by the time
+    each payment last changed, then compact hours older than `retention`
+    (a timedelta) if given. Takes the models as arguments so migrations can
+    pass their historical versions. Returns the number of hourly buckets
+    written.
+    """
+    from .services import FAILED, PAID
+
+    rows = (
+        payment_model.objects.filter(chapa_status__in=(PAID, FAILED))
+        .annotate(hour=TruncHour('updated_at', tzinfo=dt_timezone.utc))
+        .values('event_id', 'hour')
+        .annotate(
+            tickets_sold=Count('id', filter=Q(chapa_status=PAID)),
+            gross_revenue=Coalesce(Sum('amount', filter=Q(chapa_status=PAID)), Decimal(0)),
+            failed_payments=Count('id', filter=Q(chapa_status=FAILED)),
+        )
+        .order_by()
+    )
+    written = 0
+    with transaction.atomic():
+        bucket_model.objects.all().delete()
+        batch = []
+        for row in rows.iterator(chunk_size=5000):
+            batch.append(bucket_model(
+                event_id=row['event_id'], start=row['hour'], granularity=HOUR,
+                **{field: row[field] for field in COUNTERS},
+            ))
+            if len(batch) == BATCH_SIZE:
+                bucket_model.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        bucket_model.objects.bulk_create(batch)
+        written += len(batch)
+        if retention is not None:
+            compact(datetime.now(dt_timezone.utc) - retention, bucket_model)
+    return written
+
+
+def sales_series(buckets, interval, start, end):
+    """
+    Sum `buckets` (a SalesBucket queryset) per `interval` ('hour' or 'day')
+    over [start, end). Buckets count in full where they start, so days that
+    have been compacted appear as one entry even at hourly interval. Returns
+    (totals, series); periods without sales are left out of the series.
+    """
+    trunc = TruncHour if interval == HOUR else TruncDay
+    rows = (
+        buckets.filter(start__gte=start, start__lt=end)
+        .annotate(period=trunc('start', tzinfo=dt_timezone.utc))
+        .values('period')
+        .annotate(**{field: Sum(field) for field in COUNTERS})
+        .order_by('period')
+    )
+    series = [{'start': row.pop('period'), **row} for row in rows]
+    totals = {field: sum((row[field] for row in series), 0) for field in COUNTERS}
+    return totals, series
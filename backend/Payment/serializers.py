@@ -1,8 +1,25 @@
 from rest_framework import serializers
-from .models import Payment
+from .models import Payment, SalesBucket
 
 class PaymentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Payment
         fields = '__all__'
         read_only_fields = ['user', 'chapa_status', 'created_at', 'updated_at']
+
+
+class SalesSerializer(serializers.Serializer):
+    tickets_sold = serializers.IntegerField()
+    gross_revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    failed_payments = serializers.IntegerField()
+
+
+class SalesPeriodSerializer(SalesSerializer):
+    start = serializers.DateTimeField()
+
+
+class SalesQuerySerializer(serializers.Serializer):
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+    interval = serializers.ChoiceField(choices=[SalesBucket.HOUR, SalesBucket.DAY], default=SalesBucket.DAY)
+    event = serializers.IntegerField(required=False)
@@ -0,0 +1,196 @@
+"""
+Settling payments against Chapa.
+
+Callback and verify both end up in verify_payment() (or its async twin
+averify_payment()). Once a payment is
+terminal it is answered from the database without calling Chapa. Within a
+process, concurrent verifications of one tx_ref queue behind a single
+upstream request and then find the payment settled, or its "still pending"
+answer cached. That answer is cached briefly so a polling payment page does
+not hammer Chapa. The Chapa call is made without a row lock held; the
+response is applied under the lock, re-checking the status, so settling
+stays exactly-once when two workers ask Chapa about the same payment.
+"""
+import asyncio
+import threading
+from contextlib import asynccontextmanager, contextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core.outbox import PAYMENT_PAID, publish
+from tickets.inventory import SoldOut, hold_seat, issue_ticket, release_hold
+from .chapa import get_async_client, get_client
+from .models import Payment
+from .rollups import record_sales
+
+PAID = 'paid'
+FAILED = 'failed'
+PENDING = 'pending'
+# Paid, but the event sold out after the seat hold expired
+UNFULFILLED = 'unfulfilled'
+TERMINAL_STATUSES = (PAID, FAILED, UNFULFILLED)
+
+
+class KeyedLock:
+    """One lock per key, dropped again once nobody holds or waits on it."""
+
+    def __init__(self):
+        self._guard = threading.Lock()
+        self._locks = {}
+
+    @contextmanager
+    def __call__(self, key):
+        with self._guard:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._guard:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[key]
+
+
+class AsyncKeyedLock:
+    """KeyedLock for coroutines on one event loop."""
+
+    def __init__(self):
+        self._locks = {}
+
+    @asynccontextmanager
+    async def __call__(self, key):
+        entry = self._locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[key]
+
+
+single_flight = KeyedLock()
+async_single_flight = AsyncKeyedLock()
+
+
+def pending_cache_key(tx_ref):
+    return f'chapa-pending:{tx_ref}'
+
+
+def verify_payment(tx_ref):
+    """
+    Bring the payment for `tx_ref` to its settled state and return it.
+    Raises Payment.DoesNotExist for unknown references and ChapaError if
+    Chapa cannot be reached.
+    """
+    payments = Payment.objects.select_related('user', 'event')
+    payment = payments.get(chapa_tx_ref=tx_ref)
+    if payment.chapa_status in TERMINAL_STATUSES or cache.get(pending_cache_key(tx_ref)):
+        return payment
+
+    with single_flight(tx_ref):
+        payment = payments.get(chapa_tx_ref=tx_ref)
+        if payment.chapa_status in TERMINAL_STATUSES or cache.get(pending_cache_key(tx_ref)):
+            return payment
+        return settle_verified(tx_ref, get_client().verify(tx_ref))
+
+
+def chapa_outcome(resp_json):
+    """Reduce a Chapa verify response to 'success', PENDING or FAILED."""
+    data = resp_json.get('data') or {}
+    if resp_json.get('status') == 'success' and data.get('status') == 'success':
+        return 'success'
+    if data.get('status') == PENDING:
+        return PENDING
+    return FAILED
+
+
+async def averify_payment(tx_ref):
+    """
+    verify_payment() for async views, coalescing concurrent callers on
+    the event loop instead of across threads.
+    """
+    payments = Payment.objects.select_related('user', 'event')
+    payment = await payments.aget(chapa_tx_ref=tx_ref)
+    if payment.chapa_status in TERMINAL_STATUSES or await cache.aget(pending_cache_key(tx_ref)):
+        return payment
+
+    async with async_single_flight(tx_ref):
+        payment = await payments.aget(chapa_tx_ref=tx_ref)
+        if payment.chapa_status in TERMINAL_STATUSES or await cache.aget(pending_cache_key(tx_ref)):
+            return payment
+        resp_json = await get_async_client().verify(tx_ref)
+        return await sync_to_async(settle_verified)(tx_ref, resp_json)
+
+
+def settle_verified(tx_ref, resp_json):
+    """Lock the payment and apply a verify response obtained without the lock."""
+    with transaction.atomic():
+        payment = (
+            Payment.objects.select_for_update(of=('self',))
+            .select_related('user', 'event')
+            .get(chapa_tx_ref=tx_ref)
+        )
+        if payment.chapa_status not in TERMINAL_STATUSES:
+            settle_payment(payment, resp_json)
+    return payment
+
+
+def start_checkout(user, event, tx_ref):
+    """
+    Create the pending payment and hold its seat until the payment completes
+    or TICKET_HOLD_MINUTES pass. Raises SoldOut.
+    """
+    with transaction.atomic():
+        payment = Payment.objects.create(
+            user=user, event=event, amount=event.price, chapa_tx_ref=tx_ref, chapa_status=PENDING,
+        )
+        hold_seat(event, payment)
+    return payment
+
+
+def fail_payment(payment):
+    with transaction.atomic():
+        payment.chapa_status = FAILED
+        payment.save(update_fields=['chapa_status', 'updated_at'])
+        release_hold(payment)
+        record_sales(payment.updated_at, failed=[payment])
+
+
+def payment_paid(payment):
+    """Payload of the PaymentPaid outbox message."""
+    return {
+        'payment_id': payment.id, 'tx_ref': payment.chapa_tx_ref, 'event_id': payment.event_id,
+        'user_id': payment.user_id, 'amount': str(payment.amount),
+    }
+
+
+def settle_payment(payment, resp_json):
+    """Apply a Chapa verify response to a locked, non-terminal payment."""
+    outcome = chapa_outcome(resp_json)
+    if outcome == 'success':
+        try:
+            # Create exactly one ticket per successful payment
+            issue_ticket(payment)
+            payment.chapa_status = PAID
+        except SoldOut:
+            payment.chapa_status = UNFULFILLED
+    elif outcome == PENDING:
+        cache.set(pending_cache_key(payment.chapa_tx_ref), True, settings.CHAPA_PENDING_CACHE_SECONDS)
+        return payment
+    else:
+        payment.chapa_status = FAILED
+        release_hold(payment)
+    payment.save(update_fields=['chapa_status', 'updated_at'])
+    if payment.chapa_status == PAID:
+        record_sales(payment.updated_at, paid=[payment])
+        publish(PAYMENT_PAID, payment_paid(payment))
+    elif payment.chapa_status == FAILED:
+        record_sales(payment.updated_at, failed=[payment])
+    return payment
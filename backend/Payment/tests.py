@@ -1,3 +1,551 @@
-from django.test import TestCase
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.models import OutboxMessage
+from core.testing import QueryPlanAssertionsMixin
+from events.models import Event
+from tickets.inventory import hold_seat, issue_ticket
+from tickets.models import Ticket
+from users.models import CustomUser
+from .async_views import AsyncChapaCallbackView, AsyncChapaInitializePaymentView, AsyncChapaVerifyPaymentView
+from .chapa import AsyncChapaClient, ChapaClient, ChapaError
+from .fake_chapa import FakeChapaServer
+from .inbox import InboxWorker
+from .models import ChapaCallback, Payment, ReconcileCheckpoint, SalesBucket
+from .reconcile import CHECKPOINT, Reconciler
+from .rollups import compact, rebuild
+from .services import averify_payment, pending_cache_key, verify_payment
+
+
+class PaymentIndexTests(QueryPlanAssertionsMixin, TestCase):
+    def test_stale_pending_lookup_uses_status_index(self):
+        cutoff = timezone.now() - timedelta(minutes=15)
+        self.assertUsesIndex(
+            Payment.objects.filter(chapa_status='pending', created_at__lt=cutoff),
+            'payment_status_created_idx',
+        )
+
+
+class PaymentListPaginationTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='attendee', password='pass', role='attendee')
+        organizer = CustomUser.objects.create_user(username='organizer', password='pass', role='organizer')
+        event = Event.objects.create(
+            title='Event', description='Description', location='Addis Ababa',
+            date=timezone.now(), organizer=organizer, price=100,
+        )
+        for n in range(25):
+            Payment.objects.create(user=self.user, event=event, amount=100, chapa_tx_ref=f'tx-{n}')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_pages_follow_newest_first(self):
+        tx_refs = []
+        url = '/api/payments/?page_size=10'
+        while url:
+            page = self.client.get(url).json()
+            self.assertLessEqual(len(page['results']), 10)
+            tx_refs += [payment['chapa_tx_ref'] for payment in page['results']]
+            url = page['next']
+        self.assertEqual(tx_refs, [f'tx-{n}' for n in reversed(range(25))])
+
+    def test_deep_pages_seek_instead_of_offset(self):
+        page = self.client.get('/api/payments/?page_size=5').json()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(page['next'])
+        sql = queries.captured_queries[-1]['sql']
+        self.assertIn('"Payment_payment"."created_at" <', sql)
+        self.assertNotIn('OFFSET', sql)
+
+
+@override_settings(CHAPA_RETRY_BACKOFF=0, CHAPA_READ_TIMEOUT=0.5)
+class ChapaClientTests(SimpleTestCase):
+    def setUp(self):
+        self.chapa = FakeChapaServer().start()
+        self.addCleanup(self.chapa.stop)
+        self.client = ChapaClient(base_url=self.chapa.url)
+        self.addCleanup(self.client.close)
+
+    def test_verify_retries_transient_failures(self):
+        self.chapa.failures = 2
+        self.assertEqual(self.client.verify('tx-1')['data']['status'], 'success')
+        self.assertEqual(self.chapa.requests, 3)
+
+    def test_verify_outage_is_an_error_not_a_failed_payment(self):
+        self.chapa.failures = 3
+        with self.assertRaises(ChapaError):
+            self.client.verify('tx-1')
+
+    def test_initialize_is_not_replayed(self):
+        self.chapa.failures = 1
+        self.assertEqual(self.client.initialize({'tx_ref': 'tx-1'})['status'], 'failed')
+        self.assertEqual(self.chapa.requests, 1)
+
+    def test_slow_upstream_times_out(self):
+        self.chapa.latency = 1
+        with self.assertRaises(ChapaError):
+            self.client.initialize({'tx_ref': 'tx-1'})
+
+    def test_async_client_verifies_concurrently(self):
+        async def verify_all():
+            client = AsyncChapaClient(base_url=self.chapa.url)
+            try:
+                return await asyncio.gather(*(client.verify(f'tx-{n}') for n in range(5)))
+            finally:
+                await client.aclose()
+
+        self.chapa.outcomes['tx-3'] = 'failed'
+        results = asyncio.run(verify_all())
+        self.assertEqual([result['data']['status'] for result in results].count('success'), 4)
+
+
+class ChapaPaymentFlowTests(TestCase):
+    def setUp(self):
+        self.chapa = FakeChapaServer().start()
+        self.addCleanup(self.chapa.stop)
+        settings_override = override_settings(CHAPA_BASE_URL=self.chapa.url, CHAPA_RETRY_BACKOFF=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        organizer = CustomUser.objects.create_user(username='organizer', password='pass', role='organizer')
+        self.attendee = CustomUser.objects.create_user(username='attendee', password='pass', role='attendee')
+        self.event = Event.objects.create(
+            title='Event', description='Description', location='Addis Ababa',
+            date=timezone.now(), organizer=organizer, price=100, capacity=10,
+        )
+        self.api = APIClient()
+        self.api.force_authenticate(self.attendee)
+
+    def test_purchase_flow_issues_one_ticket(self):
+        response = self.api.post('/api/payments/chapa/init/', {'event_id': self.event.id})
+        self.assertEqual(response.status_code, 200)
+        tx_ref = response.json()['tx_ref']
+        self.assertTrue(response.json()['payment_url'].endswith(tx_ref))
+
+        response = self.api.get('/api/payments/chapa/verify/', {'tx_ref': tx_ref})
+        self.assertEqual(response.json()['status'], 'paid')
+        self.assertEqual(Ticket.objects.filter(attendee=self.attendee, event=self.event).count(), 1)
+        self.event.inventory.refresh_from_db()
+        self.assertEqual(self.event.inventory.remaining, 9)
+
+    def test_settled_payments_are_rolled_up(self):
+        paid = self.api.post('/api/payments/chapa/init/', {'event_id': self.event.id}).json()['tx_ref']
+        self.api.get('/api/payments/chapa/verify/', {'tx_ref': paid})
+        # Verifying again changes nothing
+        self.api.get('/api/payments/chapa/verify/', {'tx_ref': paid})
+        self.api.force_authenticate(CustomUser.objects.create_user(username='other', password='pass'))
+        failed = self.api.post('/api/payments/chapa/init/', {'event_id': self.event.id}).json()['tx_ref']
+        self.chapa.outcomes[failed] = 'failed'
+        self.api.get('/api/payments/chapa/verify/', {'tx_ref': failed})
+
+        bucket = SalesBucket.objects.get()
+        self.assertEqual((bucket.event_id, bucket.granularity), (self.event.id, 'hour'))
+        self.assertEqual(
+            (bucket.tickets_sold, bucket.gross_revenue, bucket.failed_payments), (1, Decimal('100'), 1)
+        )
+        [message] = OutboxMessage.objects.filter(topic='PaymentPaid')
+        self.assertEqual(message.payload['tx_ref'], paid)
+        self.assertEqual(message.payload['amount'], '100.00')
+
+    def test_failed_payment_returns_the_seat(self):
+        tx_ref = self.api.post('/api/payments/chapa/init/', {'event_id': self.event.id}).json()['tx_ref']
+        self.chapa.outcomes[tx_ref] = 'failed'
+        response = self.api.get('/api/payments/chapa/verify/', {'tx_ref': tx_ref})
+        self.assertEqual(response.status_code, 400)
+        self.event.inventory.refresh_from_db()
+        self.assertEqual(self.event.inventory.remaining, 10)
+
+    def test_unreachable_gateway_fails_the_payment(self):
+        self.chapa.stop()
+        response = self.api.post('/api/payments/chapa/init/', {'event_id': self.event.id})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Payment.objects.get().chapa_status, 'failed')
+
+    def test_settled_payment_is_not_verified_again(self):
+        tx_ref = self.api.post('/api/payments/chapa/init/', {'event_id': self.event.id}).json()['tx_ref']
+        self.api.get('/api/payments/chapa/verify/', {'tx_ref': tx_ref})
+        calls = self.chapa.requests
+        response = self.api.get('/api/payments/chapa/verify/', {'tx_ref': tx_ref})
+        self.assertEqual(response.json()['status'], 'paid')
+        self.assertEqual(self.chapa.requests, calls)
+
+    def test_callback_then_verify_issues_one_ticket(self):
+        tx_ref = self.api.post('/api/payments/chapa/init/', {'event_id': self.event.id}).json()['tx_ref']
+        response = APIClient().get('/api/payments/chapa/callback/', {'trx_ref': tx_ref, 'status': 'success'})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(InboxWorker().run_pass()['paid'], 1)
+        response = APIClient().get('/api/payments/chapa/callback/', {'trx_ref': tx_ref, 'status': 'success'})
+        self.assertEqual(response.json()['status'], 'paid')
+        response = self.api.get('/api/payments/chapa/verify/', {'tx_ref': tx_ref})
+        self.assertEqual(response.json()['tickets'], 1)
+        self.assertEqual(self.chapa.paths.count(f'/transaction/verify/{tx_ref}'), 1)
+
+    def test_pending_result_is_cached(self):
+        tx_ref = self.api.post('/api/payments/chapa/init/', {'event_id': self.event.id}).json()['tx_ref']
+        self.chapa.outcomes[tx_ref] = 'pending'
+        for _ in range(3):
+            response = self.api.get('/api/payments/chapa/verify/', {'tx_ref': tx_ref})
+            self.assertEqual(response.status_code, 202)
+        self.assertEqual(self.chapa.paths.count(f'/transaction/verify/{tx_ref}'), 1)
+        self.assertEqual(Payment.objects.get().chapa_status, 'pending')
+
+        cache.delete(pending_cache_key(tx_ref))
+        self.chapa.outcomes[tx_ref] = 'success'
+        response = self.api.get('/api/payments/chapa/verify/', {'tx_ref': tx_ref})
+        self.assertEqual(response.json()['status'], 'paid')
+
+
+class ConcurrentVerificationTests(TransactionTestCase):
+    def verify_concurrently(self, outcome):
+        cache.clear()
+        organizer = CustomUser.objects.create_user(username='organizer', password='pass', role='organizer')
+        attendee = CustomUser.objects.create_user(username='attendee', password='pass', role='attendee')
+        event = Event.objects.create(
+            title='Event', description='Description', location='Addis Ababa',
+            date=timezone.now(), organizer=organizer, price=100, capacity=10,
+        )
+        payment = Payment.objects.create(user=attendee, event=event, amount=100, chapa_tx_ref='tx-1')
+        hold_seat(event, payment)
+        start = threading.Barrier(8)
+
+        def verify():
+            start.wait()
+            try:
+                return verify_payment('tx-1').chapa_status
+            finally:
+                connection.close()
+
+        with FakeChapaServer(latency=0.1) as chapa:
+            chapa.outcomes['tx-1'] = outcome
+            with override_settings(CHAPA_BASE_URL=chapa.url):
+                with ThreadPoolExecutor(max_workers=8) as pool:
+                    statuses = list(pool.map(lambda _: verify(), range(8)))
+        return statuses, chapa.requests, Ticket.objects.filter(event=event).count()
+
+    def test_concurrent_verifications_share_one_upstream_call(self):
+        self.assertEqual(self.verify_concurrently('success'), (['paid'] * 8, 1, 1))
+
+    def test_concurrent_pending_polls_share_one_upstream_call(self):
+        self.assertEqual(self.verify_concurrently('pending'), (['pending'] * 8, 1, 0))
+
+
+class ReconcilerTests(TestCase):
+    def setUp(self):
+        self.chapa = FakeChapaServer().start()
+        self.addCleanup(self.chapa.stop)
+        settings_override = override_settings(CHAPA_BASE_URL=self.chapa.url, CHAPA_RETRY_BACKOFF=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        organizer = CustomUser.objects.create_user(username='organizer', password='pass', role='organizer')
+        self.event = Event.objects.create(
+            title='Event', description='Description', location='Addis Ababa',
+            date=timezone.now(), organizer=organizer, price=100, capacity=10,
+        )
+
+    def make_payment(self, n, outcome, minutes_ago=30):
+        user = CustomUser.objects.create_user(username=f'buyer{n}', password='pass', role='attendee')
+        payment = Payment.objects.create(user=user, event=self.event, amount=100, chapa_tx_ref=f'tx-{n}')
+        hold_seat(self.event, payment)
+        Payment.objects.filter(id=payment.id).update(created_at=timezone.now() - timedelta(minutes=minutes_ago))
+        self.chapa.outcomes[payment.chapa_tx_ref] = outcome
+        return payment
+
+    def test_pass_settles_stale_pending_payments(self):
+        paid = [self.make_payment(n, 'success') for n in range(3)]
+        failed = self.make_payment(3, 'failed')
+        waiting = self.make_payment(4, 'pending')
+        recent = self.make_payment(5, 'success', minutes_ago=1)
+
+        totals = Reconciler(batch_size=2, concurrency=4).run_pass()
+
+        self.assertEqual(totals['scanned'], 5)
+        self.assertEqual((totals['paid'], totals['failed'], totals['pending']), (3, 1, 1))
+        self.assertEqual(Ticket.objects.filter(payment__in=paid).count(), 3)
+        statuses = dict(Payment.objects.values_list('chapa_tx_ref', 'chapa_status'))
+        self.assertEqual(statuses[failed.chapa_tx_ref], 'failed')
+        self.assertEqual(statuses[waiting.chapa_tx_ref], 'pending')
+        self.assertEqual(statuses[recent.chapa_tx_ref], 'pending')
+        self.assertNotIn(f'/transaction/verify/{recent.chapa_tx_ref}', self.chapa.paths)
+        # Three tickets and two open holds; the failed payment's seat is back
+        self.event.inventory.refresh_from_db()
+        self.assertEqual(self.event.inventory.remaining, 5)
+        bucket = SalesBucket.objects.get()
+        self.assertEqual(
+            (bucket.tickets_sold, bucket.gross_revenue, bucket.failed_payments), (3, Decimal('300'), 1)
+        )
+        self.assertEqual(
+            sorted(OutboxMessage.objects.filter(topic='PaymentPaid').values_list('payload__payment_id', flat=True)),
+            sorted(payment.id for payment in paid),
+        )
+        self.assertEqual(OutboxMessage.objects.filter(topic='TicketIssued').count(), 3)
+
+        checkpoint = ReconcileCheckpoint.objects.get()
+        self.assertIsNone(checkpoint.cursor_id)
+        self.assertEqual(checkpoint.metrics['totals']['batches'], 3)
+        self.assertEqual(checkpoint.metrics['totals']['passes'], 1)
+
+    def test_pass_resumes_from_checkpoint(self):
+        first = self.make_payment(0, 'success', minutes_ago=40)
+        second = self.make_payment(1, 'success')
+        first.refresh_from_db()
+        ReconcileCheckpoint.objects.create(
+            name=CHECKPOINT, cursor_created_at=first.created_at, cursor_id=first.id,
+        )
+
+        totals = Reconciler().run_pass()
+
+        self.assertEqual(totals['scanned'], 1)
+        self.assertEqual(self.chapa.paths, [f'/transaction/verify/{second.chapa_tx_ref}'])
+        # The next pass starts over and picks up the payment skipped above
+        self.assertEqual(Reconciler().run_pass()['paid'], 1)
+        self.assertFalse(Payment.objects.filter(chapa_status='pending').exists())
+
+    def test_checkpoint_advances_after_each_payment(self):
+        first = self.make_payment(0, 'success', minutes_ago=40)
+        second = self.make_payment(1, 'success')
+
+        def issue(payment):
+            if payment.id == second.id:
+                raise RuntimeError('Worker stopped')
+            return issue_ticket(payment)
+
+        with mock.patch('Payment.reconcile.issue_ticket', side_effect=issue), self.assertRaises(RuntimeError):
+            Reconciler().run_pass()
+
+        # The first payment committed on its own and the cursor moved past it
+        self.assertEqual(Payment.objects.get(id=first.id).chapa_status, 'paid')
+        self.assertEqual(Payment.objects.get(id=second.id).chapa_status, 'pending')
+        checkpoint = ReconcileCheckpoint.objects.get()
+        self.assertEqual(checkpoint.cursor_id, first.id)
+        self.assertEqual(checkpoint.metrics['totals'], {'scanned': 1, 'paid': 1})
+
+    def test_unreachable_gateway_leaves_payments_pending(self):
+        self.make_payment(0, 'success')
+        self.chapa.failures = 10
+        totals = Reconciler().run_pass()
+        self.assertEqual(totals['errors'], 1)
+        self.assertEqual(Payment.objects.get().chapa_status, 'pending')
+
+
+@override_settings(CHAPA_CALLBACK_RETRY_BACKOFF=60, CHAPA_CALLBACK_MAX_ATTEMPTS=2)
+class ChapaCallbackInboxTests(TestCase):
+    def setUp(self):
+        self.chapa = FakeChapaServer().start()
+        self.addCleanup(self.chapa.stop)
+        settings_override = override_settings(CHAPA_BASE_URL=self.chapa.url, CHAPA_RETRY_BACKOFF=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        organizer = CustomUser.objects.create_user(username='organizer', password='pass', role='organizer')
+        self.event = Event.objects.create(
+            title='Event', description='Description', location='Addis Ababa',
+            date=timezone.now(), organizer=organizer, price=100, capacity=10,
+        )
+        self.api = APIClient()
+
+    def make_payment(self, n, outcome='success'):
+        user = CustomUser.objects.create_user(username=f'buyer{n}', password='pass', role='attendee')
+        payment = Payment.objects.create(user=user, event=self.event, amount=100, chapa_tx_ref=f'tx-{n}')
+        hold_seat(self.event, payment)
+        self.chapa.outcomes[payment.chapa_tx_ref] = outcome
+        return payment
+
+    def callback(self, tx_ref):
+        return self.api.post('/api/payments/chapa/callback/', {'trx_ref': tx_ref, 'status': 'success'}, format='json')
+
+    def test_callbacks_are_queued_once_without_calling_chapa(self):
+        self.make_payment(0)
+        for _ in range(3):
+            response = self.callback('tx-0')
+            self.assertEqual((response.status_code, response.json()), (202, {'status': 'queued'}))
+        callback = ChapaCallback.objects.get()
+        self.assertEqual(callback.payload['data'], {'trx_ref': 'tx-0', 'status': 'success'})
+        self.assertEqual(self.chapa.requests, 0)
+        self.assertEqual(self.callback('tx-unknown').status_code, 404)
+
+    def test_worker_settles_queued_payments_in_batches(self):
+        for n, outcome in enumerate(('success', 'success', 'failed')):
+            self.make_payment(n, outcome)
+            self.callback(f'tx-{n}')
+
+        out = StringIO()
+        call_command('process_chapa_callbacks', batch_size=2, concurrency=2, stdout=out)
+        self.assertIn('claimed 3, paid 2, failed 1', out.getvalue())
+        self.assertEqual(
+            dict(ChapaCallback.objects.values_list('tx_ref', 'result')),
+            {'tx-0': 'paid', 'tx-1': 'paid', 'tx-2': 'failed'},
+        )
+        self.assertEqual(Ticket.objects.filter(event=self.event).count(), 2)
+        self.assertEqual(self.chapa.requests, 3)
+        # Settled payments are answered without queueing
+        response = self.callback('tx-0')
+        self.assertEqual((response.status_code, response.json()), (200, {'status': 'paid'}))
+
+    def test_still_pending_payments_are_retried_then_left_to_the_reconciler(self):
+        self.make_payment(0, 'pending')
+        self.callback('tx-0')
+        worker = InboxWorker()
+        self.assertEqual(worker.run_pass()['retried'], 1)
+        callback = ChapaCallback.objects.get()
+        self.assertEqual(callback.attempts, 1)
+        self.assertIsNone(callback.processed_at)
+        self.assertGreater(callback.available_at, timezone.now())
+        self.assertEqual(worker.run_pass()['claimed'], 0)
+
+        ChapaCallback.objects.update(available_at=timezone.now())
+        self.assertEqual(worker.run_pass()['gave_up'], 1)
+        self.assertEqual(ChapaCallback.objects.get().result, 'pending')
+        self.assertEqual(Payment.objects.get().chapa_status, 'pending')
+
+        # A later callback for the still pending payment is queued again
+        self.chapa.outcomes['tx-0'] = 'success'
+        self.assertEqual(self.callback('tx-0').status_code, 202)
+        self.assertEqual(worker.run_pass()['paid'], 1)
+        self.assertEqual(list(ChapaCallback.objects.order_by('id').values_list('result', flat=True)), ['pending', 'paid'])
+
+    def test_expired_leases_are_claimed_again(self):
+        self.make_payment(0)
+        self.callback('tx-0')
+        worker = InboxWorker()
+        self.assertEqual(len(worker.claim()), 1)
+        self.assertEqual(worker.claim(), [])
+        ChapaCallback.objects.update(available_at=timezone.now())
+        self.assertEqual(worker.run_pass()['paid'], 1)
+
+
+class SalesRollupTests(TestCase):
+    def setUp(self):
+        self.organizer = CustomUser.objects.create_user(username='organizer', password='pass', role='organizer')
+        self.event = Event.objects.create(
+            title='Event', description='Description', location='Addis Ababa',
+            date=timezone.now(), organizer=self.organizer, price=100,
+        )
+        self.day = datetime(2026, 3, 1, tzinfo=dt_timezone.utc)
+        # Two paid payments on day one (09:xx and 15:xx), a failed one on day two
+        for n, (status, at) in enumerate((
+            ('paid', self.day + timedelta(hours=9, minutes=5)),
+            ('paid', self.day + timedelta(hours=15, minutes=59)),
+            ('failed', self.day + timedelta(days=1, hours=2)),
+            ('pending', self.day + timedelta(hours=10)),
+        )):
+            payment = Payment.objects.create(
+                user=self.organizer, event=self.event, amount=100, chapa_tx_ref=f'tx-{n}', chapa_status=status,
+            )
+            Payment.objects.filter(id=payment.id).update(updated_at=at)
+        self.api = APIClient()
+        self.api.force_authenticate(self.organizer)
+
+    def sales(self, **params):
+        response = self.api.get('/api/payments/analytics/sales/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_rebuild_and_hourly_series(self):
+        self.assertEqual(rebuild(), 3)
+        result = self.sales(start='2026-03-01', end='2026-03-03', interval='hour')
+        self.assertEqual(result['totals'], {'tickets_sold': 2, 'gross_revenue': '200.00', 'failed_payments': 1})
+        self.assertEqual(
+            [(point['start'], point['tickets_sold']) for point in result['series']],
+            [('2026-03-01T09:00:00Z', 1), ('2026-03-01T15:00:00Z', 1), ('2026-03-02T02:00:00Z', 0)],
+        )
+
+    def test_compaction_keeps_the_daily_answer(self):
+        rebuild()
+        before = self.sales(start='2026-03-01', end='2026-03-03')
+        self.assertEqual(len(before['series']), 2)
+
+        # Fold day one only; an existing daily bucket is added to
+        SalesBucket.objects.create(event=self.event, start=self.day, granularity='day', tickets_sold=1)
+        self.assertEqual(compact(self.day + timedelta(days=1, hours=12)), 2)
+        self.assertEqual(
+            sorted(SalesBucket.objects.values_list('granularity', 'tickets_sold')), [('day', 3), ('hour', 0)],
+        )
+        after = self.sales(start='2026-03-01', end='2026-03-03')
+        self.assertEqual([point['tickets_sold'] for point in after['series']], [3, 0])
+        # Compacted days show at day resolution
+        hourly = self.sales(start='2026-03-01', end='2026-03-03', interval='hour')
+        self.assertEqual(hourly['series'][0]['start'], '2026-03-01T00:00:00Z')
+
+    def test_only_for_the_organizers_events(self):
+        rebuild()
+        self.assertEqual(self.sales(start='2026-03-01', end='2026-03-03', event=0)['series'], [])
+        self.api.force_authenticate(CustomUser.objects.create_user(username='rival', password='pass', role='organizer'))
+        self.assertEqual(self.sales(start='2026-03-01', end='2026-03-03')['totals']['tickets_sold'], 0)
+        self.api.force_authenticate(CustomUser.objects.create_user(username='fan', password='pass'))
+        self.assertEqual(self.api.get('/api/payments/analytics/sales/').status_code, 403)
+        self.api.force_authenticate(self.organizer)
+        self.assertEqual(self.api.get('/api/payments/analytics/sales/', {'interval': 'week'}).status_code, 400)
+
+
+class AsyncPaymentViewTests(TestCase):
+    def setUp(self):
+        self.chapa = FakeChapaServer(latency=0.05).start()
+        self.addCleanup(self.chapa.stop)
+        settings_override = override_settings(CHAPA_BASE_URL=self.chapa.url, CHAPA_RETRY_BACKOFF=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        organizer = CustomUser.objects.create_user(username='organizer', password='pass', role='organizer')
+        self.attendee = CustomUser.objects.create_user(username='attendee', password='pass', role='attendee')
+        self.token = Token.objects.create(user=self.attendee)
+        self.event = Event.objects.create(
+            title='Event', description='Description', location='Addis Ababa',
+            date=timezone.now(), organizer=organizer, price=100, capacity=10,
+        )
+        self.factory = AsyncRequestFactory()
+
+    async def test_async_purchase_flow(self):
+        request = self.factory.post(
+            '/api/payments/chapa/init/', {'event_id': self.event.id},
+            content_type='application/json', headers={'Authorization': f'Token {self.token.key}'},
+        )
+        response = await AsyncChapaInitializePaymentView.as_view()(request)
+        self.assertEqual(response.status_code, 200, response.content)
+        tx_ref = json.loads(response.content)['tx_ref']
+
+        request = self.factory.get('/api/payments/chapa/verify/', {'tx_ref': tx_ref})
+        response = await AsyncChapaVerifyPaymentView.as_view()(request)
+        body = json.loads(response.content)
+        self.assertEqual((body['status'], body['tickets'], body['amount']), ('paid', 1, '100.00'))
+
+    async def test_async_callback_is_queued(self):
+        await Payment.objects.acreate(user=self.attendee, event=self.event, amount=100, chapa_tx_ref='tx-async')
+        request = self.factory.post(
+            '/api/payments/chapa/callback/', {'trx_ref': 'tx-async'}, content_type='application/json',
+        )
+        response = await AsyncChapaCallbackView.as_view()(request)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(await ChapaCallback.objects.filter(tx_ref='tx-async').acount(), 1)
+        self.assertEqual(self.chapa.requests, 0)
+
+    async def test_async_init_needs_a_token(self):
+        request = self.factory.post(
+            '/api/payments/chapa/init/', {'event_id': self.event.id}, content_type='application/json',
+        )
+        response = await AsyncChapaInitializePaymentView.as_view()(request)
+        self.assertEqual(response.status_code, 401)
+
+    async def test_concurrent_async_verifications_share_one_upstream_call(self):
+        payment = await Payment.objects.acreate(
+            user=self.attendee, event=self.event, amount=100, chapa_tx_ref='tx-async',
+        )
+        payments = await asyncio.gather(*(averify_payment('tx-async') for _ in range(10)))
+        self.assertEqual({payment.chapa_status for payment in payments}, {'paid'})
+        self.assertEqual(self.chapa.requests, 1)
+        self.assertEqual(await Ticket.objects.filter(payment=payment).acount(), 1)
@@ -1,9 +1,21 @@
+from django.conf import settings
 from django.urls import path
-from .views import PaymentListCreateView, ChapaInitializePaymentView, ChapaVerifyPaymentView, PaymentSuccessView
+from .async_views import AsyncChapaCallbackView, AsyncChapaInitializePaymentView, AsyncChapaVerifyPaymentView
+from .views import PaymentListCreateView, ChapaInitializePaymentView, ChapaCallbackView, ChapaVerifyPaymentView, PaymentSuccessView
+from .views import OrganizerSalesView
 
 urlpatterns = [
     path('', PaymentListCreateView.as_view(), name='payment-list-create'),
     path('chapa/init/', ChapaInitializePaymentView.as_view(), name='chapa-init'),
     path('chapa/verify/', ChapaVerifyPaymentView.as_view(), name='chapa-verify'),
+    path('chapa/callback/', ChapaCallbackView.as_view(), name='chapa-callback'),
     path('payment-success/', PaymentSuccessView.as_view(), name='payment-success'),
-]
\ No newline at end of file
+    path('analytics/sales/', OrganizerSalesView.as_view(), name='organizer-sales'),
+]
+
+if settings.ASGI_MODE:
+    urlpatterns = [
+        path('chapa/init/', AsyncChapaInitializePaymentView.as_view(), name='chapa-init'),
+        path('chapa/verify/', AsyncChapaVerifyPaymentView.as_view(), name='chapa-verify'),
+        path('chapa/callback/', AsyncChapaCallbackView.as_view(), name='chapa-callback'),
+    ] + urlpatterns
@@ -1,13 +1,68 @@
 from django.shortcuts import render
-import requests
 import uuid
+from datetime import timedelta
 from django.conf import settings
+from django.utils import timezone
 from rest_framework import status, permissions, generics
 from rest_framework.response import Response
-from .models import Payment, Event
-from .serializers import PaymentSerializer
+from .chapa import ChapaError, get_client
+from .inbox import notification, receive
+from .models import Payment, Event, SalesBucket
+from .rollups import sales_series
+from .serializers import PaymentSerializer, SalesPeriodSerializer, SalesQuerySerializer, SalesSerializer
+from .services import PAID, PENDING, UNFULFILLED, fail_payment, start_checkout, verify_payment
 from django.views.generic import TemplateView
 from tickets.models import Ticket
+from tickets.inventory import SoldOut
+
+
+def checkout_data(request, user, event, tx_ref):
+    """The Chapa initialize payload for one ticket to `event`."""
+    return {
+        "amount": str(event.price),
+        "currency": "ETB",
+        "email": user.email,
+        "first_name": user.first_name or user.username,
+        "last_name": user.last_name or "",
+        "tx_ref": tx_ref,
+        "callback_url": request.build_absolute_uri("/api/payments/chapa/callback/"),
+        "return_url": f"{settings.FRONTEND_URL}/payment-success?tx_ref={tx_ref}",
+        "customization[title]": f"1 ticket for {event.title}",
+    }
+
+
+def callback_result(payment_status):
+    """(body, status) answering Chapa's callback, given the payment's status."""
+    if payment_status == PAID:
+        return {'status': 'paid'}, 200
+    if payment_status == PENDING:
+        # Queued in the callback inbox (see Payment.inbox)
+        return {'status': 'queued'}, 202
+    if payment_status == UNFULFILLED:
+        return {'status': 'unfulfilled'}, 409
+    return {'status': 'failed'}, 400
+
+
+def verification_result(payment, tickets):
+    """(body, status) for the payment page's verify call."""
+    if payment.chapa_status == PAID:
+        return {
+            'status': 'paid',
+            'amount': payment.amount,
+            'event': payment.event.title,
+            'user': payment.user.username,
+            'tickets': tickets,
+            'tx_ref': payment.chapa_tx_ref,
+        }, 200
+    if payment.chapa_status == PENDING:
+        return {'status': 'pending', 'tx_ref': payment.chapa_tx_ref}, 202
+    if payment.chapa_status == UNFULFILLED:
+        return {
+            'status': 'unfulfilled',
+            'error': 'The event sold out before the payment completed.',
+            'tx_ref': payment.chapa_tx_ref,
+        }, 409
+    return {'status': 'failed'}, 400
 
 
 class PaymentListCreateView(generics.ListCreateAPIView):
@@ -35,85 +90,49 @@ class ChapaInitializePaymentView(generics.GenericAPIView):
         if Ticket.objects.filter(attendee=request.user, event=event).exists():
             return Response({'error': 'You have already purchased a ticket for this event.'}, status=400)
 
-        amount = event.price  # single ticket price
         tx_ref = str(uuid.uuid4())
         user = request.user
 
-        payment = Payment.objects.create(
-            user=user,
-            event=event,
-            amount=amount,
-            chapa_tx_ref=tx_ref,
-            chapa_status='pending'
-        )
+        # Take the seat before sending the buyer to Chapa
+        try:
+            payment = start_checkout(user, event, tx_ref)
+        except SoldOut:
+            return Response({'error': 'This event is sold out.'}, status=409)
 
-        chapa_url = "https://api.chapa.co/v1/transaction/initialize"
-        headers = {
-            "Authorization": f"Bearer {settings.CHAPA_SECRET_KEY}",
-            "Content-Type": "application/json"
-        }
-
-        data = {
-            "amount": str(amount),
-            "currency": "ETB",
-            "email": user.email,
-            "first_name": user.first_name or user.username,
-            "last_name": user.last_name or "",
-            "tx_ref": tx_ref,
-            "callback_url": request.build_absolute_uri("/api/payments/chapa/callback/"),
-            "return_url": f"{settings.FRONTEND_URL}/payment-success?tx_ref={tx_ref}",
-            "customization[title]": f"1 ticket for {event.title}",
-        }
-
-        response = requests.post(chapa_url, json=data, headers=headers)
-        resp_json = response.json()
+        try:
+            resp_json = get_client().initialize(checkout_data(request, user, event, tx_ref))
+        except ChapaError:
+            resp_json = {'message': 'Payment gateway unavailable, please try again.'}
 
         if resp_json.get('status') == 'success':
             return Response({'payment_url': resp_json['data']['checkout_url'], 'tx_ref': tx_ref})
         else:
-            payment.chapa_status = 'failed'
-            payment.save()
+            fail_payment(payment)
             return Response({'error': resp_json.get('message', 'Chapa error')}, status=400)
 
 
 class ChapaCallbackView(generics.GenericAPIView):
+    """Records Chapa's notification in the callback inbox; the inbox workers settle the payment."""
     permission_classes = [permissions.AllowAny]
 
     def post(self, request):
-        tx_ref = request.data.get('tx_ref') or request.GET.get('tx_ref')
+        # Chapa sends the reference back as trx_ref
+        tx_ref = (
+            request.data.get('tx_ref') or request.data.get('trx_ref')
+            or request.GET.get('tx_ref') or request.GET.get('trx_ref')
+        )
         if not tx_ref:
             return Response({'error': 'tx_ref required'}, status=400)
 
-        try:
-            payment = Payment.objects.get(chapa_tx_ref=tx_ref)
-        except Payment.DoesNotExist:
+        payment_status = receive(tx_ref, notification(request.GET, request.data))
+        if payment_status is None:
             return Response({'error': 'Payment not found'}, status=404)
 
-        chapa_url = f"{settings.CHAPA_BASE_URL}/transaction/verify/{tx_ref}"
-        headers = {
-            "Authorization": f"Bearer {settings.CHAPA_SECRET_KEY}",
-        }
-
-        response = requests.get(chapa_url, headers=headers)
-        resp_json = response.json()
-
-        if resp_json.get('status') == 'success' and resp_json['data']['status'] == 'success':
-            if payment.chapa_status != 'paid':
-                payment.chapa_status = 'paid'
-                payment.save()
-
-                # Create exactly one ticket per successful payment
-                Ticket.objects.create(
-                    attendee=payment.user,
-                    event=payment.event,
-                    payment=payment
-                )
+        data, status_code = callback_result(payment_status)
+        return Response(data, status=status_code)
 
-            return Response({'status': 'paid'})
-        else:
-            payment.chapa_status = 'failed'
-            payment.save()
-            return Response({'status': 'failed'}, status=400)
+    def get(self, request):
+        return self.post(request)
 
 
 class ChapaVerifyPaymentView(generics.GenericAPIView):
@@ -125,42 +144,48 @@ class ChapaVerifyPaymentView(generics.GenericAPIView):
             return Response({'error': 'tx_ref required'}, status=400)
 
         try:
-            payment = Payment.objects.get(chapa_tx_ref=tx_ref)
+            payment = verify_payment(tx_ref)
         except Payment.DoesNotExist:
             return Response({'error': 'Payment not found'}, status=404)
+        except ChapaError:
+            return Response({'error': 'Payment gateway unavailable'}, status=502)
 
-        chapa_url = f"{settings.CHAPA_BASE_URL}/transaction/verify/{tx_ref}"
-        headers = {
-            "Authorization": f"Bearer {settings.CHAPA_SECRET_KEY}",
-        }
-
-        response = requests.get(chapa_url, headers=headers)
-        resp_json = response.json()
-
-        if resp_json.get('status') == 'success' and resp_json['data']['status'] == 'success':
-            if payment.chapa_status != 'paid':
-                payment.chapa_status = 'paid'
-                payment.save()
-
-                # Create one ticket per payment
-                Ticket.objects.create(
-                    attendee=payment.user,
-                    event=payment.event,
-                    payment=payment
-                )
-
-            return Response({
-                'status': 'paid',
-                'amount': payment.amount,
-                'event': payment.event.title,
-                'user': payment.user.username,
-                'tickets': Ticket.objects.filter(payment=payment).count(),
-                'tx_ref': payment.chapa_tx_ref,
-            })
-        else:
-            payment.chapa_status = 'failed'
-            payment.save()
-            return Response({'status': 'failed'}, status=400)
+        tickets = Ticket.objects.filter(payment=payment).count() if payment.chapa_status == PAID else 0
+        data, status_code = verification_result(payment, tickets)
+        return Response(data, status=status_code)
+
+
+class OrganizerSalesView(generics.GenericAPIView):
+    """
+    Sales over time for the organizer's events, or one of them with
+    `?event=<id>`, answered from the rollups (see Payment.rollups): tickets
+    sold, gross revenue and failed payments per `?interval=` (hour or day)
+    over [`?start=`, `?end=`), by default the last 30 days.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+        if getattr(user, 'role', None) != 'organizer':
+            return Response({"detail": "Not authorized."}, status=403)
+
+        query = SalesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        end = query.validated_data.get('end') or timezone.now()
+        start = query.validated_data.get('start') or end - timedelta(days=30)
+        interval = query.validated_data['interval']
+
+        buckets = SalesBucket.objects.filter(event__organizer=user)
+        if 'event' in query.validated_data:
+            buckets = buckets.filter(event_id=query.validated_data['event'])
+        totals, series = sales_series(buckets, interval, start, end)
+        return Response({
+            'interval': interval,
+            'start': start,
+            'end': end,
+            'totals': SalesSerializer(totals).data,
+            'series': SalesPeriodSerializer(series, many=True).data,
+        })
 
 
 class PaymentSuccessView(TemplateView):
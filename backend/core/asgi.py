@@ -9,8 +9,41 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from asgiref.wsgi import WsgiToAsgi
+from django.conf import settings
 from django.core.asgi import get_asgi_application
+from whitenoise import WhiteNoise
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# ManifestStaticFilesStorage names: app.3f2c9d1e8a7b.css
+HASHED_FILE = r'^.+\.[0-9a-f]{12}\..+$'
+
+
+def not_found(environ, start_response):
+    start_response('404 Not Found', [('Content-Type', 'text/plain')])
+    return [b'Not Found']
+
+
+def with_static_files(app):
+    """
+    Serve STATIC_URL ahead of `app`. WhiteNoiseMiddleware is sync-only, so in
+    the middleware chain it would make Django adapt every async request to
+    sync and back; in ASGI mode settings leaves it out and it runs here,
+    outside the chain, for static requests only.
+    """
+    static_files = WsgiToAsgi(WhiteNoise(
+        not_found, root=settings.STATIC_ROOT, prefix=settings.STATIC_URL, immutable_file_test=HASHED_FILE,
+    ))
+
+    async def application(scope, receive, send):
+        if scope['type'] == 'http' and scope['path'].startswith(settings.STATIC_URL):
+            return await static_files(scope, receive, send)
+        return await app(scope, receive, send)
+
+    return application
+
+
+application = with_static_files(django_application) if settings.ASGI_MODE else django_application
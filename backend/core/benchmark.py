@@ -0,0 +1,399 @@
+"""
+In-process API benchmarks.
+
+Each scenario replays one endpoint through Django's test client against a
+seeded throwaway database (created like the test runner's), with Chapa
+replaced by a local FakeChapaServer. Every iteration records its latency and
+SQL query count; a run reports throughput, latency percentiles and queries
+per iteration, and can be compared with a baseline file to flag regressions.
+
+Query counts are deterministic and are what the comparison gates on by
+default. Latency depends on the machine, so comparing it is opt-in: each
+run times a fixed CPU-bound calibration workload, the baseline's p95s are
+scaled by the ratio of this machine's calibration time to the baseline's,
+and only a p95 above that by more than a tolerance is flagged.
+
+Scenarios that do not need the fixtures (the anonymous event list family)
+can also be run against an existing database, such as one filled by
+`manage.py seed`, to see how the endpoints behave at production scale.
+"""
+import json
+import random
+import statistics
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from events.models import Event
+from feedback.models import Feedback
+from feedback.ratings import rebuild_ratings
+from Payment.models import Payment
+from tickets.inventory import sync_inventory
+from tickets.models import Ticket
+from users.models import CustomUser
+
+PASSWORD = 'bench-password'
+SEARCH_WORDS = ('jazz', 'summit', 'marathon', 'festival', 'python', 'comedy', 'expo', 'startup')
+CATEGORIES = [choice for choice, _ in Event.CATEGORY_CHOICES]
+
+
+@dataclass
+class BenchmarkData:
+    organizer: CustomUser
+    organizer_token: str
+    attendee_tokens: list
+    events: list
+    # Buyers for the payment flow, one per iteration; a user buys once per event
+    buyer_tokens: list = field(default_factory=list)
+    on_sale: Event = None
+
+
+def create_fixtures(users=200, events=50, tickets=1000, feedbacks=500, buyers=0, seed=0):
+    """
+    Seed `users` attendees (plus one organizer owning every event), `events`
+    events and up to `tickets` tickets and `feedbacks` feedbacks on distinct
+    (attendee, event) pairs, all chosen from a fixed random seed.
+    """
+    rng = random.Random(seed)
+    # Hash once; every fixture user shares the password
+    password = make_password(PASSWORD)
+    now = timezone.now()
+
+    organizer = CustomUser.objects.create(username='bench-organizer', role='organizer', password=password)
+    attendees = CustomUser.objects.bulk_create(
+        CustomUser(username=f'bench-attendee-{n}', role='attendee', password=password)
+        for n in range(users + buyers)
+    )
+    attendees, buyer_users = attendees[:users], attendees[users:]
+    # Saved one by one so the search index triggers and signals run
+    event_rows = [
+        Event.objects.create(
+            title=f'{rng.choice(SEARCH_WORDS).title()} {rng.choice(SEARCH_WORDS).title()} {n}',
+            description=' '.join(rng.choices(SEARCH_WORDS, k=60)),
+            location=rng.choice(('Addis Ababa', 'Bahir Dar', 'Hawassa', 'Gondar')),
+            category=rng.choice(CATEGORIES),
+            date=now + timedelta(days=rng.randint(-30, 180), hours=rng.randint(0, 23)),
+            price=rng.choice((0, 100, 250, 500)),
+            organizer=organizer,
+        )
+        for n in range(events)
+    ]
+
+    pairs = [(attendee, event) for attendee in attendees for event in event_rows]
+    Ticket.objects.bulk_create(
+        Ticket(attendee=attendee, event=event) for attendee, event in rng.sample(pairs, min(tickets, len(pairs)))
+    )
+    Feedback.objects.bulk_create(
+        Feedback(attendee=attendee, event=event, comment='Benchmark feedback', rating=rng.choices(
+            (1, 2, 3, 4, 5), weights=(1, 1, 2, 4, 6),
+        )[0])
+        for attendee, event in rng.sample(pairs, min(feedbacks, len(pairs)))
+    )
+    # bulk_create bypasses the rating signals
+    rebuild_ratings()
+
+    on_sale = None
+    if buyers:
+        on_sale = Event.objects.create(
+            title='Benchmark on-sale', description='Payment flow', location='Addis Ababa',
+            date=now + timedelta(days=30), price=100, capacity=buyers, organizer=organizer,
+        )
+        sync_inventory(on_sale)
+
+    tokens = Token.objects.bulk_create(
+        Token(user=user, key=Token.generate_key()) for user in [organizer, *attendees, *buyer_users]
+    )
+    keys = [token.key for token in tokens]
+    return BenchmarkData(
+        organizer=organizer,
+        organizer_token=keys[0],
+        attendee_tokens=keys[1:users + 1],
+        events=event_rows,
+        buyer_tokens=keys[users + 1:],
+        on_sale=on_sale,
+    )
+
+
+def client_for(token=None):
+    client = APIClient()
+    if token:
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token}')
+    return client
+
+
+class Scenario:
+    """One benchmarked interaction; run() performs iteration `n` and returns its responses."""
+    name = None
+    description = ''
+    settings = {}
+    # Whether run() relies on create_fixtures() data; others run against any database
+    needs_fixtures = True
+
+    def __init__(self, data):
+        self.data = data
+
+    def run(self, n):
+        raise NotImplementedError
+
+
+class EventList(Scenario):
+    name = 'event_list'
+    description = 'GET /api/events/, anonymous, response cache off'
+    settings = {'EVENT_CACHE_TIMEOUT': 0}
+    needs_fixtures = False
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.client = client_for()
+
+    def run(self, n):
+        return [self.client.get('/api/events/')]
+
+
+class EventListCached(EventList):
+    name = 'event_list_cached'
+    description = 'GET /api/events/, anonymous, served from the response cache'
+    settings = {}
+
+
+class EventCards(EventList):
+    name = 'event_cards'
+    description = 'GET /api/events/?fields=<card fields>, response cache off'
+
+    def run(self, n):
+        return [self.client.get('/api/events/', {'fields': 'id,title,date,price,location,category'})]
+
+
+class EventUpcoming(EventList):
+    name = 'event_upcoming'
+    description = 'GET /api/events/?upcoming=true with card fields, response cache off'
+
+    def filters(self, n):
+        return {}
+
+    def run(self, n):
+        return [self.client.get('/api/events/', {
+            'upcoming': 'true', 'fields': 'id,title,date,price,location,category', **self.filters(n),
+        })]
+
+
+class EventCategory(EventUpcoming):
+    name = 'event_category'
+    description = 'GET /api/events/?upcoming=true&category=<category>, response cache off'
+
+    def filters(self, n):
+        return {'category': CATEGORIES[n % len(CATEGORIES)]}
+
+
+class EventPriceBand(EventUpcoming):
+    name = 'event_price_band'
+    description = 'GET /api/events/?upcoming=true&min_price=100&max_price=300, response cache off'
+
+    def filters(self, n):
+        return {'min_price': '100', 'max_price': '300'}
+
+
+class EventSearch(EventList):
+    name = 'event_search'
+    description = 'GET /api/events/?search=<word>, response cache off'
+
+    def run(self, n):
+        return [self.client.get('/api/events/', {'search': SEARCH_WORDS[n % len(SEARCH_WORDS)]})]
+
+
+class OrganizerTickets(Scenario):
+    name = 'organizer_tickets'
+    description = "GET /api/organizer/tickets/ for an organizer with every event's tickets"
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.client = client_for(data.organizer_token)
+
+    def run(self, n):
+        return [self.client.get('/api/organizer/tickets/')]
+
+
+class TicketWalletPoll(Scenario):
+    name = 'ticket_wallet_poll'
+    description = 'GET /api/my-ticket-wallet/ with If-None-Match, as a polling client does'
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.client = client_for(data.attendee_tokens[0])
+        self.etag = None
+
+    def run(self, n):
+        headers = {'If-None-Match': self.etag} if self.etag else {}
+        response = self.client.get('/api/my-ticket-wallet/', headers=headers)
+        self.etag = response.get('ETag', self.etag)
+        return [response]
+
+
+class FeedbackList(Scenario):
+    name = 'feedback_list'
+    description = 'GET /api/events/<id>/feedback/ as an attendee'
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.client = client_for(data.attendee_tokens[0])
+
+    def run(self, n):
+        event = self.data.events[n % len(self.data.events)]
+        return [self.client.get(f'/api/events/{event.id}/feedback/')]
+
+
+class Login(Scenario):
+    name = 'login'
+    description = 'POST /api/users/login/ (password hashing dominates)'
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.client = client_for()
+
+    def run(self, n):
+        return [self.client.post('/api/users/login/', {
+            'username': f'bench-attendee-{n % len(self.data.attendee_tokens)}', 'password': PASSWORD,
+        }, format='json')]
+
+
+class PaymentFlow(Scenario):
+    name = 'payment_flow'
+    description = 'POST /api/payments/chapa/init/ then GET .../verify/, against the fake Chapa'
+
+    def run(self, n):
+        client = client_for(self.data.buyer_tokens[n])
+        init = client.post('/api/payments/chapa/init/', {'event_id': self.data.on_sale.id}, format='json')
+        verify = client.get('/api/payments/chapa/verify/', {'tx_ref': init.json().get('tx_ref')})
+        return [init, verify]
+
+
+class ChapaCallback(Scenario):
+    name = 'chapa_callback'
+    description = 'POST /api/payments/chapa/callback/ for a pending payment, queued in the callback inbox'
+    # Distinct pending payments; iterations beyond this repeat callbacks already queued
+    payments = 500
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.client = client_for()
+        event = data.events[0]
+        self.tx_refs = [f'bench-callback-{n}' for n in range(self.payments)]
+        Payment.objects.bulk_create(
+            Payment(user=data.organizer, event=event, amount=event.price, chapa_tx_ref=tx_ref)
+            for tx_ref in self.tx_refs
+        )
+
+    def run(self, n):
+        return [self.client.post('/api/payments/chapa/callback/', {
+            'trx_ref': self.tx_refs[n % self.payments], 'status': 'success',
+        }, format='json')]
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (
+        EventList, EventListCached, EventCards, EventUpcoming, EventCategory, EventPriceBand, EventSearch,
+        OrganizerTickets, TicketWalletPoll, FeedbackList, Login, PaymentFlow, ChapaCallback,
+    )
+}
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_scenario(scenario, iterations, warmup=5):
+    """Run `warmup` untimed iterations, then `iterations` timed ones, numbered on from the warmup."""
+    # One process, so the in-process caches are safe whatever the deployment defaults
+    defaults = {'AUTH_TOKEN_CACHE': 'local', 'EVENT_CACHE_TIMEOUT': 300, 'WALLET_CACHE_TIMEOUT': 3600}
+    with override_settings(**{**defaults, **scenario.settings}):
+        cache.clear()
+        for n in range(warmup):
+            scenario.run(n)
+        latencies = []
+        queries = []
+        sizes = []
+        started = time.perf_counter()
+        for n in range(warmup, warmup + iterations):
+            with CaptureQueriesContext(connection) as captured:
+                began = time.perf_counter()
+                responses = scenario.run(n)
+                latencies.append(time.perf_counter() - began)
+            queries.append(len(captured))
+            sizes.append(sum(len(response.content) for response in responses))
+            for response in responses:
+                if response.status_code >= 400:
+                    raise RuntimeError(f'{scenario.name}: HTTP {response.status_code} {response.content[:200]!r}')
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'iterations': iterations,
+        'rps': round(iterations / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 2),
+        'queries': round(statistics.fmean(queries), 1),
+        'bytes': round(statistics.fmean(sizes)),
+    }
+
+
+def calibrate(rounds=5):
+    """Milliseconds this machine takes for a fixed pure-Python workload (best of `rounds`)."""
+    document = [
+        {'id': n, 'title': f'Event {n}', 'price': f'{n % 500}.00', 'tags': ['a', 'b', 'c']}
+        for n in range(2000)
+    ]
+    best = None
+    for _ in range(rounds):
+        began = time.perf_counter()
+        for _ in range(10):
+            sorted(json.loads(json.dumps(document)), key=lambda item: (item['price'], -item['id']))
+        elapsed = time.perf_counter() - began
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best * 1000, 2)
+
+
+def compare(results, baseline, tolerance=None, scale=1.0):
+    """
+    Regressions of `results` against `baseline`, as readable messages. Query
+    counts must not grow. With a `tolerance`, a p95 more than that fraction
+    above the baseline's, times `scale` (see calibrate()), is one too.
+    """
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result['queries'] > expected['queries']:
+            regressions.append(f"{name}: {result['queries']} queries per iteration, baseline {expected['queries']}")
+        allowed = expected['p95_ms'] * scale
+        if tolerance is not None and result['p95_ms'] > allowed * (1 + tolerance):
+            regressions.append(
+                f"{name}: p95 {result['p95_ms']}ms, baseline {allowed:.2f}ms on this machine "
+                f"(+{tolerance:.0%} allowed)"
+            )
+    return regressions
+
+
+def load_baseline(path):
+    with open(path) as baseline:
+        return json.load(baseline)
+
+
+def write_baseline(path, results, fixtures, calibration_ms):
+    with open(path, 'w') as baseline:
+        json.dump(
+            {'calibration_ms': calibration_ms, 'fixtures': fixtures, 'scenarios': results},
+            baseline, indent=2, sort_keys=True,
+        )
+        baseline.write('\n')
@@ -0,0 +1,139 @@
+"""
+Versioned response caching for public, read-heavy endpoints.
+
+Cached responses are keyed by one or more *generations*: counters in the
+cache that are bumped whenever the data behind a response changes. Bumping a
+generation orphans every entry built from it, so invalidation never has to
+enumerate keys, and it works the same on every cache backend. Generations
+start from a timestamp rather than 1, so a flushed cache can never hand out
+a key or ETag that was already used for different content. They only work
+when every process shares the cache backend, see core.checks.
+
+The ETag of a response is derived from its key, so a matching
+`If-None-Match` is answered with a 304 without rendering anything. Views
+whose answer also depends on something other than the data, such as the
+current time, pass it as `extra` (name, value) pairs folded into the key.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+
+
+def generation(name):
+    key = f'gen:{name}'
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        value = cache.get(key)
+    return value
+
+
+async def ageneration(name):
+    key = f'gen:{name}'
+    value = await cache.aget(key)
+    if value is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        value = await cache.aget(key)
+    return value
+
+
+def bump(*names):
+    """
+    Invalidate everything cached under the given generations. Bumped again
+    once the current transaction commits, so a response rebuilt from the
+    old rows before the commit does not outlive it.
+    """
+    def bump_now():
+        for name in names:
+            key = f'gen:{name}'
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.add(key, time.time_ns(), timeout=None)
+    bump_now()
+    transaction.on_commit(bump_now)
+
+
+def response_key(request, versions):
+    """Cache key and ETag for `request` given (generation, value) pairs."""
+    versions = ':'.join(f'{name}={value}' for name, value in versions)
+    digest = hashlib.md5(f'{request.get_full_path()}|{versions}'.encode()).hexdigest()
+    return f'response:{digest}', f'"{digest}"'
+
+
+async def acached_response(request, generations, timeout_setting='EVENT_CACHE_TIMEOUT', extra=()):
+    """
+    Async fast path in front of a CachedResponseMixin view: the cached
+    response (or a 304) for an anonymous JSON GET, or None when the view
+    itself has to run.
+    """
+    if (
+        not getattr(settings, timeout_setting)
+        or 'Authorization' in request.headers
+        or 'text/html' in request.headers.get('Accept', '')
+        or 'format' in request.GET
+    ):
+        return None
+    key, etag = response_key(request, [*[(name, await ageneration(name)) for name in generations], *extra])
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        entry = await cache.aget(key)
+        if entry is None:
+            return None
+        content, content_type = entry
+        response = HttpResponse(content, content_type=content_type)
+    response['ETag'] = etag
+    patch_vary_headers(response, ['Authorization'])
+    return response
+
+
+class CachedResponseMixin:
+    """
+    For viewsets whose anonymous JSON responses are the same for everyone.
+    Views call `cached_response(request, generations, handler)` from their
+    handlers; authenticated requests and other formats go straight through.
+    """
+    cache_timeout_setting = 'EVENT_CACHE_TIMEOUT'
+
+    def response_is_cacheable(self, request):
+        return (
+            getattr(settings, self.cache_timeout_setting)
+            and request.method == 'GET'
+            and not request.user.is_authenticated
+            and request.accepted_renderer.format == 'json'
+        )
+
+    def cached_response(self, request, generations, handler, extra=()):
+        if not self.response_is_cacheable(request):
+            return handler()
+
+        key, etag = response_key(request, [*[(name, generation(name)) for name in generations], *extra])
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        else:
+            entry = cache.get(key)
+            if entry is not None:
+                content, content_type = entry
+                response = HttpResponse(content, content_type=content_type)
+            else:
+                response = handler()
+                if response.status_code != 200:
+                    return response
+                response.accepted_renderer = request.accepted_renderer
+                response.accepted_media_type = request.accepted_media_type
+                response.renderer_context = self.get_renderer_context()
+                response.render()
+                cache.set(
+                    key, (response.content, response['Content-Type']),
+                    getattr(settings, self.cache_timeout_setting),
+                )
+        response['ETag'] = etag
+        patch_vary_headers(response, ['Authorization'])
+        return response
@@ -0,0 +1,104 @@
+"""
+System checks for deployment settings.
+
+The token cache check stops a per-process authentication cache from
+running under several workers, where logout would not reach the others.
+The response cache check does the same for caches whose invalidations come
+from other processes, such as the callback and reconcile workers.
+
+The connection budget check needs a database connection, so it is tagged
+`database` and runs with `migrate` (and `check --database default`), which
+the container entrypoint runs on every start.
+"""
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+from django.db import DatabaseError, connections
+
+# psycopg_pool's default size when OPTIONS['pool'] is just True
+DEFAULT_POOL_SIZE = 4
+
+
+def connections_per_worker(connection):
+    pool = connection.settings_dict.get('OPTIONS', {}).get('pool')
+    if not pool:
+        return 1
+    if pool is True:
+        return DEFAULT_POOL_SIZE
+    return pool.get('max_size') or pool.get('min_size', DEFAULT_POOL_SIZE)
+
+
+def connection_limit(connection):
+    """Connections the server accepts from ordinary roles, or None if unknown."""
+    if connection.vendor != 'postgresql':
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT current_setting('max_connections')::int"
+                " - current_setting('superuser_reserved_connections')::int"
+            )
+            return cursor.fetchone()[0]
+    except DatabaseError:
+        return None
+
+
+@register(Tags.database)
+def check_connection_budget(app_configs, databases=None, **kwargs):
+    warnings = []
+    for alias in databases or ():
+        connection = connections[alias]
+        limit = connection_limit(connection)
+        per_worker = connections_per_worker(connection)
+        wanted = settings.WEB_CONCURRENCY * per_worker
+        if limit is not None and wanted > limit:
+            warnings.append(Warning(
+                f"{settings.WEB_CONCURRENCY} workers with up to {per_worker} "
+                f"connections each may open {wanted} connections to database '{alias}', "
+                f"but the server accepts {limit}.",
+                hint="Lower WEB_CONCURRENCY or DB_POOL_MAX_SIZE, or raise max_connections. "
+                     "Other instances and background workers share the same limit.",
+                id='core.W001',
+            ))
+    return warnings
+
+
+@register(Tags.security)
+def check_token_cache(app_configs, **kwargs):
+    per_process = settings.AUTH_TOKEN_CACHE == 'local' or (
+        settings.AUTH_TOKEN_CACHE == 'shared' and settings.CACHE_BACKEND == 'locmem'
+    )
+    if per_process and settings.WEB_CONCURRENCY > 1:
+        return [Error(
+            f"AUTH_TOKEN_CACHE={settings.AUTH_TOKEN_CACHE!r} keeps tokens per process, so with "
+            f"{settings.WEB_CONCURRENCY} workers a logged out or deactivated user stays "
+            f"signed in on the others for up to {settings.AUTH_TOKEN_CACHE_TTL}s.",
+            hint="Use AUTH_TOKEN_CACHE=shared with CACHE_BACKEND=redis or file, "
+                 "or AUTH_TOKEN_CACHE=off.",
+            id='core.E001',
+        )]
+    return []
+
+
+@register()
+def check_response_caches(app_configs, **kwargs):
+    errors = []
+    if settings.CACHE_BACKEND != 'locmem':
+        return errors
+    if settings.EVENT_CACHE_TIMEOUT:
+        errors.append(Error(
+            "EVENT_CACHE_TIMEOUT is set with the per-process locmem cache: edits made through "
+            "another worker and sales by the callback and reconcile workers would not invalidate "
+            f"this process's event responses for up to {settings.EVENT_CACHE_TIMEOUT}s, and each "
+            "process would hand out its own ETags.",
+            hint="Use CACHE_BACKEND=redis or file, or EVENT_CACHE_TIMEOUT=0.",
+            id='core.E003',
+        ))
+    if settings.WALLET_CACHE_TIMEOUT:
+        errors.append(Error(
+            "WALLET_CACHE_TIMEOUT is set with the per-process locmem cache: tickets issued by "
+            "the callback and reconcile workers would not show in the web workers' cached "
+            f"wallets for up to {settings.WALLET_CACHE_TIMEOUT}s.",
+            hint="Use CACHE_BACKEND=redis or file, or WALLET_CACHE_TIMEOUT=0.",
+            id='core.E002',
+        ))
+    return errors
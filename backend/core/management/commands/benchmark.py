@@ -0,0 +1,121 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+from core import benchmark
+from Payment.fake_chapa import FakeChapaServer
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'baseline.json'
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the main API endpoints in-process against a freshly seeded "
+        "test database and a local fake Chapa. Reports throughput, latency "
+        "percentiles and SQL queries per iteration, and exits non-zero when a "
+        "scenario needs more queries than in the baseline file (or, with "
+        "--check-latency, is slower than it once scaled to this machine)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'scenarios', nargs='*', metavar='scenario',
+            help=f"Scenarios to run (default: all of {', '.join(benchmark.SCENARIOS)}).",
+        )
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--events', type=int, default=50)
+        parser.add_argument('--tickets', type=int, default=1000)
+        parser.add_argument('--feedbacks', type=int, default=500)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE))
+        parser.add_argument('--write-baseline', action='store_true', help="Save this run as the baseline.")
+        parser.add_argument(
+            '--existing', action='store_true',
+            help="Run against the configured database as it is (e.g. after `manage.py seed`) instead of "
+                 "seeding a throwaway one. Only scenarios that need no fixtures; nothing is compared.",
+        )
+        parser.add_argument(
+            '--check-latency', action='store_true',
+            help="Also flag p95 slowdowns, against baseline latencies scaled by a calibration run.",
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.5,
+            help="Allowed p95 slowdown with --check-latency, as a fraction (query counts must not grow at all).",
+        )
+
+    def handle(self, *args, **options):
+        names = options['scenarios'] or list(benchmark.SCENARIOS)
+        unknown = set(names) - set(benchmark.SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+        if options['existing']:
+            if not options['scenarios']:
+                names = [name for name, scenario in benchmark.SCENARIOS.items() if not scenario.needs_fixtures]
+            needy = [name for name in names if benchmark.SCENARIOS[name].needs_fixtures]
+            if needy:
+                raise CommandError(f"Scenarios that need fixtures cannot use --existing: {', '.join(needy)}")
+            if options['write_baseline']:
+                raise CommandError("--existing runs cannot be written as the baseline.")
+            setup_test_environment()
+            try:
+                self.run_scenarios(names, None, options)
+            finally:
+                teardown_test_environment()
+            return
+
+        fixtures = {key: options[key] for key in ('users', 'events', 'tickets', 'feedbacks', 'seed')}
+        runs = options['warmup'] + options['iterations']
+
+        setup_test_environment()
+        databases = setup_databases(verbosity=0, interactive=False, aliases={'default'})
+        try:
+            with FakeChapaServer() as chapa, override_settings(CHAPA_BASE_URL=chapa.url, CHAPA_RETRY_BACKOFF=0):
+                data = benchmark.create_fixtures(
+                    buyers=runs if 'payment_flow' in names else 0, **fixtures,
+                )
+                results = self.run_scenarios(names, data, options)
+        finally:
+            teardown_databases(databases, verbosity=0)
+            teardown_test_environment()
+
+        if options['write_baseline']:
+            benchmark.write_baseline(options['baseline'], results, fixtures, benchmark.calibrate())
+            self.stdout.write(f"Baseline written to {options['baseline']}")
+            return
+        if not Path(options['baseline']).exists():
+            return
+        baseline = benchmark.load_baseline(options['baseline'])
+        if baseline['fixtures'] != fixtures:
+            self.stdout.write(self.style.WARNING("Fixtures differ from the baseline's; not comparing."))
+            return
+        tolerance, scale = None, 1.0
+        if options['check_latency']:
+            calibration = benchmark.calibrate()
+            tolerance, scale = options['tolerance'], calibration / baseline['calibration_ms']
+            self.stdout.write(
+                f"Calibration {calibration}ms against the baseline's {baseline['calibration_ms']}ms; "
+                f"latencies scaled by {scale:.2f}"
+            )
+        regressions = benchmark.compare(results, baseline['scenarios'], tolerance, scale)
+        if regressions:
+            raise CommandError("Regressions against the baseline:\n  " + "\n  ".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
+
+    def run_scenarios(self, names, data, options):
+        results = {}
+        for name in names:
+            result = benchmark.run_scenario(
+                benchmark.SCENARIOS[name](data), options['iterations'], warmup=options['warmup'],
+            )
+            results[name] = result
+            self.stdout.write(
+                f"{name:<18} {result['rps']:8.1f} it/s  p50 {result['p50_ms']:8.2f}ms  "
+                f"p95 {result['p95_ms']:8.2f}ms  p99 {result['p99_ms']:8.2f}ms  "
+                f"{result['queries']:6.1f} queries  {result['bytes']:8d} bytes"
+            )
+        return results
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.outbox import Dispatcher
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver committed outbox messages (PaymentPaid, TicketIssued, "
+        "FeedbackSubmitted, EventChanged) to their handlers, then prune old "
+        "deliveries. Several can run at once; with --loop it keeps running as a worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help="Messages claimed per transaction.")
+        parser.add_argument('--loop', action='store_true', help="Keep running, one pass every --interval.")
+        parser.add_argument('--interval', type=float, default=1, help="Seconds between passes with --loop.")
+
+    def handle(self, *args, **options):
+        dispatcher = Dispatcher(batch_size=options['batch_size'])
+        while True:
+            totals = dispatcher.run_pass()
+            if totals['claimed'] or totals['pruned'] or not options['loop']:
+                self.stdout.write(
+                    "delivered {delivered}, failed {failed}, gave up {dead}, pruned {pruned}".format_map(
+                        {key: totals.get(key, 0) for key in ('delivered', 'failed', 'dead', 'pruned')}
+                    )
+                )
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,86 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.utils import timezone
+
+from core import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic users, events, tickets, payments and feedback at "
+        "scale, deterministically from --seed. Adds to the existing data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--events', type=int, default=1_000)
+        parser.add_argument('--tickets', type=int, default=100_000, help="Total tickets.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--alpha', type=float, default=1.1, help="Power-law exponent of tickets per event.")
+        parser.add_argument(
+            '--anchor', type=str, default=None,
+            help="Date (YYYY-MM-DD) treated as today, for reproducible timestamps. Defaults to today.",
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help="Processes writing tickets, payments and feedback (PostgreSQL only).",
+        )
+
+    def handle(self, *args, **options):
+        if options['users'] < 2 or options['events'] < 1:
+            raise CommandError("Need at least 2 users (one organizer) and 1 event.")
+        if options['anchor']:
+            anchor = datetime.strptime(options['anchor'], '%Y-%m-%d').replace(tzinfo=dt_timezone.utc)
+        else:
+            anchor = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        workers = options['workers']
+        if workers > 1 and connection.vendor != 'postgresql':
+            self.stderr.write("Parallel writers need PostgreSQL; using one.")
+            workers = 1
+
+        started = time.perf_counter()
+        chunks = seed.plan(
+            options['users'], options['events'], options['tickets'],
+            seed=options['seed'], alpha=options['alpha'], anchor=anchor,
+        )
+        self.stdout.write(
+            f"{options['users']} users and {options['events']} events in {time.perf_counter() - started:.1f}s"
+        )
+        planned = sum(event.tickets for chunk in chunks for event in chunk.events)
+        if planned < options['tickets']:
+            self.stderr.write(
+                f"Only {planned} of {options['tickets']} tickets fit: an attendee holds at most "
+                f"one ticket per event, and every event is full."
+            )
+
+        totals = [0, 0, 0]
+        if workers > 1:
+            # Children must not inherit open connections
+            connections.close_all()
+            with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork')) as pool:
+                for done, counts in enumerate(pool.map(seed.run_chunk, chunks), 1):
+                    totals = [total + count for total, count in zip(totals, counts)]
+                    self.progress(done, len(chunks), totals, started)
+        else:
+            for done, chunk in enumerate(chunks, 1):
+                totals = [total + count for total, count in zip(totals, seed.seed_chunk(chunk))]
+                self.progress(done, len(chunks), totals, started)
+
+        seed.finish()
+        tickets, payments, feedbacks = totals
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {tickets} tickets, {payments} payments and {feedbacks} feedbacks in {elapsed:.1f}s "
+            f"({tickets / elapsed:,.0f} tickets/s)"
+        ))
+
+    def progress(self, done, total, totals, started):
+        if done == total or done % 10 == 0:
+            self.stdout.write(
+                f"  {done}/{total} chunks, {totals[0]} tickets, {time.perf_counter() - started:.1f}s"
+            )
@@ -0,0 +1,45 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+
+from . import perf
+
+
+class PerformanceMiddleware:
+    """
+    Record wall time, SQL, serializer and outbound HTTP time per request
+    (see core.perf). Drops out of the middleware chain unless PERF_ENABLED.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PERF_ENABLED:
+            raise MiddlewareNotUsed()
+        connection_created.connect(perf.instrument_connection, dispatch_uid='core.perf')
+        perf.install_serializer_hooks()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        perf.instrument_thread_connections()
+        started = time.perf_counter()
+        record, token = perf.start_request(request)
+        response = self.get_response(request)
+        perf.finish_request(record, token, request, response, started)
+        return response
+
+    async def __acall__(self, request):
+        # Queries run in sync_to_async threads, whose connections are
+        # instrumented as they are created
+        started = time.perf_counter()
+        record, token = perf.start_request(request)
+        response = await self.get_response(request)
+        perf.finish_request(record, token, request, response, started)
+        return response
@@ -0,0 +1,35 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxMessage(models.Model):
+    """
+    A domain event, written in the same transaction as the change it
+    describes and delivered to in-process handlers afterwards by
+    core.outbox.Dispatcher.
+    """
+    topic = models.CharField(max_length=50)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(default=timezone.now)
+    # Not handed out again before this; pushed back after each failed attempt
+    available_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The dispatcher's queue: only undelivered rows, in claim order
+            models.Index(
+                fields=['available_at', 'id'], name='outbox_pending_idx',
+                condition=models.Q(dispatched_at__isnull=True),
+            ),
+            # Throughput, latency and pruning look at delivered rows by time
+            models.Index(
+                fields=['dispatched_at'], name='outbox_dispatched_idx',
+                condition=models.Q(dispatched_at__isnull=False),
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.topic} #{self.id}'
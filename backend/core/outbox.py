@@ -0,0 +1,205 @@
+"""
+Transactional outbox for domain events.
+
+publish() writes an OutboxMessage through the caller's connection, so the
+message commits or rolls back together with the change it describes: a paid
+payment, an issued ticket, submitted feedback or an edited event is never
+announced without having happened, and never happens without being
+announced.
+
+Dispatcher delivers committed messages to in-process handlers, registered
+with subscribe() or listed by dotted path in the OUTBOX_HANDLERS setting
+(topic -> paths, '*' for every topic). It claims a batch of due messages
+with SELECT ... FOR UPDATE SKIP LOCKED, so several dispatchers can drain the
+queue side by side, runs each message's handlers in a savepoint and marks
+the batch delivered in the same transaction. Delivery is at least once: a
+message whose handler raises is retried with exponential backoff, running
+all of its handlers again, and a dispatcher that dies mid-batch leaves its
+messages to be claimed again. Handlers must therefore be idempotent. After
+OUTBOX_MAX_ATTEMPTS failures a message is left in the table, undelivered,
+for someone to look at.
+
+Delivered messages are pruned after OUTBOX_RETENTION_HOURS. Until then they
+give the throughput and delivery latency reported by stats() and, next to
+the backlog and its age, at /api/perf/metrics.
+"""
+import logging
+import time
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, DurationField, F, Min, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import OutboxMessage
+from .perf import escape
+
+logger = logging.getLogger(__name__)
+
+PAYMENT_PAID = 'PaymentPaid'
+TICKET_ISSUED = 'TicketIssued'
+FEEDBACK_SUBMITTED = 'FeedbackSubmitted'
+EVENT_CHANGED = 'EventChanged'
+ALL_TOPICS = '*'
+
+# Retry delays double from OUTBOX_RETRY_BACKOFF up to this
+MAX_BACKOFF = timedelta(hours=1)
+
+_handlers = defaultdict(list)
+
+
+def publish(topic, payload):
+    """Queue `payload` (JSON-serializable) under `topic`, in the caller's transaction."""
+    return OutboxMessage.objects.create(topic=topic, payload=payload)
+
+
+def publish_many(topic, payloads):
+    """publish() for a batch, in one insert."""
+    return OutboxMessage.objects.bulk_create(OutboxMessage(topic=topic, payload=payload) for payload in payloads)
+
+
+def subscribe(topic, handler=None):
+    """
+    Deliver `topic` messages (ALL_TOPICS for every message) to
+    handler(message). Usable as a decorator.
+    """
+    if handler is None:
+        return lambda handler: subscribe(topic, handler)
+    _handlers[topic].append(handler)
+    return handler
+
+
+def unsubscribe(topic, handler):
+    _handlers[topic].remove(handler)
+
+
+def handlers_for(topic):
+    configured = settings.OUTBOX_HANDLERS
+    paths = [*configured.get(topic, ()), *configured.get(ALL_TOPICS, ())]
+    return [*_handlers[topic], *_handlers[ALL_TOPICS], *map(import_string, paths)]
+
+
+def backoff(attempts):
+    return min(timedelta(seconds=settings.OUTBOX_RETRY_BACKOFF * 2 ** (attempts - 1)), MAX_BACKOFF)
+
+
+class Dispatcher:
+    def __init__(self, batch_size=100):
+        self.batch_size = batch_size
+        self.max_attempts = settings.OUTBOX_MAX_ATTEMPTS
+
+    def due(self):
+        return OutboxMessage.objects.filter(
+            dispatched_at__isnull=True, available_at__lte=timezone.now(), attempts__lt=self.max_attempts,
+        ).order_by('available_at', 'id')
+
+    def run_pass(self):
+        """Deliver every message that is due, then prune old deliveries. Returns the pass totals."""
+        started = time.monotonic()
+        totals = Counter()
+        while True:
+            counts = self.dispatch_batch()
+            totals.update(counts)
+            if counts['claimed'] < self.batch_size:
+                break
+        totals['pruned'] = self.prune()
+        logger.info("Outbox pass in %.3fs: %s", time.monotonic() - started, dict(totals))
+        return totals
+
+    def dispatch_batch(self):
+        """Claim up to batch_size due messages and deliver them. Returns the batch counts."""
+        counts = Counter()
+        with transaction.atomic():
+            messages = list(self.due().select_for_update(skip_locked=True)[:self.batch_size])
+            counts['claimed'] = len(messages)
+            delivered, failed = [], []
+            for message in messages:
+                error = self.deliver(message)
+                if error is None:
+                    delivered.append(message.id)
+                    counts['delivered'] += 1
+                    continue
+                message.attempts += 1
+                message.available_at = timezone.now() + backoff(message.attempts)
+                message.last_error = f'{type(error).__name__}: {error}'
+                failed.append(message)
+                counts['failed'] += 1
+                if message.attempts >= self.max_attempts:
+                    counts['dead'] += 1
+                    logger.error("Outbox message %s gave up after %d attempts", message, message.attempts)
+            if delivered:
+                OutboxMessage.objects.filter(id__in=delivered).update(dispatched_at=timezone.now())
+            if failed:
+                OutboxMessage.objects.bulk_update(failed, ['attempts', 'available_at', 'last_error'])
+        return counts
+
+    def deliver(self, message):
+        """Run the message's handlers, each in a savepoint. Returns the first error, or None."""
+        for handler in handlers_for(message.topic):
+            try:
+                with transaction.atomic():
+                    handler(message)
+            except Exception as exc:
+                logger.warning("Outbox handler %r failed on %s", handler, message, exc_info=True)
+                return exc
+        return None
+
+    def prune(self):
+        cutoff = timezone.now() - timedelta(hours=settings.OUTBOX_RETENTION_HOURS)
+        deleted, _ = OutboxMessage.objects.filter(dispatched_at__lt=cutoff).delete()
+        return deleted
+
+
+def stats(window=timedelta(minutes=5)):
+    """
+    Per-topic backlog and delivery figures: undelivered `pending` messages
+    (`dead` of them out of attempts), the age of the oldest live one
+    (`lag_seconds`), and over the last `window` the `throughput` per second
+    and mean `latency_seconds` from publish to delivery.
+    """
+    now = timezone.now()
+    # Dead messages stay pending but no longer hold the lag up
+    live = Q(attempts__lt=settings.OUTBOX_MAX_ATTEMPTS)
+    topics = defaultdict(lambda: {
+        'pending': 0, 'dead': 0, 'lag_seconds': 0.0, 'throughput': 0.0, 'latency_seconds': 0.0,
+    })
+    backlog = (
+        OutboxMessage.objects.filter(dispatched_at__isnull=True).values('topic').order_by()
+        .annotate(pending=Count('id'), dead=Count('id', filter=~live), oldest=Min('created_at', filter=live))
+    )
+    for row in backlog:
+        topics[row['topic']].update(
+            pending=row['pending'], dead=row['dead'],
+            lag_seconds=(now - row['oldest']).total_seconds() if row['oldest'] else 0.0,
+        )
+    recent = (
+        OutboxMessage.objects.filter(dispatched_at__gte=now - window).values('topic').order_by()
+        .annotate(delivered=Count('id'), latency=Avg(F('dispatched_at') - F('created_at'), output_field=DurationField()))
+    )
+    for row in recent:
+        topics[row['topic']].update(
+            throughput=row['delivered'] / window.total_seconds(),
+            latency_seconds=row['latency'].total_seconds() if row['latency'] else 0.0,
+        )
+    return dict(sorted(topics.items()))
+
+
+def prometheus():
+    """stats() in the Prometheus text format."""
+    topics = stats()
+    lines = []
+    for name, key, help_text in (
+        ('outbox_pending_messages', 'pending', 'Undelivered outbox messages.'),
+        ('outbox_dead_messages', 'dead', 'Undelivered outbox messages that ran out of attempts.'),
+        ('outbox_lag_seconds', 'lag_seconds', 'Age of the oldest undelivered outbox message.'),
+        ('outbox_delivered_per_second', 'throughput', 'Outbox messages delivered per second, last 5 minutes.'),
+        ('outbox_delivery_latency_seconds', 'latency_seconds', 'Mean publish-to-delivery time, last 5 minutes.'),
+    ):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} gauge')
+        for topic, values in topics.items():
+            lines.append(f'{name}{{topic="{escape(topic)}"}} {round(values[key], 6)}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,32 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+from rest_framework.settings import api_settings
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor (keyset) pagination: each page continues from the last row of
+    the previous one with a `WHERE key > cursor` lookup, so deep pages cost
+    the same as the first page. Subclasses pick the ordering key.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = settings.API_MAX_PAGE_SIZE
+    ordering = ('-created_at', '-id')
+
+
+class EventCursorPagination(KeysetPagination):
+    ordering = ('date', 'id')
+
+    def get_ordering(self, request, queryset, view):
+        # Full-text search results are paged by relevance, unless the
+        # client asked for an explicit ?ordering=
+        if (
+            'search_rank' in queryset.query.annotations
+            and not request.query_params.get(api_settings.ORDERING_PARAM)
+        ):
+            return ('-search_rank', 'id')
+        return super().get_ordering(request, queryset, view)
+
+
+class TicketCursorPagination(KeysetPagination):
+    ordering = ('-purchase_date', '-id')
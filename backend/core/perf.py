@@ -0,0 +1,298 @@
+"""
+Request-level performance instrumentation.
+
+With PERF_ENABLED, PerformanceMiddleware gives each request a RequestRecord
+(held in a context variable, so it follows the request into sync_to_async
+threads and async tasks) and the hooks below add to it:
+
+  * every SQL statement, via an execute wrapper installed on each connection;
+  * serializer time, around BaseSerializer.data and is_valid();
+  * outbound HTTP time, for code wrapped in `timed('http')` (the Chapa clients).
+
+Finished records go to an in-process ring buffer (served at /api/perf/requests/)
+and into per-view aggregates rendered in the Prometheus text format (at
+/api/perf/metrics). Requests slower than PERF_SLOW_MS are logged to the
+`core.perf` logger with their slowest statements.
+
+The hooks are installed when the middleware is first loaded. When
+PERF_ENABLED is off the middleware removes itself and nothing is installed;
+what remains is a context variable lookup per timed() block, well under a
+microsecond.
+"""
+import heapq
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('core.perf')
+
+# Upper bounds (seconds) of the request duration histogram
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_current = ContextVar('perf_record', default=None)
+_in_serializer = ContextVar('perf_in_serializer', default=False)
+
+
+class RequestRecord:
+    __slots__ = (
+        'method', 'path', 'view', 'status', 'started', 'wall',
+        'queries', 'db_time', 'serializer_time', 'http_time', 'slowest', '_seq',
+    )
+
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.view = None
+        self.status = None
+        self.started = time.time()
+        self.wall = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.http_time = 0.0
+        # Min-heap of the slowest statements: (duration, seq, sql)
+        self.slowest = []
+        self._seq = 0
+
+    def add_query(self, sql, duration):
+        self.queries += 1
+        self.db_time += duration
+        self._seq += 1
+        entry = (duration, self._seq, sql)
+        if len(self.slowest) < settings.PERF_SQL_SAMPLE:
+            heapq.heappush(self.slowest, entry)
+        elif duration > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def as_dict(self):
+        return {
+            'method': self.method,
+            'path': self.path,
+            'view': self.view,
+            'status': self.status,
+            'started': self.started,
+            'wall_ms': round(self.wall * 1000, 3),
+            'queries': self.queries,
+            'db_ms': round(self.db_time * 1000, 3),
+            'serializer_ms': round(self.serializer_time * 1000, 3),
+            'http_ms': round(self.http_time * 1000, 3),
+            'slowest_sql': [
+                {'ms': round(duration * 1000, 3), 'sql': sql}
+                for duration, _, sql in sorted(self.slowest, reverse=True)
+            ],
+        }
+
+
+class ViewStats:
+    __slots__ = ('buckets', 'count', 'wall', 'queries', 'db_time', 'serializer_time', 'http_time', 'statuses')
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.wall = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.http_time = 0.0
+        self.statuses = {}
+
+
+class Recorder:
+    """Ring buffer of recent requests plus per-(view, method) aggregates."""
+
+    def __init__(self, size):
+        self.lock = threading.Lock()
+        self.recent = deque(maxlen=size)
+        self.stats = {}
+
+    def add(self, record):
+        with self.lock:
+            self.recent.append(record)
+            stats = self.stats.get((record.view, record.method))
+            if stats is None:
+                stats = self.stats[record.view, record.method] = ViewStats()
+            for index, bound in enumerate(BUCKETS):
+                if record.wall <= bound:
+                    stats.buckets[index] += 1
+                    break
+            stats.count += 1
+            stats.wall += record.wall
+            stats.queries += record.queries
+            stats.db_time += record.db_time
+            stats.serializer_time += record.serializer_time
+            stats.http_time += record.http_time
+            stats.statuses[record.status] = stats.statuses.get(record.status, 0) + 1
+
+    def snapshot(self, view=None, limit=None):
+        with self.lock:
+            records = list(self.recent)
+        records.reverse()
+        if view:
+            records = [record for record in records if record.view == view]
+        return [record.as_dict() for record in records[:limit]]
+
+    def prometheus(self):
+        pid = os.getpid()
+        with self.lock:
+            stats = sorted(self.stats.items(), key=lambda item: (str(item[0][0]), item[0][1]))
+            rows = [(view, method, s, list(s.buckets), dict(s.statuses)) for (view, method), s in stats]
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        def labels(view, method, **extra):
+            pairs = {'view': view or '', 'method': method, 'pid': pid, **extra}
+            return ','.join(f'{key}="{escape(value)}"' for key, value in pairs.items())
+
+        family('http_requests_total', 'counter', 'Requests served, by view and status.')
+        for view, method, _, _, statuses in rows:
+            for status, count in sorted(statuses.items(), key=lambda item: str(item[0])):
+                lines.append(f'http_requests_total{{{labels(view, method, status=status)}}} {count}')
+
+        family('http_request_duration_seconds', 'histogram', 'Wall time per request.')
+        for view, method, s, buckets, _ in rows:
+            cumulative = 0
+            for bound, count in zip(BUCKETS, buckets):
+                cumulative += count
+                lines.append(
+                    f'http_request_duration_seconds_bucket{{{labels(view, method, le=bound)}}} {cumulative}'
+                )
+            lines.append(f'http_request_duration_seconds_bucket{{{labels(view, method, le="+Inf")}}} {s.count}')
+            lines.append(f'http_request_duration_seconds_sum{{{labels(view, method)}}} {s.wall:.6f}')
+            lines.append(f'http_request_duration_seconds_count{{{labels(view, method)}}} {s.count}')
+
+        for name, attr, help_text in (
+            ('http_request_db_queries_total', 'queries', 'SQL statements executed.'),
+            ('http_request_db_seconds_total', 'db_time', 'Time spent in SQL.'),
+            ('http_request_serializer_seconds_total', 'serializer_time', 'Time spent in serializers.'),
+            ('http_request_outbound_seconds_total', 'http_time', 'Time spent in outbound HTTP calls.'),
+        ):
+            family(name, 'counter', help_text)
+            for view, method, s, _, _ in rows:
+                value = getattr(s, attr)
+                lines.append(f'{name}{{{labels(view, method)}}} {value if attr == "queries" else f"{value:.6f}"}')
+        return '\n'.join(lines) + '\n'
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+
+def get_recorder():
+    global _recorder
+    if _recorder is None:
+        with _recorder_lock:
+            if _recorder is None:
+                _recorder = Recorder(settings.PERF_BUFFER_SIZE)
+    return _recorder
+
+
+def reset_recorder():
+    global _recorder
+    _recorder = None
+
+
+def start_request(request):
+    record = RequestRecord(request.method, request.path)
+    return record, _current.set(record)
+
+
+def finish_request(record, token, request, response, started):
+    record.wall = time.perf_counter() - started
+    _current.reset(token)
+    match = getattr(request, 'resolver_match', None)
+    record.view = match.view_name if match else None
+    record.status = response.status_code
+    get_recorder().add(record)
+    if record.wall * 1000 >= settings.PERF_SLOW_MS:
+        logger.warning(
+            'Slow request %s %s (%s): %.0fms, %d queries in %.0fms, serializers %.0fms, outbound HTTP %.0fms%s',
+            record.method, record.path, record.view, record.wall * 1000, record.queries,
+            record.db_time * 1000, record.serializer_time * 1000, record.http_time * 1000,
+            ''.join(f'\n  {duration * 1000:.1f}ms {sql}' for duration, _, sql in sorted(record.slowest, reverse=True)),
+        )
+
+
+TIMED_ATTRS = {'serializer': 'serializer_time', 'http': 'http_time'}
+
+
+class timed:
+    """Add the time spent in the block to the current request's `kind` ('serializer' or 'http')."""
+    __slots__ = ('attr', 'record', 'started')
+
+    def __init__(self, kind):
+        self.attr = TIMED_ATTRS[kind]
+
+    def __enter__(self):
+        self.record = _current.get()
+        if self.record is not None:
+            self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        if self.record is not None:
+            setattr(self.record, self.attr, getattr(self.record, self.attr) + time.perf_counter() - self.started)
+
+
+def sql_wrapper(execute, sql, params, many, context):
+    record = _current.get()
+    if record is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        record.add_query(sql, time.perf_counter() - started)
+
+
+def instrument_connection(connection, **kwargs):
+    """connection_created receiver; also called for connections opened earlier."""
+    if sql_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(sql_wrapper)
+
+
+def instrument_thread_connections():
+    for connection in connections.all():
+        instrument_connection(connection)
+
+
+def install_serializer_hooks():
+    """Time DRF serialization (to_representation) and validation for every serializer."""
+    from rest_framework.serializers import BaseSerializer
+
+    if getattr(BaseSerializer, '_perf_hooked', False):
+        return
+    data = BaseSerializer.data.fget
+    is_valid = BaseSerializer.is_valid
+
+    def timed_call(method, self, *args, **kwargs):
+        # Serializers used inside other serializers are already being timed
+        if _in_serializer.get():
+            return method(self, *args, **kwargs)
+        token = _in_serializer.set(True)
+        try:
+            with timed('serializer'):
+                return method(self, *args, **kwargs)
+        finally:
+            _in_serializer.reset(token)
+
+    def timed_data(self):
+        return timed_call(data, self)
+
+    def timed_is_valid(self, *args, **kwargs):
+        return timed_call(is_valid, self, *args, **kwargs)
+
+    BaseSerializer.data = property(timed_data)
+    BaseSerializer.is_valid = timed_is_valid
+    BaseSerializer._perf_hooked = True
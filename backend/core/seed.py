@@ -0,0 +1,315 @@
+"""
+Synthetic data at production scale, for `manage.py seed`.
+
+Generates users, events, tickets, payments and feedback with skewed,
+realistic distributions:
+
+  * tickets per event follow a power law (a few sell-outs, a long tail);
+  * paid events get one paid Payment per ticket plus a share of failed ones;
+  * feedback comes from ticket holders of past events, with each event
+    drawing its ratings from a good, mixed or poor profile.
+
+Everything derives from one seed and a fixed anchor date, so the same
+arguments give the same rows. Rows are written with explicit ids, straight
+to the tables: COPY on PostgreSQL, batched executemany inserts elsewhere.
+bulk_create is not used because it would overwrite the generated
+created_at/purchase_date values (auto_now_add). Tickets, payments and
+feedback are produced in independent chunks of events, each with its own
+random stream, so they can be written by several forked processes
+(PostgreSQL only) with identical results.
+
+Derived tables are rebuilt afterwards: TicketInventory for capped events,
+EventRating from the feedback, the sales rollups from the payments, and
+the event caches are invalidated.
+"""
+import csv
+import io
+import random
+from dataclasses import dataclass
+from datetime import timedelta, timezone as dt_timezone
+from decimal import Decimal
+from functools import partial
+from itertools import accumulate
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+
+from core.cache import bump
+from events.cache import LIST_GENERATION
+from events.models import Event
+from feedback.models import Feedback
+from feedback.ratings import rebuild_ratings
+from Payment.models import Payment
+from Payment.rollups import rebuild as rebuild_sales
+from tickets.models import Ticket, TicketInventory
+from users.models import CustomUser
+
+BATCH_SIZE = 50_000
+EVENTS_PER_CHUNK = 500
+PASSWORD = 'seed-password'
+
+CATEGORIES = [choice for choice, _ in Event.CATEGORY_CHOICES]
+CITIES = ('Addis Ababa', 'Bahir Dar', 'Hawassa', 'Gondar', 'Mekelle', 'Adama', 'Dire Dawa', 'Jimma')
+WORDS = (
+    'jazz', 'summit', 'marathon', 'festival', 'python', 'comedy', 'expo', 'startup', 'coffee',
+    'film', 'design', 'robotics', 'poetry', 'fashion', 'football', 'health', 'music', 'art',
+)
+PRICES = (Decimal('0'), Decimal('100'), Decimal('150'), Decimal('250'), Decimal('500'), Decimal('1000'))
+PRICE_WEIGHTS = (30, 20, 15, 15, 12, 8)
+# Star weights (1..5) per event profile, and how common each profile is
+RATING_PROFILES = ((2, 3, 10, 35, 50), (10, 15, 30, 30, 15), (35, 30, 20, 10, 5))
+PROFILE_WEIGHTS = (60, 30, 10)
+FAILED_PAYMENT_RATE = 0.05
+FEEDBACK_RATE = 0.2
+
+
+class RowWriter:
+    """Append rows (tuples in `fields` order) to `model`'s table as fast as the backend allows."""
+
+    def __init__(self, model, fields):
+        opts = model._meta
+        self.table = opts.db_table
+        model_fields = [opts.get_field(name) for name in fields]
+        self.columns = [field.column for field in model_fields]
+        self.adapt = [
+            (index, adapter) for index, adapter in enumerate(map(self.adapter, model_fields)) if adapter
+        ]
+
+    @staticmethod
+    def adapter(field):
+        """A fast converter to the value the driver expects, or None to pass values as they are."""
+        if connection.vendor == 'postgresql':
+            # psycopg and COPY's csv format take datetimes and decimals as they are
+            return None
+        if connection.vendor == 'sqlite':
+            if isinstance(field, models.DateTimeField):
+                # What adapt_datetimefield_value() produces for aware values, minus its overhead
+                return lambda value: value and str(value.astimezone(dt_timezone.utc).replace(tzinfo=None))
+            # Django registers an sqlite3 adapter for Decimal
+            return None
+        if isinstance(field, (models.DateTimeField, models.DecimalField)):
+            return partial(field.get_db_prep_save, connection=connection)
+        return None
+
+    def prepare(self, row):
+        if not self.adapt:
+            return row
+        row = list(row)
+        for index, adapt in self.adapt:
+            row[index] = adapt(row[index])
+        return row
+
+    def write(self, rows):
+        batch = []
+        for row in rows:
+            batch.append(self.prepare(row))
+            if len(batch) == BATCH_SIZE:
+                self.flush(batch)
+                batch = []
+        if batch:
+            self.flush(batch)
+
+    def flush(self, batch):
+        quote = connection.ops.quote_name
+        columns = ', '.join(quote(column) for column in self.columns)
+        # One transaction per batch; in autocommit SQLite would commit every row
+        with transaction.atomic(), connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                sql = f'COPY {quote(self.table)} ({columns}) FROM STDIN WITH (FORMAT csv)'
+                raw = cursor.cursor
+                if hasattr(raw, 'copy'):  # psycopg 3
+                    with raw.copy(sql) as copy:
+                        for row in batch:
+                            copy.write_row(row)
+                else:
+                    buffer = io.StringIO()
+                    csv.writer(buffer).writerows(batch)
+                    buffer.seek(0)
+                    raw.copy_expert(sql, buffer)
+            else:
+                placeholders = ', '.join(['%s'] * len(self.columns))
+                cursor.executemany(
+                    f'INSERT INTO {quote(self.table)} ({columns}) VALUES ({placeholders})', batch
+                )
+
+
+@dataclass
+class EventPlan:
+    id: int
+    date: object
+    created_at: object
+    price: Decimal
+    tickets: int
+
+
+@dataclass
+class Chunk:
+    """Tickets, payments and feedback for a run of events; picklable for worker processes."""
+    seed: int
+    index: int
+    anchor: object
+    attendee_ids: range
+    payment_base: int
+    events: list
+
+
+def power_law_counts(rng, total, buckets, cap, alpha):
+    """
+    `buckets` counts summing to `total`, Zipf-distributed, none above `cap`,
+    in random order. What the cap clips off the head is spread over the
+    buckets with room left; only when all are full does the sum fall short.
+    """
+    weights = [1 / rank ** alpha for rank in range(1, buckets + 1)]
+    counts = [0] * buckets
+    remaining = min(total, buckets * cap)
+    while remaining:
+        room = [n for n in range(buckets) if counts[n] < cap]
+        scale = remaining / sum(weights[n] for n in room)
+        added = 0
+        for n in room:
+            share = min(int(weights[n] * scale), cap - counts[n])
+            counts[n] += share
+            added += share
+        remaining -= added
+        if not added:
+            # Every share rounded down to 0, so fewer are left than buckets
+            # with room: one more each for the heaviest
+            for n in room[:remaining]:
+                counts[n] += 1
+            remaining = 0
+    rng.shuffle(counts)
+    return counts
+
+
+def payments_for(event):
+    """(paid, failed) payments generated for an event; deterministic from its ticket count."""
+    if not event.price:
+        return 0, 0
+    return event.tickets, int(event.tickets * FAILED_PAYMENT_RATE)
+
+
+def seed_chunk(chunk):
+    """Generate and write one chunk. Returns (tickets, payments, feedbacks) written."""
+    rng = random.Random(f'{chunk.seed}:{chunk.index}')
+    payments, tickets, feedbacks = [], [], []
+    payment_id = chunk.payment_base
+    for event in chunk.events:
+        window = max((min(event.date, chunk.anchor) - event.created_at).total_seconds(), 60)
+        attendees = rng.sample(chunk.attendee_ids, event.tickets)
+        paid, failed = payments_for(event)
+        stars = RATING_PROFILES[rng.choices(range(len(RATING_PROFILES)), PROFILE_WEIGHTS)[0]]
+        past = event.date < chunk.anchor
+        for attendee in attendees:
+            purchased = event.created_at + timedelta(seconds=rng.random() * window)
+            ticket_payment = None
+            if paid:
+                payment_id += 1
+                ticket_payment = payment_id
+                payments.append((
+                    payment_id, attendee, event.id, event.price, f'seed-{payment_id}', 'paid',
+                    purchased - timedelta(minutes=2), purchased,
+                ))
+            tickets.append((event.id, attendee, purchased, ticket_payment))
+            if past and rng.random() < FEEDBACK_RATE:
+                reviewed = event.date + timedelta(hours=rng.randint(1, 240))
+                feedbacks.append((
+                    event.id, attendee, 'Seeded feedback', rng.choices((1, 2, 3, 4, 5), stars)[0],
+                    min(reviewed, chunk.anchor),
+                ))
+        for _ in range(failed):
+            payment_id += 1
+            attempted = event.created_at + timedelta(seconds=rng.random() * window)
+            payments.append((
+                payment_id, rng.choice(chunk.attendee_ids), event.id, event.price, f'seed-{payment_id}',
+                'failed', attempted, attempted,
+            ))
+
+    # Payments first: tickets reference them
+    RowWriter(Payment, (
+        'id', 'user_id', 'event_id', 'amount', 'chapa_tx_ref', 'chapa_status', 'created_at', 'updated_at',
+    )).write(payments)
+    RowWriter(Ticket, ('event_id', 'attendee_id', 'purchase_date', 'payment_id')).write(tickets)
+    RowWriter(Feedback, ('event_id', 'attendee_id', 'comment', 'rating', 'created_at')).write(feedbacks)
+    return len(tickets), len(payments), len(feedbacks)
+
+
+def run_chunk(chunk):
+    """seed_chunk() in a forked worker process, on the process's own connection."""
+    try:
+        return seed_chunk(chunk)
+    finally:
+        connection.close()
+
+
+def next_id(model):
+    return (model.objects.aggregate(last=models.Max('id'))['last'] or 0) + 1
+
+
+def plan(users, events, tickets, seed=0, alpha=1.1, anchor=None):
+    """
+    Write users, events and their inventory, and return the chunks that
+    generate everything else. `anchor` is the aware datetime treated as now.
+    """
+    rng = random.Random(seed)
+    password = make_password(PASSWORD)
+    organizers = max(1, users // 100)
+
+    first_user = next_id(CustomUser)
+    RowWriter(CustomUser, (
+        'id', 'password', 'is_superuser', 'username', 'first_name', 'last_name', 'email',
+        'is_staff', 'is_active', 'date_joined', 'role',
+    )).write(
+        (
+            user_id, password, False, f'seed-{user_id}', '', '', f'seed-{user_id}@example.com',
+            False, True, anchor - timedelta(seconds=rng.random() * 3 * 365 * 86400),
+            'organizer' if n < organizers else 'attendee',
+        )
+        for n, user_id in enumerate(range(first_user, first_user + users))
+    )
+    organizer_ids = range(first_user, first_user + organizers)
+    attendee_ids = range(first_user + organizers, first_user + users)
+
+    counts = power_law_counts(rng, tickets, events, len(attendee_ids), alpha)
+    first_event = next_id(Event)
+    event_rows, event_plans = [], []
+    for n, count in enumerate(counts):
+        date = anchor + timedelta(days=rng.uniform(-540, 180), hours=rng.randint(8, 21))
+        created_at = min(date - timedelta(days=rng.uniform(7, 120)), anchor)
+        price = rng.choices(PRICES, PRICE_WEIGHTS)[0]
+        # About half the events have a capacity, some of them sold out
+        capacity = count + rng.choice((0, count // 4, count)) + 10 if rng.random() < 0.5 else None
+        event_rows.append((
+            first_event + n, f'{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {first_event + n}',
+            ' '.join(rng.choices(WORDS, k=rng.randint(30, 150))), date, rng.choice(CITIES),
+            rng.choice(CATEGORIES), price, capacity, created_at, rng.choice(organizer_ids),
+        ))
+        event_plans.append(EventPlan(first_event + n, date, created_at, price, count))
+    RowWriter(Event, (
+        'id', 'title', 'description', 'date', 'location', 'category', 'price', 'capacity',
+        'created_at', 'organizer_id',
+    )).write(event_rows)
+    RowWriter(TicketInventory, ('event_id', 'capacity', 'remaining')).write(
+        (row[0], row[7], row[7] - event.tickets) for row, event in zip(event_rows, event_plans) if row[7] is not None
+    )
+
+    payment_base = next_id(Payment) - 1
+    groups = [event_plans[start:start + EVENTS_PER_CHUNK] for start in range(0, len(event_plans), EVENTS_PER_CHUNK)]
+    payment_counts = [sum(sum(payments_for(event)) for event in group) for group in groups]
+    chunks = [
+        Chunk(seed, index, anchor, attendee_ids, payment_base + offset, group)
+        for index, (group, offset) in enumerate(zip(groups, accumulate([0, *payment_counts])))
+    ]
+    return chunks
+
+
+def finish():
+    """Rebuild what the raw inserts bypassed."""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [CustomUser, Event, Payment]):
+                cursor.execute(sql)
+    rebuild_ratings()
+    rebuild_sales(retention=timedelta(days=settings.SALES_HOURLY_RETENTION_DAYS))
+    bump(LIST_GENERATION)
@@ -0,0 +1,51 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+
+def split_param(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def requested_fields(request, available, expandable=()):
+    """
+    The fields a read request asked for with ?fields= and ?expand=, or None
+    for the full representation. With ?fields= only the named fields are
+    rendered; otherwise everything but the `expandable` (nested) fields is.
+    Expandable fields are added by naming them in ?expand=. Unknown names
+    are rejected with a 400 rather than rendering (and caching) empty objects.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    params = request.query_params
+    if 'fields' not in params and 'expand' not in params:
+        return None
+    expand = split_param(params.get('expand', ''))
+    if 'fields' in params:
+        wanted = split_param(params['fields'])
+    else:
+        wanted = set(available) - set(expandable)
+    errors = {}
+    for param, names in (('fields', wanted), ('expand', expand)):
+        unknown = names - set(available)
+        if param in params and unknown:
+            errors[param] = [f'Unknown fields: {", ".join(sorted(unknown))}.']
+    if errors:
+        raise ValidationError(errors)
+    return {name for name in available if name in wanted or name in expand}
+
+
+class SparseFieldsetMixin:
+    """
+    Lets clients trim a ModelSerializer's output with ?fields= and ?expand=
+    (see requested_fields). Nested fields listed in Meta.expandable_fields
+    are only rendered on request once either parameter is used.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        wanted = requested_fields(
+            self.context.get('request'), self.Meta.fields, getattr(self.Meta, 'expandable_fields', ()),
+        )
+        if wanted is not None:
+            for name in set(self.fields) - wanted:
+                self.fields.pop(name)
@@ -25,12 +25,15 @@ ALLOWED_HOSTS = config(
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
+    'PAGE_SIZE': config('API_PAGE_SIZE', default=20, cast=int),
 }
+API_MAX_PAGE_SIZE = config('API_MAX_PAGE_SIZE', default=100, cast=int)
 from datetime import timedelta
 
 SIMPLE_JWT = {
@@ -64,9 +67,11 @@ INSTALLED_APPS = [
     'tickets',
     'Payment',
     'feedback',
+    'core',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.PerformanceMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware', # ◄--- MOVE THIS UP HERE
@@ -96,12 +101,89 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'core.wsgi.application'
+ASGI_APPLICATION = 'core.asgi.application'
+# Serve under ASGI (gunicorn with uvicorn workers, see gunicorn.conf.py) and
+# route the Chapa and event list endpoints to their async views
+ASGI_MODE = config('ASGI_MODE', default=False, cast=bool)
+if ASGI_MODE:
+    # WhiteNoiseMiddleware is sync-only and would force the async chain back
+    # to sync on every request; core.asgi serves static files instead
+    MIDDLEWARE.remove('whitenoise.middleware.WhiteNoiseMiddleware')
+
+# Gunicorn workers per instance (also read by gunicorn.conf.py)
+WEB_CONCURRENCY = config('WEB_CONCURRENCY', default=2, cast=int)
+
+# Database connections. By default each worker keeps its connection open
+# for DB_CONN_MAX_AGE seconds, checked before reuse. Under ASGI connections
+# are per request, so persistence is off there; use DB_POOL instead.
+# DB_POOL=true uses psycopg 3's connection pool (PostgreSQL only; needs the
+# `psycopg[pool]` package installed), with up to DB_POOL_MAX_SIZE
+# connections per worker. The `database` system check (run by migrate)
+# warns when the workers could open more connections than the server allows.
+DB_POOL = config('DB_POOL', default=False, cast=bool)
+DB_POOL_MIN_SIZE = config('DB_POOL_MIN_SIZE', default=2, cast=int)
+DB_POOL_MAX_SIZE = config('DB_POOL_MAX_SIZE', default=4, cast=int)
+DB_POOL_TIMEOUT = config('DB_POOL_TIMEOUT', default=10, cast=int)
 
 DATABASES = {
     "default": dj_database_url.config(
-        default=config("DATABASE_URL")
+        default=config("DATABASE_URL"),
+        # Pooled connections are returned to the pool instead of persisting
+        conn_max_age=0 if DB_POOL else config('DB_CONN_MAX_AGE', default=0 if ASGI_MODE else 60, cast=int),
+        conn_health_checks=config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+        # Needed behind a transaction-pooling PgBouncer
+        disable_server_side_cursors=config('DB_DISABLE_SERVER_SIDE_CURSORS', default=False, cast=bool),
     )
 }
+if DB_POOL and DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        'min_size': DB_POOL_MIN_SIZE,
+        'max_size': DB_POOL_MAX_SIZE,
+        'timeout': DB_POOL_TIMEOUT,
+    }
+
+# Cache: 'locmem' (per process), 'file' (shared on one host) or 'redis'
+# (any Redis-compatible server; needs the `redis` package installed)
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+CACHE_LOCATION = config('CACHE_LOCATION', default='')
+CACHES = {
+    'default': {
+        'BACKEND': {
+            'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+            'file': 'django.core.cache.backends.filebased.FileBasedCache',
+            'redis': 'django.core.cache.backends.redis.RedisCache',
+        }[CACHE_BACKEND],
+        'LOCATION': CACHE_LOCATION or {
+            'file': str(BASE_DIR / '.cache'),
+            'redis': 'redis://127.0.0.1:6379/1',
+        }.get(CACHE_BACKEND, ''),
+    }
+}
+# Token -> user cache used by CachedTokenAuthentication: 'local', 'shared' or
+# 'off'. Logout and deactivation must reach every worker at once, so the
+# default is the shared cache when it spans processes, the in-process cache
+# for a single worker and no cache otherwise; the auth system check refuses
+# a per-process cache with several workers.
+AUTH_TOKEN_CACHE = config(
+    'AUTH_TOKEN_CACHE',
+    default='shared' if CACHE_BACKEND != 'locmem' else 'local' if WEB_CONCURRENCY == 1 else 'off',
+)
+AUTH_TOKEN_CACHE_TTL = config('AUTH_TOKEN_CACHE_TTL', default=300, cast=int)
+AUTH_TOKEN_CACHE_SIZE = config('AUTH_TOKEN_CACHE_SIZE', default=10000, cast=int)
+# Seconds an anonymous event list/detail response is cached; 0 disables it.
+# Edits on other web workers and sales by the callback and reconcile workers
+# only invalidate it through a shared cache, so like the wallet cache below
+# it defaults to off with locmem.
+EVENT_CACHE_TIMEOUT = config('EVENT_CACHE_TIMEOUT', default=0 if CACHE_BACKEND == 'locmem' else 300, cast=int)
+# Seconds a time-relative event list (`?upcoming=`) is cached under one key
+# and ETag, i.e. how long a past event may still be listed as upcoming
+EVENT_CACHE_TIME_BUCKET = config('EVENT_CACHE_TIME_BUCKET', default=60, cast=int)
+# Seconds a user's ticket wallet is cached; entries are invalidated when it
+# changes, so this only bounds memory. 0 disables it. Tickets are also issued
+# by the callback and reconcile workers, whose invalidations only reach the
+# web workers through a shared cache, so the default is off with locmem (and
+# the response cache system check refuses turning it on there).
+WALLET_CACHE_TIMEOUT = config('WALLET_CACHE_TIMEOUT', default=0 if CACHE_BACKEND == 'locmem' else 3600, cast=int)
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -144,8 +226,56 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Chapa settings
 CHAPA_SECRET_KEY = config("CHAPA_SECRET_KEY")
-CHAPA_BASE_URL = 'https://api.chapa.co/v1'
+CHAPA_BASE_URL = config('CHAPA_BASE_URL', default='https://api.chapa.co/v1')
+CHAPA_CONNECT_TIMEOUT = config('CHAPA_CONNECT_TIMEOUT', default=3.05, cast=float)
+CHAPA_READ_TIMEOUT = config('CHAPA_READ_TIMEOUT', default=10, cast=float)
+CHAPA_MAX_RETRIES = config('CHAPA_MAX_RETRIES', default=2, cast=int)
+CHAPA_RETRY_BACKOFF = config('CHAPA_RETRY_BACKOFF', default=0.3, cast=float)
+CHAPA_POOL_SIZE = config('CHAPA_POOL_SIZE', default=10, cast=int)
+# How long a 'still pending' verify answer is reused before asking Chapa again
+CHAPA_PENDING_CACHE_SECONDS = config('CHAPA_PENDING_CACHE_SECONDS', default=5, cast=int)
+
+# Chapa callback inbox (Payment.inbox): how long a worker leases a claimed
+# batch, the backoff (doubling from CHAPA_CALLBACK_RETRY_BACKOFF seconds) and
+# number of attempts for payments Chapa still reports as pending, and how long
+# processed callbacks are kept
+CHAPA_CALLBACK_LEASE = config('CHAPA_CALLBACK_LEASE', default=60, cast=int)
+CHAPA_CALLBACK_RETRY_BACKOFF = config('CHAPA_CALLBACK_RETRY_BACKOFF', default=5, cast=float)
+CHAPA_CALLBACK_MAX_ATTEMPTS = config('CHAPA_CALLBACK_MAX_ATTEMPTS', default=6, cast=int)
+CHAPA_CALLBACK_RETENTION_HOURS = config('CHAPA_CALLBACK_RETENTION_HOURS', default=24, cast=int)
+
+# Master key for signed ticket codes; scanners get per-event keys derived from it.
+# Rotating it invalidates every issued code.
+TICKET_SIGNING_KEY = config('TICKET_SIGNING_KEY', default=SECRET_KEY)
 
+# How long a seat stays reserved while the buyer is on the Chapa checkout page
+TICKET_HOLD_MINUTES = config('TICKET_HOLD_MINUTES', default=15, cast=int)
+
+# Sales rollups (Payment.rollups) stay hourly for this many days, then
+# `manage.py compact_sales_rollups` folds them into daily buckets
+SALES_HOURLY_RETENTION_DAYS = config('SALES_HOURLY_RETENTION_DAYS', default=14, cast=int)
+
+# Transactional outbox (core.outbox): handlers by topic as dotted paths ('*'
+# for every topic), how often a failing message is retried (backing off from
+# OUTBOX_RETRY_BACKOFF seconds) and how long delivered messages are kept
+OUTBOX_HANDLERS = {}
+OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', default=10, cast=int)
+OUTBOX_RETRY_BACKOFF = config('OUTBOX_RETRY_BACKOFF', default=5, cast=float)
+OUTBOX_RETENTION_HOURS = config('OUTBOX_RETENTION_HOURS', default=24, cast=int)
+
+# Request instrumentation (core.perf): per-view wall, SQL, serializer and
+# outbound HTTP time, kept in a per-worker ring buffer of PERF_BUFFER_SIZE
+# requests at /api/perf/requests/ (staff) and as Prometheus metrics at
+# /api/perf/metrics (staff or `Bearer PERF_METRICS_TOKEN`). Requests slower
+# than PERF_SLOW_MS are logged with their PERF_SQL_SAMPLE slowest statements.
+PERF_ENABLED = config('PERF_ENABLED', default=False, cast=bool)
+PERF_BUFFER_SIZE = config('PERF_BUFFER_SIZE', default=1000, cast=int)
+PERF_SLOW_MS = config('PERF_SLOW_MS', default=500, cast=int)
+PERF_SQL_SAMPLE = config('PERF_SQL_SAMPLE', default=5, cast=int)
+PERF_METRICS_TOKEN = config('PERF_METRICS_TOKEN', default='')
+
+# DEBUG logs every SQL statement (when DEBUG is on); set DJANGO_LOG_LEVEL=DEBUG
+# only while investigating
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -157,7 +287,11 @@ LOGGING = {
     "loggers": {
         "django": {
             "handlers": ["console"],
-            "level": "DEBUG",
+            "level": config('DJANGO_LOG_LEVEL', default='INFO'),
+        },
+        "core.perf": {
+            "handlers": ["console"],
+            "level": "INFO",
         },
     },
 }
\ No newline at end of file
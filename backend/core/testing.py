@@ -0,0 +1,22 @@
+from django.db import connection
+
+
+class QueryPlanAssertionsMixin:
+    """
+    EXPLAIN-based assertions for TestCase subclasses. Test tables hold only a
+    handful of rows, so on PostgreSQL sequential scans are switched off for
+    the duration of the test transaction to expose the index the planner
+    would pick on a real table.
+    """
+
+    def query_plan(self, queryset):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def assertUsesIndex(self, queryset, *index_names):
+        plan = self.query_plan(queryset)
+        if not any(name in plan for name in index_names):
+            self.fail(f'None of {index_names} used by the query plan:\n{plan}')
+        return plan
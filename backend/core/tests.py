@@ -0,0 +1,328 @@
+import random
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction
+from asgiref.testing import ApplicationCommunicator
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import Count, F
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from events.models import Event
+from feedback.models import EventRating, Feedback
+from Payment.models import Payment
+from tickets.models import Ticket, TicketInventory
+from users.models import CustomUser
+from . import benchmark, outbox, perf, seed
+from .asgi import with_static_files
+from .checks import check_connection_budget, check_response_caches, check_token_cache
+from .middleware import PerformanceMiddleware
+from .models import OutboxMessage
+
+
+@override_settings(WEB_CONCURRENCY=4)
+class ConnectionBudgetCheckTests(SimpleTestCase):
+    databases = {'default'}
+
+    def check(self, limit, pool=None):
+        options = {'pool': pool} if pool else {}
+        with mock.patch('core.checks.connection_limit', return_value=limit), \
+                mock.patch.dict(connection.settings_dict, {'OPTIONS': options}):
+            return check_connection_budget(None, databases=['default'])
+
+    def test_warns_when_pools_exceed_the_server_limit(self):
+        warnings = self.check(limit=15, pool={'min_size': 2, 'max_size': 4})
+        self.assertEqual([warning.id for warning in warnings], ['core.W001'])
+        self.assertIn('may open 16 connections', warnings[0].msg)
+
+    def test_one_connection_per_worker_without_a_pool(self):
+        self.assertEqual(self.check(limit=4), [])
+        self.assertEqual(len(self.check(limit=3)), 1)
+
+    def test_silent_when_the_limit_is_unknown(self):
+        self.assertEqual(self.check(limit=None, pool=True), [])
+
+
+class TokenCacheCheckTests(SimpleTestCase):
+    @override_settings(WEB_CONCURRENCY=2)
+    def test_per_process_cache_is_refused_with_several_workers(self):
+        with override_settings(AUTH_TOKEN_CACHE='local'):
+            self.assertEqual([error.id for error in check_token_cache(None)], ['core.E001'])
+        with override_settings(AUTH_TOKEN_CACHE='shared', CACHE_BACKEND='locmem'):
+            self.assertEqual(len(check_token_cache(None)), 1)
+        with override_settings(AUTH_TOKEN_CACHE='shared', CACHE_BACKEND='redis'):
+            self.assertEqual(check_token_cache(None), [])
+
+    @override_settings(WEB_CONCURRENCY=1, AUTH_TOKEN_CACHE='local')
+    def test_single_worker_may_cache_locally(self):
+        self.assertEqual(check_token_cache(None), [])
+
+
+class ResponseCacheCheckTests(SimpleTestCase):
+    @override_settings(CACHE_BACKEND='locmem', EVENT_CACHE_TIMEOUT=300, WALLET_CACHE_TIMEOUT=0)
+    def test_event_cache_needs_a_shared_backend(self):
+        self.assertEqual([error.id for error in check_response_caches(None)], ['core.E003'])
+        with override_settings(CACHE_BACKEND='file'):
+            self.assertEqual(check_response_caches(None), [])
+
+    @override_settings(CACHE_BACKEND='locmem', EVENT_CACHE_TIMEOUT=0, WALLET_CACHE_TIMEOUT=3600)
+    def test_wallet_cache_needs_a_shared_backend(self):
+        self.assertEqual([error.id for error in check_response_caches(None)], ['core.E002'])
+        with override_settings(CACHE_BACKEND='redis'):
+            self.assertEqual(check_response_caches(None), [])
+        with override_settings(WALLET_CACHE_TIMEOUT=0):
+            self.assertEqual(check_response_caches(None), [])
+
+
+@override_settings(PERF_ENABLED=True, PERF_METRICS_TOKEN='scrape')
+class PerformanceMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        perf.reset_recorder()
+        self.addCleanup(perf.reset_recorder)
+        self.client = APIClient()
+        organizer = CustomUser.objects.create_user(username='organizer', password='pass', role='organizer')
+        Event.objects.create(
+            title='Concert', description='Description', location='Addis Ababa',
+            date=timezone.now() + timedelta(days=7), organizer=organizer,
+        )
+        self.staff = CustomUser.objects.create_user(username='staff', password='pass', is_staff=True)
+
+    def test_requests_are_recorded_per_view(self):
+        self.client.get('/api/events/')
+        [record] = perf.get_recorder().snapshot()
+        self.assertEqual((record['view'], record['method'], record['status']), ('event-list', 'GET', 200))
+        self.assertGreater(record['queries'], 0)
+        self.assertGreater(record['serializer_ms'], 0)
+        self.assertLessEqual(record['db_ms'], record['wall_ms'])
+        self.assertLessEqual(len(record['slowest_sql']), 5)
+
+    def test_ring_buffer_is_staff_only(self):
+        self.client.get('/api/events/')
+        user = CustomUser.objects.create_user(username='attendee', password='pass')
+        self.client.force_authenticate(user)
+        self.assertEqual(self.client.get('/api/perf/requests/').status_code, 403)
+        self.client.force_authenticate(self.staff)
+        response = self.client.get('/api/perf/requests/', {'view': 'event-list'})
+        self.assertEqual([record['path'] for record in response.json()], ['/api/events/'])
+
+    def test_prometheus_metrics(self):
+        self.client.get('/api/events/')
+        self.assertEqual(self.client.get('/api/perf/metrics').status_code, 401)
+        self.assertEqual(self.client.get('/api/perf/metrics', HTTP_AUTHORIZATION='Bearer scrap').status_code, 401)
+        response = self.client.get('/api/perf/metrics', HTTP_AUTHORIZATION='Bearer scrape')
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        text = response.content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', text)
+        self.assertRegex(text, r'http_requests_total\{view="event-list",method="GET",pid="\d+",status="200"\} 1')
+
+    @override_settings(PERF_SLOW_MS=0)
+    def test_slow_requests_are_logged_with_their_sql(self):
+        with self.assertLogs('core.perf', 'WARNING') as logs:
+            self.client.get('/api/events/')
+        self.assertIn('Slow request GET /api/events/ (event-list)', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+    async def test_async_chains_stay_async(self):
+        async def view(request):
+            return HttpResponse()
+
+        middleware = PerformanceMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        await middleware(RequestFactory().get('/api/events/'))
+        [record] = perf.get_recorder().snapshot()
+        self.assertEqual((record['path'], record['status']), ('/api/events/', 200))
+
+    def test_outbound_http_time_is_attributed_to_the_request(self):
+        record, token = perf.start_request(mock.Mock(method='GET', path='/'))
+        with perf.timed('http'):
+            pass
+        perf._current.reset(token)
+        self.assertGreater(record.http_time, 0)
+
+
+class AsgiStaticFilesTests(SimpleTestCase):
+    async def request(self, app, path):
+        communicator = ApplicationCommunicator(app, {
+            'type': 'http', 'http_version': '1.1', 'method': 'GET', 'path': path, 'query_string': b'', 'headers': [],
+        })
+        await communicator.send_input({'type': 'http.request'})
+        start = await communicator.receive_output()
+        body = await communicator.receive_output()
+        return start['status'], dict(start['headers']), body['body']
+
+    async def test_static_files_are_served_ahead_of_django(self):
+        async def django_app(scope, receive, send):
+            await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+            await send({'type': 'http.response.body', 'body': b'django'})
+
+        with tempfile.TemporaryDirectory() as root:
+            Path(root, 'app.0123456789ab.css').write_text('body {}')
+            with override_settings(STATIC_ROOT=root):
+                app = with_static_files(django_app)
+                status, headers, body = await self.request(app, '/static/app.0123456789ab.css')
+                self.assertEqual((status, body), (200, b'body {}'))
+                self.assertIn(b'immutable', headers[b'cache-control'])
+                self.assertEqual((await self.request(app, '/static/missing.css'))[0], 404)
+                self.assertEqual((await self.request(app, '/api/events/'))[2], b'django')
+
+
+delivered = []
+
+
+def record_message(message):
+    delivered.append((message.topic, message.payload))
+
+
+def reject_message(message):
+    raise ValueError('handler down')
+
+
+@override_settings(OUTBOX_HANDLERS={'*': ['core.tests.record_message']}, OUTBOX_RETRY_BACKOFF=60)
+class OutboxTests(TestCase):
+    def setUp(self):
+        delivered.clear()
+        self.organizer = CustomUser.objects.create_user(username='organizer', password='pass', role='organizer')
+        self.event = Event.objects.create(
+            title='Concert', description='Description', location='Addis Ababa',
+            date=timezone.now() + timedelta(days=7), organizer=self.organizer,
+        )
+        self.attendee = CustomUser.objects.create_user(username='attendee', password='pass')
+
+    def topics(self):
+        return list(OutboxMessage.objects.order_by('id').values_list('topic', flat=True))
+
+    def test_changes_publish_their_messages(self):
+        ticket = Ticket.objects.create(event=self.event, attendee=self.attendee)
+        Feedback.objects.create(event=self.event, attendee=self.attendee, comment='Great', rating=5)
+        self.event.title = 'Renamed'
+        self.event.save()
+        self.assertEqual(
+            self.topics(), ['EventChanged', 'TicketIssued', 'FeedbackSubmitted', 'EventChanged'],
+        )
+        self.assertEqual(
+            OutboxMessage.objects.get(topic='TicketIssued').payload,
+            {'ticket_id': ticket.id, 'event_id': self.event.id, 'attendee_id': self.attendee.id, 'payment_id': None},
+        )
+        self.assertEqual(OutboxMessage.objects.last().payload['action'], 'updated')
+
+    def test_messages_roll_back_with_the_change(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            Ticket.objects.create(event=self.event, attendee=self.attendee)
+            raise RuntimeError
+        self.assertEqual(self.topics(), ['EventChanged'])
+
+    def test_dispatcher_delivers_each_message_once(self):
+        Ticket.objects.create(event=self.event, attendee=self.attendee)
+        totals = outbox.Dispatcher(batch_size=1).run_pass()
+        self.assertEqual((totals['delivered'], totals['claimed']), (2, 2))
+        self.assertEqual([topic for topic, _ in delivered], ['EventChanged', 'TicketIssued'])
+        self.assertFalse(OutboxMessage.objects.filter(dispatched_at__isnull=True).exists())
+        self.assertEqual(outbox.Dispatcher().run_pass()['delivered'], 0)
+        self.assertEqual(len(delivered), 2)
+
+    @override_settings(OUTBOX_HANDLERS={'EventChanged': ['core.tests.reject_message']}, OUTBOX_MAX_ATTEMPTS=2)
+    def test_failed_deliveries_are_retried_then_given_up(self):
+        dispatcher = outbox.Dispatcher()
+        self.assertEqual(dispatcher.run_pass()['failed'], 1)
+        message = OutboxMessage.objects.get()
+        self.assertEqual((message.attempts, message.last_error), (1, 'ValueError: handler down'))
+        self.assertIsNone(message.dispatched_at)
+        # Backing off: not due yet
+        self.assertEqual(dispatcher.run_pass()['claimed'], 0)
+        OutboxMessage.objects.update(available_at=timezone.now())
+        self.assertEqual(dispatcher.run_pass()['dead'], 1)
+        OutboxMessage.objects.update(available_at=timezone.now())
+        self.assertEqual(dispatcher.run_pass()['claimed'], 0)
+        self.assertEqual(outbox.stats()['EventChanged']['dead'], 1)
+
+    def test_delivered_messages_are_pruned(self):
+        outbox.Dispatcher().run_pass()
+        OutboxMessage.objects.update(dispatched_at=timezone.now() - timedelta(days=2))
+        self.assertEqual(outbox.Dispatcher().run_pass()['pruned'], 1)
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    @override_settings(PERF_METRICS_TOKEN='scrape')
+    def test_lag_and_throughput_are_exported(self):
+        OutboxMessage.objects.update(created_at=timezone.now() - timedelta(seconds=30))
+        Feedback.objects.create(event=self.event, attendee=self.attendee, comment='Great', rating=5)
+        call_command('dispatch_outbox', stdout=StringIO())
+        outbox.publish('FeedbackSubmitted', {'feedback_id': 0})
+        OutboxMessage.objects.filter(dispatched_at__isnull=True).update(
+            created_at=timezone.now() - timedelta(seconds=90)
+        )
+
+        stats = outbox.stats()
+        self.assertEqual(stats['EventChanged']['throughput'], 1 / 300)
+        self.assertGreaterEqual(stats['EventChanged']['latency_seconds'], 30)
+        self.assertEqual(stats['FeedbackSubmitted']['pending'], 1)
+        self.assertGreaterEqual(stats['FeedbackSubmitted']['lag_seconds'], 90)
+        text = APIClient().get('/api/perf/metrics', HTTP_AUTHORIZATION='Bearer scrape').content.decode()
+        self.assertIn('outbox_pending_messages{topic="FeedbackSubmitted"} 1', text)
+        self.assertRegex(text, r'outbox_lag_seconds\{topic="FeedbackSubmitted"\} 9\d\.')
+
+
+class BenchmarkTests(TestCase):
+    def test_scenarios_report_latency_and_queries(self):
+        data = benchmark.create_fixtures(users=5, events=3, tickets=6, feedbacks=4)
+        result = benchmark.run_scenario(benchmark.FeedbackList(data), iterations=4, warmup=1)
+        self.assertEqual(result['iterations'], 4)
+        self.assertGreater(result['queries'], 0)
+        self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+
+    def test_more_queries_is_a_regression(self):
+        baseline = {'event_list': {'queries': 2.0, 'p95_ms': 10.0}}
+        self.assertEqual(benchmark.compare({'event_list': {'queries': 2.0, 'p95_ms': 90.0}}, baseline), [])
+        self.assertEqual(len(benchmark.compare({'event_list': {'queries': 3.0, 'p95_ms': 9.0}}, baseline)), 1)
+
+    def test_latency_is_compared_relative_to_the_calibration(self):
+        baseline = {'event_list': {'queries': 2.0, 'p95_ms': 10.0}}
+        result = {'event_list': {'queries': 2.0, 'p95_ms': 16.0}}
+        self.assertEqual(len(benchmark.compare(result, baseline, 0.5)), 1)
+        # A machine half as fast gets twice the baseline
+        self.assertEqual(benchmark.compare(result, baseline, 0.5, scale=2.0), [])
+        self.assertGreater(benchmark.calibrate(rounds=1), 0)
+
+
+class PowerLawCountsTests(SimpleTestCase):
+    def test_counts_sum_to_the_total(self):
+        rng = random.Random(0)
+        for total, buckets, cap in ((50_000, 1_000, 99), (150, 8, 59), (7, 10, 5), (0, 3, 5)):
+            with self.subTest(total=total, buckets=buckets, cap=cap):
+                counts = seed.power_law_counts(rng, total, buckets, cap, 1.1)
+                self.assertEqual(len(counts), buckets)
+                self.assertEqual(sum(counts), total)
+                self.assertLessEqual(max(counts), cap)
+
+    def test_short_only_when_every_bucket_is_full(self):
+        counts = seed.power_law_counts(random.Random(0), 1_000, 10, 50, 1.1)
+        self.assertEqual(counts, [50] * 10)
+
+
+class SeedCommandTests(TestCase):
+    def test_seeded_rows_are_consistent(self):
+        call_command('seed', users=60, events=8, tickets=150, anchor='2026-01-01', stdout=StringIO())
+
+        self.assertEqual(Event.objects.count(), 8)
+        self.assertGreater(Ticket.objects.count(), 0)
+        # Paid tickets belong to their own payment
+        self.assertFalse(
+            Ticket.objects.filter(payment__isnull=False)
+            .exclude(payment__user=F('attendee'), payment__event=F('event'), payment__chapa_status='paid')
+            .exists()
+        )
+        for inventory in TicketInventory.objects.annotate(sold=Count('event__tickets')):
+            self.assertEqual(inventory.remaining, inventory.capacity - inventory.sold)
+        self.assertEqual(
+            EventRating.objects.count(), Feedback.objects.values('event').distinct().count()
+        )
+        self.assertFalse(Payment.objects.filter(created_at__gt=F('updated_at')).exists())
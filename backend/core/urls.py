@@ -17,6 +17,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from Payment.views import PaymentSuccessView
+from core.views import PerfMetricsView, PerfRequestsView
 from django.conf import settings
 from django.conf.urls.static import static
 urlpatterns = [
@@ -29,6 +30,8 @@ urlpatterns = [
     path('api/payments/', include('Payment.urls')),
     path('payment-success/', PaymentSuccessView.as_view(), name='payment-success'),
     path('api/', include('feedback.urls')),
+    path('api/perf/requests/', PerfRequestsView.as_view(), name='perf-requests'),
+    path('api/perf/metrics', PerfMetricsView.as_view(), name='perf-metrics'),
 
 ]
 
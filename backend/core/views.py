@@ -0,0 +1,47 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.permissions import BasePermission, IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import outbox
+from .perf import get_recorder
+
+
+class PerfRequestsView(APIView):
+    """Recent requests from this worker's ring buffer, newest first. ?view= and ?limit= filter."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        try:
+            limit = max(int(request.query_params.get('limit', 100)), 0)
+        except ValueError:
+            limit = 100
+        return Response(get_recorder().snapshot(view=request.query_params.get('view'), limit=limit))
+
+
+class MetricsTokenOrStaff(BasePermission):
+    """Staff users, or a scraper sending `Authorization: Bearer <PERF_METRICS_TOKEN>`."""
+
+    def has_permission(self, request, view):
+        token = settings.PERF_METRICS_TOKEN
+        # Constant time; bytes, since compare_digest refuses non-ASCII str
+        if token and hmac.compare_digest(
+            request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode(),
+        ):
+            return True
+        return bool(request.user and request.user.is_staff)
+
+
+class PerfMetricsView(APIView):
+    """
+    This worker's per-view aggregates in the Prometheus text format, followed
+    by the outbox backlog and delivery figures (the same from every worker).
+    """
+    permission_classes = [MetricsTokenOrStaff]
+
+    def get(self, request):
+        body = get_recorder().prometheus() + outbox.prometheus()
+        return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -2,6 +2,12 @@
 
 set -e
 
+# Background workers (see docker-compose.yml) start with RUN_MIGRATIONS=false
+# and leave the migrations and the superuser to the web server
+if [ "${RUN_MIGRATIONS:-true}" != "true" ]; then
+    exec "$@"
+fi
+
 echo "Running database migrations..."
 python manage.py migrate --noinput
 
@@ -0,0 +1,33 @@
+"""
+Async front for the event list when served over ASGI (ASGI_MODE).
+
+Anonymous list requests are answered straight from the response cache on
+the event loop, with no worker thread involved. Everything else (cache
+misses, authenticated users, POST) runs the regular DRF viewset in a
+thread, since DRF itself is synchronous.
+"""
+from asgiref.sync import sync_to_async
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from core.cache import acached_response
+from .cache import LIST_GENERATION
+from .filters import time_versions
+from .views import EventViewSet
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncEventListView(View):
+    http_method_names = ['get', 'post', 'head', 'options']
+    viewset_view = staticmethod(EventViewSet.as_view({'get': 'list', 'post': 'create'}))
+
+    async def get(self, request, *args, **kwargs):
+        response = await acached_response(request, [LIST_GENERATION], extra=time_versions(request.GET))
+        return response or await self.post(request, *args, **kwargs)
+
+    async def post(self, request, *args, **kwargs):
+        return await sync_to_async(self.viewset_view)(request, *args, **kwargs)
+
+    async def head(self, request, *args, **kwargs):
+        return await self.get(request, *args, **kwargs)
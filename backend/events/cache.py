@@ -0,0 +1,23 @@
+"""
+Cache generations for the public event endpoints (see core.cache).
+
+The list is cached under the `events` generation and each detail under its
+own `event:<id>` generation, so a change to one event only drops that
+event's detail and the list pages, not every other event's detail.
+
+INFO_GENERATION is bumped only when an event row itself is saved or
+deleted, not on stock or rating changes, for caches that show event details
+without the live numbers.
+"""
+from core.cache import bump
+
+LIST_GENERATION = 'events'
+INFO_GENERATION = 'events:info'
+
+
+def detail_generation(event_id):
+    return f'event:{event_id}'
+
+
+def invalidate_event(event_id, edited=False):
+    bump(LIST_GENERATION, detail_generation(event_id), *([INFO_GENERATION] if edited else []))
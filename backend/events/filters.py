@@ -0,0 +1,114 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django import forms
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+
+from core.serializers import split_param
+
+
+class EventRatingFilter(filters.BaseFilterBackend):
+    """
+    `?min_rating=4` keeps events whose average rating is at least 4. Values
+    that are not a finite number from 0 to 5 are rejected with a 400.
+    """
+    param = 'min_rating'
+    field = forms.FloatField(min_value=0, max_value=5)
+
+    def filter_queryset(self, request, queryset, view):
+        value = request.query_params.get(self.param)
+        if not value:
+            return queryset
+        try:
+            return queryset.filter(avg_rating__gte=self.field.clean(value))
+        except forms.ValidationError as error:
+            raise ValidationError({self.param: error.messages})
+
+
+def parse_moment(value, end_of_day=False):
+    """
+    An aware datetime for an ISO date or datetime, or None. A bare date
+    means the start of that day, or with `end_of_day` the start of the next.
+    """
+    try:
+        day = parse_date(value)
+        if day is not None:
+            moment = datetime.combine(day + timedelta(days=end_of_day), time.min)
+        else:
+            moment = parse_datetime(value)
+            if moment is None:
+                return None
+    except ValueError:
+        return None
+    return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+
+def wants_upcoming(params):
+    return params.get('upcoming', '').lower() in ('1', 'true', 'yes')
+
+
+def time_versions(params):
+    """
+    Extra cache versions (see core.cache) for an event list query: the
+    current EVENT_CACHE_TIME_BUCKET when the answer depends on the time,
+    so cached pages and ETags of `?upcoming=` lists expire as events pass.
+    """
+    if not wants_upcoming(params):
+        return []
+    return [('now', int(timezone.now().timestamp()) // settings.EVENT_CACHE_TIME_BUCKET)]
+
+
+def parse_price(value):
+    try:
+        price = Decimal(value)
+    except InvalidOperation:
+        return None
+    return price if price.is_finite() else None
+
+
+class EventFilter(filters.BaseFilterBackend):
+    """
+    Structured filters on the event list. Dates and categories are served
+    by an index on Event (see its Meta); price bands are filtered along the
+    date order:
+
+      * `?upcoming=true` keeps events from now on;
+      * `?date_after=` / `?date_before=` bound the date (ISO date or
+        datetime; a bare `date_before` day is included);
+      * `?category=concert,festival` keeps the given categories;
+      * `?min_price=` / `?max_price=` bound the price; `max_price=0` is
+        the free events.
+
+    Values that do not parse are ignored.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        after = parse_moment(params.get('date_after', ''))
+        if wants_upcoming(params):
+            now = timezone.now()
+            after = max(after, now) if after else now
+        if after:
+            queryset = queryset.filter(date__gte=after)
+        before = parse_moment(params.get('date_before', ''), end_of_day=True)
+        if before:
+            queryset = queryset.filter(date__lt=before)
+
+        categories = split_param(params.get('category', ''))
+        if categories:
+            queryset = queryset.filter(category__in=sorted(categories))
+
+        min_price = parse_price(params.get('min_price', ''))
+        max_price = parse_price(params.get('max_price', ''))
+        if max_price == 0 and (min_price is None or min_price <= 0):
+            # Prices are never negative
+            return queryset.filter(price=0)
+        if min_price is not None:
+            queryset = queryset.filter(price__gte=min_price)
+        if max_price is not None:
+            queryset = queryset.filter(price__lte=max_price)
+        return queryset
@@ -0,0 +1,65 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from events.cache import invalidate_event
+from events.models import Event
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests/s of the anonymous event list and detail endpoints "
+        "with the response cache off, warm, and revalidated with If-None-Match. "
+        "Uses the configured cache backend. Sample events are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=300)
+        parser.add_argument('--events', type=int, default=50, help="Sample events to create.")
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        client = Client(HTTP_HOST='localhost')
+        with transaction.atomic():
+            event_ids = self.create_events(options['events'])
+            for label, path in (('list', '/api/events/'), ('detail', f'/api/events/{event_ids[0]}/')):
+                with override_settings(EVENT_CACHE_TIMEOUT=0):
+                    self.report(f'{label}, uncached', total, lambda: client.get(path))
+                # One process, so the cache is measured even where locmem leaves it off by default
+                with override_settings(EVENT_CACHE_TIMEOUT=settings.EVENT_CACHE_TIMEOUT or 300):
+                    client.get(path)
+                    self.report(f'{label}, cached', total, lambda: client.get(path))
+                    etag = client.get(path)['ETag']
+                    self.report(
+                        f'{label}, 304 revalidation', total, lambda: client.get(path, HTTP_IF_NONE_MATCH=etag),
+                    )
+            transaction.set_rollback(True)
+        # Drop responses built from the rolled-back sample rows
+        for event_id in event_ids:
+            invalidate_event(event_id)
+
+    def create_events(self, count):
+        organizer = CustomUser.objects.create_user(username='bench-organizer', role='organizer')
+        start = timezone.now()
+        events = [
+            Event.objects.create(
+                title=f'Benchmark event {n}', description='Description ' * 20, location='Addis Ababa',
+                date=start + timedelta(days=n), organizer=organizer, price=100, capacity=500,
+            )
+            for n in range(count)
+        ]
+        return [event.id for event in events]
+
+    def report(self, label, total, request):
+        started = time.perf_counter()
+        for _ in range(total):
+            response = request()
+            assert response.status_code in (200, 304), response.status_code
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{label:<28} {total:>5} requests  {elapsed:7.2f}s  {total / elapsed:8.1f} req/s")
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.15 on 2026-10-18 19:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_event_capacity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['category', 'date', 'id'], name='event_category_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['price', 'date'], name='event_price_date_idx'),
+        ),
+    ]
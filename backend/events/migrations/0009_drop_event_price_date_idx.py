@@ -0,0 +1,17 @@
+# Generated by Django 5.2.15 on 2026-10-18 20:35
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0008_event_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='event',
+            name='event_price_date_idx',
+        ),
+    ]
@@ -1,5 +1,6 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 
 class Event(models.Model):
     CATEGORY_CHOICES = [
@@ -17,8 +18,33 @@ class Event(models.Model):
     location = models.CharField(max_length=255)
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES, default='other')
     price = models.DecimalField(max_digits=10, decimal_places=2, default=0) 
+    # Maximum tickets on sale; None means unlimited. Live stock is kept in tickets.TicketInventory
+    capacity = models.PositiveIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     organizer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='organized_events')
+    # Maintained by a database trigger on PostgreSQL, see events/search.py
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Organizer dashboards: filter by organizer, newest/oldest first
+            models.Index(fields=['organizer', 'date'], name='event_organizer_date_idx'),
+            # Keyset pagination over the public catalogue. Also serves ?upcoming=
+            # and date ranges: the scan starts at the lower bound, so past events
+            # are never read. (A partial index on date > now() is not possible;
+            # index predicates must be immutable.)
+            models.Index(fields=['date', 'id'], name='event_date_id_idx'),
+            # ?category= with a date range, in keyset order
+            models.Index(fields=['category', 'date', 'id'], name='event_category_date_idx'),
+            # Price bands have no index of their own: they are filtered while
+            # walking (date, id) in keyset order. A (price, date) index made
+            # the planner scan the band and sort, which was far slower.
+        ]
 
     def __str__(self):
         return self.title
+
+    def save(self, *args, **kwargs):
+        # Inventory and the EventChanged outbox message are written by post_save receivers; keep them in one transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
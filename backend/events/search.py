@@ -0,0 +1,170 @@
+"""
+Full-text search for events.
+
+PostgreSQL keeps a weighted ``search_vector`` column current with a trigger
+and indexes it with GIN. SQLite mirrors the searchable columns into an FTS5
+virtual table kept in sync by triggers. Both backends rank matches and treat
+every search term as a prefix so the search box can query as the user types.
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+SEARCH_FIELDS = ('title', 'description', 'location', 'category')
+MAX_TERMS = 8
+
+TERM_RE = re.compile(r'\w+')
+
+POSTGRES_VECTOR = """
+    setweight(to_tsvector('english', coalesce({row}.title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce({row}.category, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce({row}.location, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce({row}.description, '')), 'C')
+"""
+
+POSTGRES_INSTALL = [
+    """
+    CREATE OR REPLACE FUNCTION events_event_search_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := {vector};
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """.format(vector=POSTGRES_VECTOR.format(row='NEW')),
+    "DROP TRIGGER IF EXISTS events_event_search_trigger ON events_event",
+    """
+    CREATE TRIGGER events_event_search_trigger
+    BEFORE INSERT OR UPDATE OF title, description, location, category ON events_event
+    FOR EACH ROW EXECUTE FUNCTION events_event_search_update()
+    """,
+    "UPDATE events_event SET search_vector = {vector}".format(
+        vector=POSTGRES_VECTOR.format(row='events_event')
+    ),
+    "CREATE INDEX IF NOT EXISTS events_event_search_idx ON events_event USING gin (search_vector)",
+]
+
+POSTGRES_UNINSTALL = [
+    "DROP INDEX IF EXISTS events_event_search_idx",
+    "DROP TRIGGER IF EXISTS events_event_search_trigger ON events_event",
+    "DROP FUNCTION IF EXISTS events_event_search_update()",
+]
+
+SQLITE_COLUMNS = ', '.join(SEARCH_FIELDS)
+SQLITE_NEW = ', '.join(f'new.{field}' for field in SEARCH_FIELDS)
+SQLITE_OLD = ', '.join(f'old.{field}' for field in SEARCH_FIELDS)
+
+SQLITE_INSTALL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS events_event_fts USING fts5(
+        {SQLITE_COLUMNS}, content='events_event', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS events_event_fts_insert AFTER INSERT ON events_event BEGIN
+        INSERT INTO events_event_fts(rowid, {SQLITE_COLUMNS}) VALUES (new.id, {SQLITE_NEW});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS events_event_fts_delete AFTER DELETE ON events_event BEGIN
+        INSERT INTO events_event_fts(events_event_fts, rowid, {SQLITE_COLUMNS})
+        VALUES ('delete', old.id, {SQLITE_OLD});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS events_event_fts_update AFTER UPDATE ON events_event BEGIN
+        INSERT INTO events_event_fts(events_event_fts, rowid, {SQLITE_COLUMNS})
+        VALUES ('delete', old.id, {SQLITE_OLD});
+        INSERT INTO events_event_fts(rowid, {SQLITE_COLUMNS}) VALUES (new.id, {SQLITE_NEW});
+    END
+    """,
+    "INSERT INTO events_event_fts(events_event_fts) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS events_event_fts_insert",
+    "DROP TRIGGER IF EXISTS events_event_fts_delete",
+    "DROP TRIGGER IF EXISTS events_event_fts_update",
+    "DROP TABLE IF EXISTS events_event_fts",
+]
+
+# bm25() weights follow SEARCH_FIELDS: title, description, location, category
+SQLITE_RANK = (
+    "SELECT -bm25(events_event_fts, 10.0, 1.0, 4.0, 4.0) FROM events_event_fts "
+    "WHERE events_event_fts MATCH %s AND rowid = events_event.id"
+)
+SQLITE_MATCHES = "SELECT rowid FROM events_event_fts WHERE events_event_fts MATCH %s"
+
+
+def install_search_index(schema_editor):
+    """
+    Create (or restore) the search index, triggers and backfill. Safe to
+    re-run, and must be re-run by migrations that rebuild events_event on
+    SQLite, because a table rebuild drops its triggers.
+    """
+    statements = {
+        'postgresql': POSTGRES_INSTALL,
+        'sqlite': SQLITE_INSTALL,
+    }.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement, params=None)
+
+
+def uninstall_search_index(schema_editor):
+    statements = {
+        'postgresql': POSTGRES_UNINSTALL,
+        'sqlite': SQLITE_UNINSTALL,
+    }.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement, params=None)
+
+
+def search_terms(query):
+    return TERM_RE.findall(query.lower())[:MAX_TERMS]
+
+
+def search_events(queryset, query):
+    """
+    Filter `queryset` to events matching every term of `query` (as a
+    prefix) and annotate each with a `search_rank`, higher is better.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset
+
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        tsquery = SearchQuery(
+            ' & '.join(f'{term}:*' for term in terms), search_type='raw', config='english'
+        )
+        return queryset.filter(search_vector=tsquery).annotate(
+            search_rank=SearchRank(F('search_vector'), tsquery)
+        )
+    if vendor == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        return queryset.filter(id__in=RawSQL(SQLITE_MATCHES, (match,))).annotate(
+            search_rank=RawSQL(SQLITE_RANK, (match,), output_field=FloatField())
+        )
+
+    # No native full-text support: unranked substring match
+    for term in terms:
+        condition = Q()
+        for field in SEARCH_FIELDS:
+            condition |= Q(**{f'{field}__icontains': term})
+        queryset = queryset.filter(condition)
+    return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+class EventSearchFilter(filters.BaseFilterBackend):
+    """
+    Drop-in replacement for SearchFilter on events, keeping the `?search=`
+    contract but backed by the full-text index.
+    """
+    search_param = api_settings.SEARCH_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        return search_events(queryset, request.query_params.get(self.search_param, ''))
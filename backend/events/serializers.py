@@ -2,25 +2,52 @@
 
 from rest_framework import serializers
 from .models import Event
+from core.serializers import SparseFieldsetMixin
 from feedback.serializers import FeedbackSerializer
 
-class EventSerializer(serializers.ModelSerializer):
+def event_rating(event, field, default):
+    # Events nobody has rated yet have no EventRating row
+    rating = getattr(event, 'rating', None)
+    return getattr(rating, field) if rating else default
+
+
+class EventSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     organizer = serializers.CharField(source='organizer.username', read_only=True)
     tickets = serializers.SerializerMethodField()
     feedbacks = FeedbackSerializer(many=True, read_only=True)
+    tickets_remaining = serializers.SerializerMethodField()
+    avg_rating = serializers.SerializerMethodField()
+    rating_count = serializers.SerializerMethodField()
+    rating_histogram = serializers.SerializerMethodField()
 
     def get_tickets(self, obj):
         request = self.context.get('request')
         # Avoid circular import
-        if request and request.user == obj.organizer:
+        if request and request.user.id == obj.organizer_id:
             from tickets.serializers import BasicTicketSerializer
             return BasicTicketSerializer(obj.tickets.all(), many=True, context={'request': request}).data
         return []
 
+    def get_tickets_remaining(self, obj):
+        if obj.capacity is None:
+            return None
+        inventory = getattr(obj, 'inventory', None)
+        return inventory.remaining if inventory else None
+
+    def get_avg_rating(self, obj):
+        return event_rating(obj, 'average', None)
+
+    def get_rating_count(self, obj):
+        return event_rating(obj, 'count', 0)
+
+    def get_rating_histogram(self, obj):
+        rating = getattr(obj, 'rating', None)
+        return rating.histogram if rating else {str(stars): 0 for stars in range(1, 6)}
+
     def get_feedbacks(self, obj):
         request = self.context.get('request')
         # Only allow event organizer to view feedbacks
-        if request and request.user == obj.organizer:
+        if request and request.user.id == obj.organizer_id:
             return FeedbackSerializer(obj.feedbacks.all(), many=True).data
         return []
 
@@ -28,14 +55,26 @@ class EventSerializer(serializers.ModelSerializer):
         model = Event
         fields = [
             'id', 'title', 'description', 'location', 'date',
-            'category', 'organizer', 'price', 'tickets','feedbacks'
+            'category', 'organizer', 'price', 'capacity', 'tickets_remaining',
+            'avg_rating', 'rating_count', 'rating_histogram',
+            'tickets','feedbacks'
         ]
+        # Left out once a client uses ?fields= or ?expand=, unless expanded
+        expandable_fields = ['tickets', 'feedbacks']
 
 
 # Lightweight serializer to avoid circular import
 class LightEventSerializer(serializers.ModelSerializer):
     organizer = serializers.CharField(source='organizer.username', read_only=True)
+    avg_rating = serializers.SerializerMethodField()
+    rating_count = serializers.SerializerMethodField()
+
+    def get_avg_rating(self, obj):
+        return event_rating(obj, 'average', None)
+
+    def get_rating_count(self, obj):
+        return event_rating(obj, 'count', 0)
 
     class Meta:
         model = Event
-        fields = ['id', 'title', 'location', 'date', 'category', 'organizer', 'price']
+        fields = ['id', 'title', 'location', 'date', 'category', 'organizer', 'price', 'avg_rating', 'rating_count']
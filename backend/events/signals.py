@@ -0,0 +1,35 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.outbox import EVENT_CHANGED, publish
+from feedback.models import Feedback
+from tickets.models import Ticket, TicketInventory
+from .cache import invalidate_event
+from .models import Event
+
+
+@receiver([post_save, post_delete], sender=Event)
+def invalidate_cached_event(sender, instance, **kwargs):
+    invalidate_event(instance.pk, edited=True)
+
+
+@receiver(post_save, sender=Event)
+def announce_event_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        publish(EVENT_CHANGED, event_changed(instance, 'created' if created else 'updated'))
+
+
+@receiver(post_delete, sender=Event)
+def announce_event_deleted(sender, instance, **kwargs):
+    publish(EVENT_CHANGED, event_changed(instance, 'deleted'))
+
+
+def event_changed(event, action):
+    return {'event_id': event.pk, 'organizer_id': event.organizer_id, 'action': action}
+
+
+@receiver([post_save, post_delete], sender=Ticket)
+@receiver([post_save, post_delete], sender=Feedback)
+@receiver([post_save, post_delete], sender=TicketInventory)
+def invalidate_cached_event_of(sender, instance, **kwargs):
+    invalidate_event(instance.event_id)
@@ -1,3 +1,377 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.testing import QueryPlanAssertionsMixin
+from feedback.models import Feedback
+from tickets.inventory import take_seats
+from tickets.models import Ticket
+from users.models import CustomUser
+from .async_views import AsyncEventListView
+from .models import Event
+
+
+class EventQueryCountTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.organizer = CustomUser.objects.create_user(
+            username='organizer', password='pass', role='organizer'
+        )
+        self.attendee_count = 0
+
+    def add_events(self, events, attendees_per_event):
+        for _ in range(events):
+            event = Event.objects.create(
+                title='Event', description='Description', location='Addis Ababa',
+                date=timezone.now() + timedelta(days=7), organizer=self.organizer,
+            )
+            for _ in range(attendees_per_event):
+                self.attendee_count += 1
+                attendee = CustomUser.objects.create_user(
+                    username=f'attendee{self.attendee_count}', password='pass', role='attendee'
+                )
+                Ticket.objects.create(event=event, attendee=attendee)
+                Feedback.objects.create(event=event, attendee=attendee, comment='Great', rating=4)
+        return event
+
+    def test_organizer_list_query_count_is_constant(self):
+        self.client.force_authenticate(self.organizer)
+        self.add_events(2, 1)
+        # events + feedbacks prefetch + tickets prefetch
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/events/')
+        self.assertEqual(response.status_code, 200)
+
+        self.add_events(5, 4)
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/events/')
+        self.assertEqual(response.status_code, 200)
+        events = response.json()['results']
+        self.assertEqual(len(events), 7)
+        self.assertEqual(sum(len(event['tickets']) for event in events), 22)
+
+    def test_detail_query_count_is_constant(self):
+        event = self.add_events(1, 6)
+        self.client.force_authenticate(self.organizer)
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/api/events/{event.id}/')
+        self.assertEqual(len(response.json()['tickets']), 6)
+        self.assertEqual(response.json()['feedbacks'][0]['attendee_username'], 'attendee1')
+
+    def test_anonymous_list_skips_tickets(self):
+        self.add_events(3, 3)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/events/')
+        self.assertTrue(all(event['tickets'] == [] for event in response.json()['results']))
+
+
+class EventPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        organizer = CustomUser.objects.create_user(username='organizer', password='pass', role='organizer')
+        start = timezone.now()
+        # Created in reverse so insertion order differs from date order
+        for day in reversed(range(25)):
+            Event.objects.create(
+                title=f'Event {day}', description='Description', location='Addis Ababa',
+                date=start + timedelta(days=day), organizer=organizer,
+            )
+
+    def test_pages_follow_date_order(self):
+        titles = []
+        url = '/api/events/?page_size=10'
+        while url:
+            page = self.client.get(url).json()
+            self.assertLessEqual(len(page['results']), 10)
+            titles += [event['title'] for event in page['results']]
+            url = page['next']
+        self.assertEqual(titles, [f'Event {day}' for day in range(25)])
+
+    def test_deep_pages_seek_instead_of_offset(self):
+        page = self.client.get('/api/events/?page_size=5').json()
+        for _ in range(3):
+            page = self.client.get(page['next']).json()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(page['next'])
+        sql = queries.captured_queries[0]['sql']
+        self.assertIn('"events_event"."date" >', sql)
+        self.assertNotIn('OFFSET', sql)
+
+    def test_page_size_is_capped(self):
+        page = self.client.get('/api/events/?page_size=1000').json()
+        self.assertEqual(len(page['results']), 25)
+        page = self.client.get('/api/events/').json()
+        self.assertEqual(len(page['results']), 20)
+
+
+class EventSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.organizer = CustomUser.objects.create_user(username='organizer', password='pass', role='organizer')
+
+    def create_event(self, title, description='Description', category='other'):
+        return Event.objects.create(
+            title=title, description=description, location='Addis Ababa', category=category,
+            date=timezone.now() + timedelta(days=1), organizer=self.organizer,
+        )
+
+    def search(self, query):
+        response = self.client.get('/api/events/', {'search': query})
+        self.assertEqual(response.status_code, 200)
+        return [event['title'] for event in response.json()['results']]
+
+    def test_prefix_matching(self):
+        self.create_event('Jazz Night')
+        self.create_event('Tech Conference', category='conference')
+        self.assertEqual(self.search('conf'), ['Tech Conference'])
+        self.assertEqual(self.search('ja ni'), ['Jazz Night'])
+        self.assertEqual(self.search('jazz tech'), [])
+
+    def test_title_matches_rank_above_description_matches(self):
+        self.create_event('Board games', description='Bring your own chess set')
+        self.create_event('Chess championship')
+        self.assertEqual(self.search('chess'), ['Chess championship', 'Board games'])
+
+    def test_ranked_results_paginate(self):
+        for number in range(12):
+            self.create_event(f'Chess {number}', description='chess ' * (number % 3))
+        self.create_event('Jazz Night')
+        titles = []
+        url = '/api/events/?search=chess&page_size=5'
+        while url:
+            page = self.client.get(url).json()
+            titles += [event['title'] for event in page['results']]
+            url = page['next']
+        self.assertEqual(sorted(titles), sorted(f'Chess {number}' for number in range(12)))
+
+    def test_index_follows_updates_and_deletes(self):
+        event = self.create_event('Poetry reading')
+        event.title = 'Open mic'
+        event.save()
+        self.assertEqual(self.search('poetry'), [])
+        self.assertEqual(self.search('mic'), ['Open mic'])
+        event.delete()
+        self.assertEqual(self.search('mic'), [])
+
+    def test_blank_or_symbol_query_returns_everything(self):
+        self.create_event('Jazz Night')
+        self.assertEqual(self.search('   '), ['Jazz Night'])
+        self.assertEqual(self.search('"*'), ['Jazz Night'])
+
+
+class EventIndexTests(QueryPlanAssertionsMixin, TestCase):
+    def setUp(self):
+        self.organizer = CustomUser.objects.create_user(username='organizer', password='pass', role='organizer')
+
+    def test_organizer_events_by_date_use_composite_index(self):
+        self.assertUsesIndex(
+            Event.objects.filter(organizer=self.organizer).order_by('date'),
+            'event_organizer_date_idx',
+        )
+
+    def test_catalogue_page_seeks_on_date_index(self):
+        self.assertUsesIndex(
+            Event.objects.filter(date__gt=timezone.now()).order_by('date', 'id')[:20],
+            'event_date_id_idx',
+        )
+
+    def test_category_page_uses_category_index(self):
+        self.assertUsesIndex(
+            Event.objects.filter(category='concert', date__gte=timezone.now()).order_by('date', 'id')[:20],
+            'event_category_date_idx',
+        )
+
+    def test_price_band_page_seeks_on_date_index(self):
+        self.assertUsesIndex(
+            Event.objects.filter(price__gte=100, price__lte=300, date__gte=timezone.now()).order_by('date', 'id')[:20],
+            'event_date_id_idx',
+        )
+
+
+class EventFilterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        organizer = CustomUser.objects.create_user(username='organizer', password='pass', role='organizer')
+        now = timezone.now()
+        for title, days, category, price in (
+            ('Past Concert', -10, 'concert', 100),
+            ('Free Workshop', 2, 'workshop', 0),
+            ('Soon Concert', 5, 'concert', 250),
+            ('Late Festival', 40, 'festival', 500),
+        ):
+            Event.objects.create(
+                title=title, description='Filters', location='Addis Ababa', category=category,
+                date=now + timedelta(days=days), price=price, organizer=organizer,
+            )
+
+    def titles(self, **params):
+        response = self.client.get('/api/events/', {'fields': 'title', **params})
+        self.assertEqual(response.status_code, 200)
+        return [item['title'] for item in response.json()['results']]
+
+    def test_upcoming_skips_past_events(self):
+        self.assertEqual(self.titles(upcoming='true'), ['Free Workshop', 'Soon Concert', 'Late Festival'])
+
+    def test_date_range_includes_the_whole_last_day(self):
+        today = timezone.localdate()
+        self.assertEqual(
+            self.titles(date_after=str(today), date_before=str(today + timedelta(days=5))),
+            ['Free Workshop', 'Soon Concert'],
+        )
+
+    def test_category_and_price_band(self):
+        self.assertEqual(self.titles(category='concert,festival', min_price='200'), ['Soon Concert', 'Late Festival'])
+        self.assertEqual(self.titles(max_price='0'), ['Free Workshop'])
+        self.assertEqual(self.titles(min_price='100', max_price='300', upcoming='1'), ['Soon Concert'])
+
+    def test_ordering_and_invalid_values(self):
+        self.assertEqual(
+            self.titles(ordering='-price', date_after='not-a-date', min_price='cheap'),
+            ['Late Festival', 'Soon Concert', 'Past Concert', 'Free Workshop'],
+        )
+
+
+@override_settings(EVENT_CACHE_TIMEOUT=300)
+class EventCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.organizer = CustomUser.objects.create_user(username='organizer', password='pass', role='organizer')
+        self.event, self.other = (
+            Event.objects.create(
+                title=title, description='Description', location='Addis Ababa',
+                date=timezone.now() + timedelta(days=7), organizer=self.organizer, capacity=10,
+            )
+            for title in ('Concert', 'Expo')
+        )
+
+    def test_anonymous_responses_are_served_from_cache(self):
+        first = self.client.get('/api/events/')
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/events/')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_matching_etag_gets_not_modified(self):
+        etag = self.client.get(f'/api/events/{self.event.id}/')['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(f'/api/events/{self.event.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_changes_invalidate_only_the_affected_event(self):
+        list_etag = self.client.get('/api/events/')['ETag']
+        other_etag = self.client.get(f'/api/events/{self.other.id}/')['ETag']
+        self.client.get(f'/api/events/{self.event.id}/')
+
+        attendee = CustomUser.objects.create_user(username='attendee', password='pass', role='attendee')
+        Feedback.objects.create(event=self.event, attendee=attendee, comment='Great', rating=5)
+
+        response = self.client.get(f'/api/events/{self.event.id}/')
+        self.assertEqual(response.json()['feedbacks'][0]['comment'], 'Great')
+        self.assertNotEqual(self.client.get('/api/events/')['ETag'], list_etag)
+        with self.assertNumQueries(0):
+            response = self.client.get(f'/api/events/{self.other.id}/', HTTP_IF_NONE_MATCH=other_etag)
+        self.assertEqual(response.status_code, 304)
+
+    async def test_async_list_answers_hits_without_the_viewset(self):
+        view = AsyncEventListView.as_view()
+        first = await view(AsyncRequestFactory().get('/api/events/'))
+        self.assertEqual(first.status_code, 200)
+        with mock.patch.object(AsyncEventListView, 'viewset_view', side_effect=AssertionError):
+            second = await view(AsyncRequestFactory().get('/api/events/'))
+        self.assertEqual((second.content, second['ETag']), (first.content, first['ETag']))
+
+    def test_inventory_updates_invalidate_the_event(self):
+        self.client.get(f'/api/events/{self.event.id}/')
+        take_seats(self.event, 3)
+        response = self.client.get(f'/api/events/{self.event.id}/')
+        self.assertEqual(response.json()['tickets_remaining'], 7)
+
+    def test_upcoming_lists_expire_as_events_pass(self):
+        self.event.date = timezone.now() + timedelta(minutes=30)
+        self.event.save()
+        first = self.client.get('/api/events/', {'upcoming': 'true', 'fields': 'title'})
+        self.assertEqual(len(first.json()['results']), 2)
+        later = timezone.now() + timedelta(hours=1)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            response = self.client.get(
+                '/api/events/', {'upcoming': 'true', 'fields': 'title'}, HTTP_IF_NONE_MATCH=first['ETag'],
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['title'] for item in response.json()['results']], ['Expo'])
+
+    def test_authenticated_requests_bypass_the_cache(self):
+        self.client.get('/api/events/')
+        self.client.force_authenticate(self.organizer)
+        response = self.client.get('/api/events/')
+        self.assertNotIn('ETag', response)
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.organizer = CustomUser.objects.create_user(username='organizer', password='pass', role='organizer')
+        attendee = CustomUser.objects.create_user(username='attendee', password='pass', role='attendee')
+        for n in range(3):
+            event = Event.objects.create(
+                title=f'Concert {n}', description='Long description ' * 100, location='Addis Ababa',
+                date=timezone.now() + timedelta(days=n + 1), organizer=self.organizer, price=100, capacity=10,
+            )
+            Ticket.objects.create(event=event, attendee=attendee)
+            Feedback.objects.create(event=event, attendee=attendee, comment='Great', rating=4)
+
+    def test_fields_limits_the_representation_and_the_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/events/', {'fields': 'id,title,date,price'})
+        [item, *_] = response.json()['results']
+        self.assertEqual(set(item), {'id', 'title', 'date', 'price'})
+        # One query, without the description or the joined tables
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"description"', queries[0]['sql'])
+        self.assertNotIn('users_customuser', queries[0]['sql'])
+
+    def test_nested_relations_are_opt_in_with_expand(self):
+        item = self.client.get('/api/events/', {'expand': ''}).json()['results'][0]
+        self.assertNotIn('feedbacks', item)
+        self.assertIn('description', item)
+
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/events/', {'fields': 'id,organizer,avg_rating', 'expand': 'feedbacks'})
+        item = response.json()['results'][0]
+        self.assertEqual(set(item), {'id', 'organizer', 'avg_rating', 'feedbacks'})
+        self.assertEqual((item['organizer'], item['avg_rating']), ('organizer', 4.0))
+        self.assertEqual(item['feedbacks'][0]['comment'], 'Great')
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get('/api/events/', {'fields': 'title,bogus,nope', 'expand': 'feedbacks,zzz'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {
+            'fields': ['Unknown fields: bogus, nope.'], 'expand': ['Unknown fields: zzz.'],
+        })
+        self.assertNotIn('ETag', response)
+        event = Event.objects.first()
+        self.assertEqual(self.client.get(f'/api/events/{event.id}/', {'fields': 'bogus'}).status_code, 400)
+        # The rejection is not cached over the valid representation
+        self.assertEqual(self.client.get('/api/events/', {'fields': 'title'}).status_code, 200)
+
+    def test_organizer_tickets_in_a_sparse_fieldset(self):
+        self.client.force_authenticate(self.organizer)
+        # The events and their tickets, without a query per event for organizer_id
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/events/', {'fields': 'id,tickets'})
+        items = response.json()['results']
+        self.assertEqual(len(items), 3)
+        self.assertTrue(all(set(item) == {'id', 'tickets'} and len(item['tickets']) == 1 for item in items))
+
+    def test_full_representation_by_default(self):
+        item = self.client.get(f'/api/events/{Event.objects.first().id}/').json()
+        self.assertIn('feedbacks', item)
+        self.assertEqual(item['tickets_remaining'], 10)
@@ -1,5 +1,7 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from .async_views import AsyncEventListView
 from .views import EventViewSet
 
 router = DefaultRouter()
@@ -9,3 +11,6 @@ urlpatterns = [
     path('', include(router.urls)),
     
 ]
+
+if settings.ASGI_MODE:
+    urlpatterns.insert(0, path('', AsyncEventListView.as_view(), name='event-list-async'))
@@ -1,25 +1,104 @@
-from rest_framework import viewsets, filters
+from django.db.models import F, Prefetch, Value
+from django.db.models.functions import Coalesce
+from rest_framework import filters, viewsets
 from rest_framework.permissions import AllowAny
+from .cache import LIST_GENERATION, detail_generation
+from .filters import EventFilter, EventRatingFilter, time_versions
 from .models import Event
+from .search import EventSearchFilter
 from .serializers import EventSerializer
+from core.cache import CachedResponseMixin
+from core.pagination import EventCursorPagination
+from core.serializers import requested_fields
+from feedback.models import Feedback
+from tickets.models import Ticket
 
+RATING_COLUMNS = ['rating__average', 'rating__count', *(f'rating__stars_{stars}' for stars in range(1, 6))]
+# (columns, select_related) each serializer field needs, where that is not
+# just the column of the same name; nested relations are prefetched below
+FIELD_LOADS = {
+    'organizer': (['organizer__username'], ['organizer']),
+    'tickets_remaining': (['capacity', 'inventory__remaining'], ['inventory']),
+    'avg_rating': (RATING_COLUMNS, ['rating']),
+    'rating_count': (RATING_COLUMNS, ['rating']),
+    'rating_histogram': (RATING_COLUMNS, ['rating']),
+    # Only rendered for the organizer, so the serializer compares organizer_id
+    'tickets': (['organizer_id'], []),
+    'feedbacks': (['organizer_id'], []),
+}
 
-class EventViewSet(viewsets.ModelViewSet):
+
+class EventViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     serializer_class = EventSerializer
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['title', 'description', 'location', 'category']
+    filter_backends = [EventSearchFilter, EventFilter, EventRatingFilter, filters.OrderingFilter]
+    ordering_fields = ['date', 'price', 'avg_rating', 'rating_count']
+    ordering = ('date', 'id')
     permission_classes = [AllowAny]  # Public can view; auth required to create
+    pagination_class = EventCursorPagination
 
     def get_queryset(self):
+        # Outside the try below so unknown field names surface as a 400
+        wanted = requested_fields(
+            self.request, EventSerializer.Meta.fields, EventSerializer.Meta.expandable_fields,
+        )
         try:
             user = self.request.user
+            if wanted is None:
+                wanted = set(EventSerializer.Meta.fields)
+                columns = None
+            else:
+                # Load only what the requested fields render, plus the
+                # columns keyset pagination reads from the last row
+                columns = {'id', 'date', 'price'}
+            related = []
+            for name in wanted:
+                field_columns, field_related = FIELD_LOADS.get(name, ([name], []))
+                if columns is not None:
+                    columns.update(field_columns)
+                related.extend(field_related)
+
+            # Organizer and attendee usernames are joined in up front so the
+            # serializer never goes back to the database per event or ticket.
+            queryset = Event.objects.all()
+            if related:
+                # select_related() without arguments would follow every foreign key
+                queryset = queryset.select_related(*related)
+            queryset = queryset.annotate(
+                # Unrated events sort and filter as 0
+                avg_rating=Coalesce(F('rating__average'), Value(0.0)),
+                rating_count=Coalesce(F('rating__count'), 0),
+            )
+            queryset = queryset.only(*columns) if columns is not None else queryset.defer('search_vector')
+            if 'feedbacks' in wanted:
+                queryset = queryset.prefetch_related(
+                    Prefetch('feedbacks', queryset=Feedback.objects.select_related('attendee')),
+                )
+            if user.is_authenticated and 'tickets' in wanted:
+                # Tickets are only rendered for events the user organizes
+                queryset = queryset.prefetch_related(
+                    Prefetch(
+                        'tickets',
+                        queryset=Ticket.objects.filter(event__organizer=user).select_related('attendee'),
+                    ),
+                )
             if user.is_authenticated and hasattr(user, 'role') and user.role == 'organizer':
-                return Event.objects.filter(organizer=user)
-            return Event.objects.all()
+                return queryset.filter(organizer=user)
+            return queryset
         except Exception as e:
             print("Error in get_queryset:", e)
             return Event.objects.none()
 
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            request, [LIST_GENERATION], lambda: super(EventViewSet, self).list(request, *args, **kwargs),
+            extra=time_versions(request.query_params),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            request, [detail_generation(kwargs[self.lookup_field])],
+            lambda: super(EventViewSet, self).retrieve(request, *args, **kwargs),
+        )
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
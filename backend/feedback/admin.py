@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Feedback
+from .models import EventRating, Feedback
 
 @admin.register(Feedback)
 class FeedbackAdmin(admin.ModelAdmin):
@@ -9,3 +9,9 @@ class FeedbackAdmin(admin.ModelAdmin):
     search_fields = ('event__title', 'attendee__username', 'comment')
     readonly_fields = ('created_at',)
     ordering = ('-created_at',)
+
+
+@admin.register(EventRating)
+class EventRatingAdmin(admin.ModelAdmin):
+    list_display = ('event', 'count', 'average')
+    ordering = ('-average',)
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from feedback.ratings import rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = "Recompute every event's rating aggregates from the feedback table."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            events = rebuild_ratings()
+        self.stdout.write(f"Rebuilt rating aggregates for {events} events.")
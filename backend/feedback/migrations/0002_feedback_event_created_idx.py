@@ -0,0 +1,19 @@
+# Generated by Django 5.2.15 on 2026-10-18 18:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['event', 'created_at'], name='feedback_event_created_idx'),
+        ),
+    ]
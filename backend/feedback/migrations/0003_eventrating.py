@@ -0,0 +1,36 @@
+# Generated by Django 5.2.15 on 2026-10-18 18:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from feedback.ratings import rebuild_ratings
+
+
+def backfill_ratings(apps, schema_editor):
+    rebuild_ratings(apps.get_model('feedback', 'Feedback'), apps.get_model('feedback', 'EventRating'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_event_capacity'),
+        ('feedback', '0002_feedback_event_created_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventRating',
+            fields=[
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating', serialize=False, to='events.event')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('average', models.FloatField(blank=True, null=True)),
+                ('stars_1', models.PositiveIntegerField(default=0)),
+                ('stars_2', models.PositiveIntegerField(default=0)),
+                ('stars_3', models.PositiveIntegerField(default=0)),
+                ('stars_4', models.PositiveIntegerField(default=0)),
+                ('stars_5', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
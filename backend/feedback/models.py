@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from events.models import Event
 from django.conf import settings
 
@@ -11,6 +11,45 @@ class Feedback(models.Model):
 
     class Meta:
         unique_together = ('event', 'attendee')  # Prevent duplicate feedbacks from same user per event
+        indexes = [
+            models.Index(fields=['event', 'created_at'], name='feedback_event_created_idx'),
+        ]
 
     def __str__(self):
         return f'Feedback by {self.attendee.username} on {self.event.title}'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what the aggregates currently count for this row
+        instance._counted = (instance.__dict__.get('event_id'), instance.__dict__.get('rating'))
+        return instance
+
+    def save(self, *args, **kwargs):
+        # The aggregates are updated by the post_save receiver; keep both in one transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class EventRating(models.Model):
+    """
+    Running rating totals for an event, maintained incrementally as feedback
+    is written (see feedback.ratings). Kept in its own row, like ticket
+    inventory, so event edits never overwrite a concurrent update.
+    """
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, primary_key=True, related_name='rating')
+    count = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    average = models.FloatField(null=True, blank=True)
+    stars_1 = models.PositiveIntegerField(default=0)
+    stars_2 = models.PositiveIntegerField(default=0)
+    stars_3 = models.PositiveIntegerField(default=0)
+    stars_4 = models.PositiveIntegerField(default=0)
+    stars_5 = models.PositiveIntegerField(default=0)
+
+    @property
+    def histogram(self):
+        return {str(stars): getattr(self, f'stars_{stars}') for stars in range(1, 6)}
+
+    def __str__(self):
+        return f'{self.event.title}: {self.average} from {self.count} ratings'
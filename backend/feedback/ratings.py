@@ -0,0 +1,91 @@
+"""
+Per-event rating aggregates.
+
+Every feedback write applies its delta to the event's EventRating row with
+a single conditional UPDATE inside the write's transaction, so aggregates
+never drift under concurrent reviews and reading them costs nothing.
+Writes that bypass the model (queryset.update(), raw SQL) are not tracked;
+`manage.py rebuild_ratings` recomputes everything from the feedback table.
+"""
+from django.db.models import Case, Count, Exists, F, FloatField, OuterRef, Q, Sum, When
+from django.db.models.functions import Cast
+
+STARS = range(1, 6)
+
+
+def stars_field(rating):
+    return f'stars_{rating}' if rating in STARS else None
+
+
+def apply_rating(event_id, rating, sign):
+    """Add (sign=1) or remove (sign=-1) one rating from the event's aggregates."""
+    from .models import EventRating
+
+    if sign > 0:
+        EventRating.objects.get_or_create(event_id=event_id)
+    # Removals only touch an existing row: when an event is deleted its
+    # rating row may already be gone by the time its feedback is
+    changes = {'count': F('count') + sign, 'total': F('total') + sign * rating}
+    if stars_field(rating):
+        changes[stars_field(rating)] = F(stars_field(rating)) + sign
+    ratings = EventRating.objects.filter(event_id=event_id)
+    ratings.update(**changes)
+    ratings.update(average=average_expression())
+
+
+def average_expression():
+    return Case(
+        When(count=0, then=None),
+        default=Cast('total', FloatField()) / F('count'),
+        output_field=FloatField(),
+    )
+
+
+def rating_changed(feedback, created):
+    counted_event, counted_rating = getattr(feedback, '_counted', (None, None))
+    if not created and (counted_event, counted_rating) == (feedback.event_id, feedback.rating):
+        return
+    if not created and counted_event is not None:
+        apply_rating(counted_event, counted_rating, -1)
+    apply_rating(feedback.event_id, feedback.rating, 1)
+    feedback._counted = (feedback.event_id, feedback.rating)
+
+
+def rating_deleted(feedback):
+    counted_event, counted_rating = getattr(feedback, '_counted', (feedback.event_id, feedback.rating))
+    apply_rating(counted_event, counted_rating, -1)
+
+
+def rebuild_ratings(feedback_model=None, rating_model=None):
+    """
+    Recompute every event's aggregates from the feedback table in a few bulk
+    queries. Takes the models as arguments so migrations can pass their
+    historical versions. Returns the number of events with ratings.
+    """
+    if feedback_model is None:
+        from .models import EventRating as rating_model, Feedback as feedback_model
+
+    rows = (
+        feedback_model.objects.values('event_id')
+        .annotate(
+            count=Count('id'),
+            total=Sum('rating'),
+            **{stars_field(stars): Count('id', filter=Q(rating=stars)) for stars in STARS},
+        )
+        .order_by()
+    )
+    ratings = [
+        rating_model(average=row['total'] / row['count'], **row)
+        for row in rows
+    ]
+    rating_model.objects.exclude(
+        Exists(feedback_model.objects.filter(event_id=OuterRef('event_id')))
+    ).delete()
+    rating_model.objects.bulk_create(
+        ratings,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['event'],
+        update_fields=['count', 'total', 'average', *(stars_field(stars) for stars in STARS)],
+    )
+    return len(ratings)
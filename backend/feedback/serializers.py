@@ -4,6 +4,7 @@ from .models import Feedback
 
 class FeedbackSerializer(serializers.ModelSerializer):
     attendee_username = serializers.ReadOnlyField(source='attendee.username')
+    rating = serializers.IntegerField(min_value=1, max_value=5, default=5)
 
     class Meta:
         model = Feedback
@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.outbox import FEEDBACK_SUBMITTED, publish
+from .models import Feedback
+from .ratings import rating_changed, rating_deleted
+
+
+@receiver(post_save, sender=Feedback)
+def update_event_rating(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        rating_changed(instance, created)
+        if created:
+            publish(FEEDBACK_SUBMITTED, {
+                'feedback_id': instance.pk, 'event_id': instance.event_id,
+                'attendee_id': instance.attendee_id, 'rating': instance.rating,
+            })
+
+
+@receiver(post_delete, sender=Feedback)
+def remove_event_rating(sender, instance, **kwargs):
+    rating_deleted(instance)
@@ -1,3 +1,139 @@
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from core.testing import QueryPlanAssertionsMixin
+from events.models import Event
+from users.models import CustomUser
+from .models import EventRating, Feedback
+from .ratings import rebuild_ratings
+
+
+class FeedbackIndexTests(QueryPlanAssertionsMixin, TestCase):
+    def test_event_feedback_listing_uses_created_index(self):
+        organizer = CustomUser.objects.create_user(username='organizer', password='pass', role='organizer')
+        event = Event.objects.create(
+            title='Event', description='Description', location='Addis Ababa',
+            date=timezone.now(), organizer=organizer,
+        )
+        self.assertUsesIndex(
+            Feedback.objects.filter(event=event).order_by('-created_at', '-id'),
+            'feedback_event_created_idx',
+        )
+
+
+class FeedbackListPaginationTests(TestCase):
+    def setUp(self):
+        organizer = CustomUser.objects.create_user(username='organizer', password='pass', role='organizer')
+        self.event = Event.objects.create(
+            title='Event', description='Description', location='Addis Ababa',
+            date=timezone.now(), organizer=organizer,
+        )
+        for n in range(25):
+            attendee = CustomUser.objects.create_user(username=f'attendee{n}', password='pass', role='attendee')
+            Feedback.objects.create(event=self.event, attendee=attendee, comment=f'Comment {n}', rating=5)
+        self.client = APIClient()
+        self.client.force_authenticate(organizer)
+
+    def test_pages_follow_newest_first(self):
+        comments = []
+        url = f'/api/events/{self.event.id}/feedback/?page_size=10'
+        while url:
+            page = self.client.get(url).json()
+            self.assertLessEqual(len(page['results']), 10)
+            comments += [feedback['comment'] for feedback in page['results']]
+            url = page['next']
+        self.assertEqual(comments, [f'Comment {n}' for n in reversed(range(25))])
+
+    def test_page_size_is_capped(self):
+        page = self.client.get(f'/api/events/{self.event.id}/feedback/?page_size=1000').json()
+        self.assertEqual(len(page['results']), 25)
+        self.assertEqual(len(self.client.get(f'/api/events/{self.event.id}/feedback/').json()['results']), 20)
+
+
+class EventRatingTests(TestCase):
+    def setUp(self):
+        self.organizer = CustomUser.objects.create_user(username='organizer', password='pass', role='organizer')
+        self.event, self.other = (
+            Event.objects.create(
+                title=title, description='Description', location='Addis Ababa',
+                date=timezone.now(), organizer=self.organizer,
+            )
+            for title in ('Concert', 'Expo')
+        )
+        self.attendees = [
+            CustomUser.objects.create_user(username=f'attendee{n}', password='pass', role='attendee')
+            for n in range(3)
+        ]
+
+    def rate(self, event, attendee, rating):
+        return Feedback.objects.create(event=event, attendee=attendee, comment='Comment', rating=rating)
+
+    def test_aggregates_follow_create_update_and_delete(self):
+        first = self.rate(self.event, self.attendees[0], 5)
+        self.rate(self.event, self.attendees[1], 3)
+        rating = EventRating.objects.get(event=self.event)
+        self.assertEqual((rating.count, rating.total, rating.average), (2, 8, 4.0))
+
+        first = Feedback.objects.get(pk=first.pk)
+        first.rating = 1
+        first.save()
+        rating.refresh_from_db()
+        self.assertEqual((rating.count, rating.average), (2, 2.0))
+        self.assertEqual(rating.histogram, {'1': 1, '2': 0, '3': 1, '4': 0, '5': 0})
+
+        Feedback.objects.filter(pk=first.pk).delete()
+        rating.refresh_from_db()
+        self.assertEqual((rating.count, rating.total, rating.average, rating.stars_1), (1, 3, 3.0, 0))
+
+    def test_rebuild_matches_incremental_aggregates(self):
+        for attendee, rating in zip(self.attendees, (4, 5, 2)):
+            self.rate(self.event, attendee, rating)
+        self.rate(self.other, self.attendees[0], 1)
+        expected = list(EventRating.objects.order_by('event').values())
+        EventRating.objects.update(count=0, total=0, average=None, stars_4=7)
+        EventRating.objects.create(event=Event.objects.create(
+            title='Unrated', description='Description', location='Addis Ababa',
+            date=timezone.now(), organizer=self.organizer,
+        ))
+
+        self.assertEqual(rebuild_ratings(), 2)
+        self.assertEqual(list(EventRating.objects.order_by('event').values()), expected)
+
+    def test_deleting_a_rated_event(self):
+        self.rate(self.event, self.attendees[0], 4)
+        self.event.delete()
+        self.assertFalse(EventRating.objects.exists())
+
+    def test_events_can_be_ordered_and_filtered_by_rating(self):
+        self.rate(self.event, self.attendees[0], 3)
+        self.rate(self.other, self.attendees[0], 5)
+        Event.objects.create(
+            title='Unrated', description='Description', location='Addis Ababa',
+            date=timezone.now(), organizer=self.organizer,
+        )
+        client = APIClient()
+
+        response = client.get('/api/events/', {'ordering': '-avg_rating', 'page_size': 2})
+        page = response.json()
+        self.assertEqual([event['title'] for event in page['results']], ['Expo', 'Concert'])
+        self.assertEqual(page['results'][0]['rating_count'], 1)
+        self.assertEqual(client.get(page['next']).json()['results'][0]['avg_rating'], None)
+
+        response = client.get('/api/events/', {'min_rating': 4})
+        self.assertEqual([event['title'] for event in response.json()['results']], ['Expo'])
+
+    def test_min_rating_must_be_a_rating(self):
+        client = APIClient()
+        for value in ('abc', 'nan', 'inf', '-inf', '-1', '5.5'):
+            with self.subTest(value=value):
+                response = client.get('/api/events/', {'min_rating': value})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('min_rating', response.json())
+        self.assertEqual(client.get('/api/events/', {'min_rating': '0'}).status_code, 200)
+
+    def test_rating_must_be_one_to_five(self):
+        client = APIClient()
+        client.force_authenticate(self.attendees[0])
+        response = client.post(f'/api/events/{self.event.id}/feedback/', {'comment': 'Hm', 'rating': 9})
+        self.assertEqual(response.status_code, 400)
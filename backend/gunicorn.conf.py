@@ -0,0 +1,16 @@
+# Gunicorn settings, read automatically from the working directory.
+# ASGI_MODE=true serves core.asgi with uvicorn workers; the default is the
+# classic sync WSGI setup.
+import os
+
+# Imported as a module: a top-level `config` would shadow gunicorn's own setting
+import decouple
+
+asgi_mode = decouple.config('ASGI_MODE', default=False, cast=bool)
+
+wsgi_app = 'core.asgi:application' if asgi_mode else 'core.wsgi:application'
+worker_class = 'uvicorn_worker.UvicornWorker' if asgi_mode else 'sync'
+# Keep in step with WEB_CONCURRENCY in core/settings.py (database connection check)
+workers = decouple.config('WEB_CONCURRENCY', default=2, cast=int)
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+timeout = decouple.config('GUNICORN_TIMEOUT', default=30, cast=int)
@@ -1,6 +1,8 @@
 # admin.py
 from django.contrib import admin
-from .models import Ticket
+from .models import CheckIn, Ticket, TicketHold, TicketInventory
 
 admin.site.register(Ticket)
-
+admin.site.register(TicketInventory)
+admin.site.register(TicketHold)
+admin.site.register(CheckIn)
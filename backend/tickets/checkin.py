@@ -0,0 +1,65 @@
+"""
+Ingesting check-ins uploaded by door scanners.
+
+Scanners verify codes offline and upload their scans in batches. A batch is
+checked against the signatures again (uploads are not trusted), collapsed
+to the earliest scan per ticket, and written with one bulk INSERT that
+skips tickets already checked in, so double scans and re-uploads of the
+same batch are harmless.
+"""
+from django.db import transaction
+
+from .codes import InvalidCode, verify_code
+from .models import CheckIn, Ticket
+
+LOOKUP_BATCH_SIZE = 1000
+
+
+def ingest_scans(event, scans, device=''):
+    """
+    Record `scans` (dicts with `code` and an aware `scanned_at`) for `event`.
+    Returns counts of new check-ins, duplicates (already checked in or
+    scanned twice in the batch) and the positions of rejected scans.
+    """
+    earliest = {}
+    rejected = []
+    duplicates = 0
+    for position, scan in enumerate(scans):
+        try:
+            _, ticket_id = verify_code(scan['code'], event_id=event.id)
+        except InvalidCode as exc:
+            rejected.append({'index': position, 'reason': str(exc)})
+            continue
+        if ticket_id in earliest:
+            duplicates += 1
+            earliest[ticket_id] = min(earliest[ticket_id], scan['scanned_at'])
+        else:
+            earliest[ticket_id] = scan['scanned_at']
+
+    ticket_ids = list(earliest)
+    with transaction.atomic():
+        existing = set()
+        done = set()
+        for start in range(0, len(ticket_ids), LOOKUP_BATCH_SIZE):
+            chunk = ticket_ids[start:start + LOOKUP_BATCH_SIZE]
+            # Signed codes of deleted tickets still verify; drop them here
+            existing.update(Ticket.objects.filter(id__in=chunk, event=event).values_list('id', flat=True))
+            done.update(CheckIn.objects.filter(ticket_id__in=chunk).values_list('ticket_id', flat=True))
+        new = [ticket_id for ticket_id in ticket_ids if ticket_id in existing and ticket_id not in done]
+        CheckIn.objects.bulk_create(
+            (
+                CheckIn(ticket_id=ticket_id, event=event, scanned_at=earliest[ticket_id], device=device)
+                for ticket_id in new
+            ),
+            batch_size=LOOKUP_BATCH_SIZE,
+            # A concurrent upload of the same ticket wins; ours is a double scan
+            ignore_conflicts=True,
+        )
+
+    unknown = [ticket_id for ticket_id in ticket_ids if ticket_id not in existing]
+    return {
+        'checked_in': len(new),
+        'duplicates': duplicates + len(done),
+        'unknown_tickets': len(unknown),
+        'rejected': rejected,
+    }
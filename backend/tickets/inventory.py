@@ -0,0 +1,195 @@
+"""
+Ticket inventory for events with a capacity.
+
+Stock lives in one TicketInventory row per event. Every change is a single
+conditional UPDATE (`remaining = remaining - 1 WHERE remaining > 0`), so
+concurrent buyers never read-modify-write the counter and the row lock is
+held only for the rest of the short transaction doing the purchase
+bookkeeping, never across the call to Chapa.
+
+A purchase takes its seat when checkout starts (a TicketHold tied to the
+payment). The hold becomes a ticket when the payment succeeds, or goes back
+into stock when the payment fails or the hold expires.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from core.outbox import TICKET_ISSUED, publish_many
+from events.cache import invalidate_event
+from users.models import CustomUser
+from .models import Ticket, TicketHold, TicketInventory
+from .wallet import invalidate_wallets
+
+COMP_BATCH_SIZE = 1000
+
+
+class SoldOut(Exception):
+    pass
+
+
+def sync_inventory(event):
+    """Bring the stock row in line with `event.capacity` after it is created or edited."""
+    with transaction.atomic():
+        inventory = TicketInventory.objects.select_for_update().filter(event=event).first()
+        if event.capacity is None:
+            if inventory:
+                inventory.delete()
+            return
+        if inventory is None:
+            taken = (
+                Ticket.objects.filter(event=event).count()
+                + TicketHold.objects.filter(event=event).count()
+            )
+            TicketInventory.objects.create(
+                event=event, capacity=event.capacity, remaining=max(event.capacity - taken, 0)
+            )
+        elif inventory.capacity != event.capacity:
+            TicketInventory.objects.filter(event=event).update(
+                capacity=event.capacity,
+                remaining=Greatest(F('remaining') + (event.capacity - inventory.capacity), 0),
+            )
+            invalidate_event(event.id)
+
+
+def take_seats(event, count=1):
+    """Atomically take `count` seats, returning False if not enough are left."""
+    if event.capacity is None:
+        return True
+    taken = TicketInventory.objects.filter(event=event, remaining__gte=count).update(
+        remaining=F('remaining') - count
+    )
+    if taken:
+        # Stock changes through update(), which sends no signals
+        invalidate_event(event.id)
+    return bool(taken)
+
+
+def take_seat(event):
+    """Take one seat, reclaiming expired holds first when none is free. Raises SoldOut."""
+    if not take_seats(event) and not (release_expired_holds(event) and take_seats(event)):
+        raise SoldOut()
+
+
+def return_seats(event_id, count=1):
+    if count:
+        TicketInventory.objects.filter(event_id=event_id).update(remaining=F('remaining') + count)
+        invalidate_event(event_id)
+
+
+def release_expired_holds(event=None):
+    """Put seats from abandoned checkouts back on sale. Returns the number released."""
+    holds = TicketHold.objects.filter(expires_at__lte=timezone.now())
+    if event is not None:
+        holds = holds.filter(event=event)
+    released = 0
+    with transaction.atomic():
+        expired = defaultdict(list)
+        for hold_id, event_id in holds.select_for_update(skip_locked=True).values_list('id', 'event_id'):
+            expired[event_id].append(hold_id)
+        for event_id, ids in expired.items():
+            deleted, _ = TicketHold.objects.filter(id__in=ids).delete()
+            return_seats(event_id, deleted)
+            released += deleted
+    return released
+
+
+def hold_seat(event, payment):
+    """
+    Reserve a seat for `payment` until it completes or the hold expires.
+    Any earlier hold of the same buyer on this event is given back first.
+    Raises SoldOut when no seat is free.
+    """
+    with transaction.atomic():
+        previous, _ = TicketHold.objects.filter(event=event, user=payment.user).delete()
+        return_seats(event.id, previous)
+        take_seat(event)
+        return TicketHold.objects.create(
+            event=event,
+            user=payment.user,
+            payment=payment,
+            expires_at=timezone.now() + timedelta(minutes=settings.TICKET_HOLD_MINUTES),
+        )
+
+
+def release_hold(payment):
+    """Give the seat held for `payment` back, e.g. when the payment failed."""
+    deleted, _ = TicketHold.objects.filter(payment=payment).delete()
+    return_seats(payment.event_id, deleted)
+
+
+def issue_ticket(payment):
+    """
+    Turn the seat held for a successful payment into a ticket. If the hold
+    already expired a fresh seat is taken, raising SoldOut when none is left.
+    Safe to call repeatedly and concurrently for the same payment.
+    """
+    with transaction.atomic():
+        ticket = Ticket.objects.filter(attendee=payment.user, event=payment.event).first()
+        if ticket:
+            release_hold(payment)
+            return ticket, False
+        held, _ = TicketHold.objects.filter(payment=payment).delete()
+        if not held and not take_seats(payment.event):
+            raise SoldOut()
+        ticket, created = Ticket.objects.get_or_create(
+            attendee=payment.user,
+            event=payment.event,
+            defaults={'payment': payment},
+        )
+        if not created:
+            # Already issued by a concurrent call; give back the seat we took
+            return_seats(payment.event_id)
+    return ticket, created
+
+
+def ticket_issued(ticket):
+    """Payload of the TicketIssued outbox message."""
+    return {
+        'ticket_id': ticket.pk, 'event_id': ticket.event_id, 'attendee_id': ticket.attendee_id,
+        'payment_id': ticket.payment_id,
+    }
+
+
+def issue_comp_tickets(event, usernames):
+    """
+    Issue complimentary tickets (no payment) to every named attendee who
+    does not have one yet, in bulk. All or nothing: raises SoldOut if the
+    event cannot seat them all.
+    """
+    usernames = list(dict.fromkeys(usernames))
+    users = {}
+    ticketed = set()
+    with transaction.atomic():
+        # Look up in batches to stay under the database's bound-parameter limit
+        for start in range(0, len(usernames), COMP_BATCH_SIZE):
+            found = dict(
+                CustomUser.objects.filter(username__in=usernames[start:start + COMP_BATCH_SIZE])
+                .values_list('username', 'id')
+            )
+            users.update(found)
+            ticketed.update(
+                Ticket.objects.filter(event=event, attendee_id__in=found.values())
+                .values_list('attendee_id', flat=True)
+            )
+        new = [user_id for user_id in users.values() if user_id not in ticketed]
+        if new and not take_seats(event, len(new)):
+            raise SoldOut()
+        tickets = Ticket.objects.bulk_create(
+            (Ticket(event=event, attendee_id=user_id) for user_id in new), batch_size=COMP_BATCH_SIZE
+        )
+        # bulk_create sends no post_save
+        invalidate_event(event.id)
+        invalidate_wallets(*new)
+        publish_many(TICKET_ISSUED, map(ticket_issued, tickets))
+    by_id = {user_id: username for username, user_id in users.items()}
+    return {
+        'created': len(new),
+        'already_ticketed': sorted(by_id[user_id] for user_id in ticketed),
+        'unknown': [username for username in usernames if username not in users],
+    }
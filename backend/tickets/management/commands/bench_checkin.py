@@ -0,0 +1,78 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from events.models import Event
+from tickets.codes import scanner_key, ticket_code, verify_code
+from tickets.models import CheckIn, Ticket
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure door-scanner throughput: offline code verification per second, "
+        "and scans per second ingested through the batched check-in upload "
+        "endpoint. Sample data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tickets', type=int, default=20000)
+        parser.add_argument('--batch', type=int, default=2000, help="Scans per upload.")
+        parser.add_argument('--double-scans', type=float, default=0.05, help="Share of scans repeated.")
+
+    def handle(self, *args, **options):
+        total = options['tickets']
+        with transaction.atomic():
+            organizer = CustomUser.objects.create_user(username='bench-organizer', role='organizer')
+            event = Event.objects.create(
+                title='Stadium', description='Benchmark', location='Addis Ababa',
+                date=timezone.now(), organizer=organizer,
+            )
+            CustomUser.objects.bulk_create(
+                (CustomUser(username=f'bench-fan-{n}', role='attendee') for n in range(total)), batch_size=2000
+            )
+            fans = CustomUser.objects.filter(username__startswith='bench-fan-').values_list('id', flat=True)
+            Ticket.objects.bulk_create((Ticket(event=event, attendee_id=fan) for fan in fans), batch_size=2000)
+            codes = [
+                ticket_code(event.id, ticket_id)
+                for ticket_id in Ticket.objects.filter(event=event).values_list('id', flat=True)
+            ]
+
+            key = scanner_key(event.id)
+            started = time.perf_counter()
+            for code in codes:
+                verify_code(code, key=key, event_id=event.id)
+            self.report('offline verify', len(codes), 'codes', time.perf_counter() - started)
+
+            scans = self.scans(codes, options['double_scans'])
+            client = APIClient(HTTP_HOST='localhost')
+            client.force_authenticate(organizer)
+            started = time.perf_counter()
+            for start in range(0, len(scans), options['batch']):
+                response = client.post(
+                    '/api/checkins/',
+                    {'event': event.id, 'device': 'gate-1', 'scans': scans[start:start + options['batch']]},
+                    format='json',
+                )
+                assert response.status_code == 200, response.content
+            self.report(f"upload, {options['batch']} per batch", len(scans), 'scans', time.perf_counter() - started)
+            assert CheckIn.objects.filter(event=event).count() == len(codes)
+            transaction.set_rollback(True)
+
+    def scans(self, codes, double_share):
+        now = timezone.now()
+        scans = [{'code': code, 'scanned_at': now} for code in codes]
+        scans += [
+            {'code': code, 'scanned_at': now + timedelta(seconds=5)}
+            for code in random.sample(codes, int(len(codes) * double_share))
+        ]
+        random.shuffle(scans)
+        return [{'code': scan['code'], 'scanned_at': scan['scanned_at'].isoformat()} for scan in scans]
+
+    def report(self, label, count, unit, elapsed):
+        self.stdout.write(f"{label:<28} {count:>7} {unit}  {elapsed:7.2f}s  {count / elapsed:10.1f} {unit}/s")
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.15 on 2026-10-18 18:05
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicate_tickets(apps, schema_editor):
+    """Keep the earliest ticket per (attendee, event) so the constraint can be added."""
+    Ticket = apps.get_model('tickets', 'Ticket')
+    keep = (
+        Ticket.objects.values('attendee', 'event')
+        .annotate(first_id=Min('id'))
+        .values('first_id')
+    )
+    Ticket.objects.exclude(id__in=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0004_remove_ticket_quantity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_tickets, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['event', 'purchase_date'], name='ticket_event_purchase_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='ticket',
+            constraint=models.UniqueConstraint(fields=('attendee', 'event'), name='unique_ticket_per_attendee'),
+        ),
+    ]
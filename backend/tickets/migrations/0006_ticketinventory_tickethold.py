@@ -0,0 +1,40 @@
+# Generated by Django 5.2.15 on 2026-10-18 18:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Payment', '0005_payment_status_created_idx'),
+        ('events', '0007_event_capacity'),
+        ('tickets', '0005_ticket_unique_attendee_event'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketInventory',
+            fields=[
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='inventory', serialize=False, to='events.event')),
+                ('capacity', models.PositiveIntegerField()),
+                ('remaining', models.PositiveIntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TicketHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField()),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ticket_holds', to='events.event')),
+                ('payment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='hold', to='Payment.payment')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ticket_holds', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['expires_at'], name='ticket_hold_expires_idx')],
+            },
+        ),
+    ]
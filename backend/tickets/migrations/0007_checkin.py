@@ -0,0 +1,29 @@
+# Generated by Django 5.2.15 on 2026-10-18 18:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_event_capacity'),
+        ('tickets', '0006_ticketinventory_tickethold'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CheckIn',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scanned_at', models.DateTimeField()),
+                ('device', models.CharField(blank=True, max_length=100)),
+                ('uploaded_at', models.DateTimeField(auto_now_add=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='check_ins', to='events.event')),
+                ('ticket', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='check_in', to='tickets.ticket')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['event', 'scanned_at'], name='checkin_event_scanned_idx')],
+            },
+        ),
+    ]
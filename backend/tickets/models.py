@@ -11,5 +11,69 @@ class Ticket(models.Model):
     purchase_date = models.DateTimeField(auto_now_add=True)
     payment = models.ForeignKey(Payment, on_delete=models.SET_NULL, null=True, blank=True)
 
+    class Meta:
+        constraints = [
+            # One ticket per user per event; also serves (attendee, event) lookups
+            models.UniqueConstraint(fields=['attendee', 'event'], name='unique_ticket_per_attendee'),
+        ]
+        indexes = [
+            models.Index(fields=['event', 'purchase_date'], name='ticket_event_purchase_idx'),
+        ]
+
     def __str__(self):
         return f"{self.attendee.username} - {self.event.title} - {self.id}"
+
+    @property
+    def code(self):
+        """Signed code for the ticket's QR code; see tickets.codes."""
+        from .codes import ticket_code
+        return ticket_code(self.event_id, self.id)
+
+
+class TicketInventory(models.Model):
+    """
+    Live stock counter for events with a capacity. Kept in its own row so
+    that ordinary event edits never overwrite a concurrent decrement, and so
+    that purchases lock only this row, never the event itself.
+    """
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, primary_key=True, related_name='inventory')
+    capacity = models.PositiveIntegerField()
+    remaining = models.PositiveIntegerField()
+
+    def __str__(self):
+        return f"{self.event.title}: {self.remaining}/{self.capacity} left"
+
+
+class TicketHold(models.Model):
+    """A seat taken out of inventory while its payment is in flight."""
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='ticket_holds')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='ticket_holds')
+    payment = models.OneToOneField(Payment, on_delete=models.CASCADE, related_name='hold')
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['expires_at'], name='ticket_hold_expires_idx'),
+        ]
+
+    def __str__(self):
+        return f"Hold for {self.user.username} on {self.event.title} until {self.expires_at}"
+
+
+
+class CheckIn(models.Model):
+    """A ticket scanned at the door. At most one per ticket; repeat scans are dropped."""
+    ticket = models.OneToOneField(Ticket, on_delete=models.CASCADE, related_name='check_in')
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='check_ins')
+    scanned_at = models.DateTimeField()
+    device = models.CharField(max_length=100, blank=True)
+    uploaded_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['event', 'scanned_at'], name='checkin_event_scanned_idx'),
+        ]
+
+    def __str__(self):
+        return f"Ticket {self.ticket_id} checked in at {self.scanned_at}"
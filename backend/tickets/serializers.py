@@ -3,16 +3,18 @@
 from rest_framework import serializers
 from .models import Ticket
 from users.serializers import CustomUserSerializer
+from events.models import Event
 from events.serializers import LightEventSerializer
 
 class TicketSerializer(serializers.ModelSerializer):
     attendee = CustomUserSerializer(read_only=True)
-    event = serializers.PrimaryKeyRelatedField(queryset=Ticket.objects.all())  # For POST
+    event = serializers.PrimaryKeyRelatedField(queryset=Event.objects.all())  # For POST
     event_info = LightEventSerializer(source='event', read_only=True)
+    code = serializers.CharField(read_only=True)
 
     class Meta:
         model = Ticket
-        fields = ['id', 'event', 'event_info', 'attendee', 'purchase_date']
+        fields = ['id', 'event', 'event_info', 'attendee', 'purchase_date', 'code']
         read_only_fields = ['attendee', 'purchase_date']
 
 
@@ -24,3 +26,22 @@ class BasicTicketSerializer(serializers.ModelSerializer):
         model = Ticket
         fields = ['id', 'purchase_date', 'attendee']
 
+
+
+class BulkTicketSerializer(serializers.Serializer):
+    event = serializers.PrimaryKeyRelatedField(queryset=Event.objects.all())
+    attendees = serializers.ListField(
+        child=serializers.CharField(max_length=150), allow_empty=False, max_length=50000,
+        help_text="Usernames of the attendees to ticket.",
+    )
+
+
+class ScanSerializer(serializers.Serializer):
+    code = serializers.CharField(max_length=100)
+    scanned_at = serializers.DateTimeField()
+
+
+class CheckInUploadSerializer(serializers.Serializer):
+    event = serializers.PrimaryKeyRelatedField(queryset=Event.objects.all())
+    device = serializers.CharField(max_length=100, required=False, default='')
+    scans = serializers.ListField(child=ScanSerializer(), allow_empty=False, max_length=20000)
@@ -0,0 +1,26 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.outbox import TICKET_ISSUED, publish
+from events.models import Event
+from .inventory import sync_inventory, ticket_issued
+from .models import Ticket
+from .wallet import invalidate_wallets
+
+
+@receiver(post_save, sender=Event)
+def keep_inventory_in_sync(sender, instance, created, **kwargs):
+    if created and instance.capacity is None:
+        return
+    sync_inventory(instance)
+
+
+@receiver([post_save, post_delete], sender=Ticket)
+def invalidate_attendee_wallet(sender, instance, **kwargs):
+    invalidate_wallets(instance.attendee_id)
+
+
+@receiver(post_save, sender=Ticket)
+def announce_ticket_issued(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        publish(TICKET_ISSUED, ticket_issued(instance))
@@ -1,3 +1,393 @@
-from django.test import TestCase
+import base64
+import csv
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.test import AsyncRequestFactory, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient, force_authenticate
+
+from core.testing import QueryPlanAssertionsMixin
+from events.models import Event
+from Payment.models import Payment
+from users.models import CustomUser
+from .codes import InvalidCode, scanner_key, verify_code
+from .inventory import SoldOut, hold_seat, issue_comp_tickets, issue_ticket, release_hold
+from .models import CheckIn, Ticket, TicketHold, TicketInventory
+from .views import OrganizerTicketExportView
+
+
+class TicketConstraintTests(QueryPlanAssertionsMixin, TestCase):
+    def setUp(self):
+        self.organizer = CustomUser.objects.create_user(username='organizer', password='pass', role='organizer')
+        self.attendee = CustomUser.objects.create_user(username='attendee', password='pass', role='attendee')
+        self.event = Event.objects.create(
+            title='Event', description='Description', location='Addis Ababa',
+            date=timezone.now(), organizer=self.organizer,
+        )
+
+    def test_one_ticket_per_attendee_per_event(self):
+        Ticket.objects.create(event=self.event, attendee=self.attendee)
+        with self.assertRaises(IntegrityError):
+            Ticket.objects.create(event=self.event, attendee=self.attendee)
+
+    def test_duplicate_purchase_is_rejected_by_the_api(self):
+        client = APIClient()
+        client.force_authenticate(self.attendee)
+        response = client.post('/api/tickets/', {'event': self.event.id})
+        self.assertEqual(response.status_code, 201)
+        response = client.post('/api/tickets/', {'event': self.event.id})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_attendee_event_lookup_uses_unique_index(self):
+        self.assertUsesIndex(
+            Ticket.objects.filter(attendee=self.attendee, event=self.event),
+            'unique_ticket_per_attendee', 'sqlite_autoindex_tickets_ticket',
+        )
+
+    def test_event_sales_lookup_uses_purchase_index(self):
+        self.assertUsesIndex(
+            Ticket.objects.filter(event=self.event).order_by('-purchase_date'),
+            'ticket_event_purchase_idx',
+        )
+
+
+class TicketInventoryTests(TestCase):
+    def setUp(self):
+        self.organizer = CustomUser.objects.create_user(username='organizer', password='pass', role='organizer')
+        self.event = Event.objects.create(
+            title='Event', description='Description', location='Addis Ababa',
+            date=timezone.now(), organizer=self.organizer, capacity=2,
+        )
+
+    def checkout(self, username):
+        user = CustomUser.objects.create_user(username=username, password='pass', role='attendee')
+        payment = Payment.objects.create(
+            user=user, event=self.event, amount=0, chapa_tx_ref=username,
+        )
+        return payment
+
+    def remaining(self):
+        return TicketInventory.objects.get(event=self.event).remaining
+
+    def test_capacity_edits_adjust_remaining_stock(self):
+        self.assertEqual(self.remaining(), 2)
+        hold_seat(self.event, self.checkout('a'))
+        self.event.capacity = 5
+        self.event.save()
+        self.assertEqual(self.remaining(), 4)
+        self.event.capacity = None
+        self.event.save()
+        self.assertFalse(TicketInventory.objects.filter(event=self.event).exists())
+
+    def test_holds_block_sales_until_released(self):
+        first, second = self.checkout('a'), self.checkout('b')
+        hold_seat(self.event, first)
+        hold_seat(self.event, second)
+        with self.assertRaises(SoldOut):
+            hold_seat(self.event, self.checkout('c'))
+        release_hold(first)
+        self.assertEqual(self.remaining(), 1)
+
+    def test_expired_holds_are_reclaimed_when_sold_out(self):
+        hold_seat(self.event, self.checkout('a'))
+        hold_seat(self.event, self.checkout('b'))
+        TicketHold.objects.update(expires_at=timezone.now() - timedelta(minutes=1))
+        hold_seat(self.event, self.checkout('c'))
+        self.assertEqual(TicketHold.objects.count(), 1)
+        self.assertEqual(self.remaining(), 1)
+
+    def test_issuing_is_idempotent(self):
+        payment = self.checkout('a')
+        hold_seat(self.event, payment)
+        _, created = issue_ticket(payment)
+        self.assertTrue(created)
+        _, created = issue_ticket(payment)
+        self.assertFalse(created)
+        self.assertEqual(Ticket.objects.count(), 1)
+        self.assertEqual(self.remaining(), 1)
+
+    def test_expired_hold_takes_a_fresh_seat_or_fails(self):
+        late = self.checkout('late')
+        hold_seat(self.event, late)
+        TicketHold.objects.update(expires_at=timezone.now() - timedelta(minutes=1))
+        hold_seat(self.event, self.checkout('a'))
+        hold_seat(self.event, self.checkout('b'))
+        with self.assertRaises(SoldOut):
+            issue_ticket(late)
+        self.assertEqual(Ticket.objects.count(), 0)
+
+    def test_direct_creates_take_seats(self):
+        client = APIClient()
+        for username in ('a', 'b'):
+            client.force_authenticate(CustomUser.objects.create_user(username=username, password='pass'))
+            self.assertEqual(client.post('/api/tickets/', {'event': self.event.id}).status_code, 201)
+        self.assertEqual(client.post('/api/tickets/', {'event': self.event.id}).status_code, 400)
+        self.assertEqual(self.remaining(), 0)
+        client.force_authenticate(CustomUser.objects.create_user(username='c', password='pass'))
+        self.assertEqual(client.post('/api/tickets/', {'event': self.event.id}).status_code, 409)
+        self.assertEqual(Ticket.objects.count(), 2)
+        ticket = Ticket.objects.first()
+        client.force_authenticate(ticket.attendee)
+        self.assertEqual(client.delete(f'/api/tickets/{ticket.id}/').status_code, 204)
+        self.assertEqual(self.remaining(), 1)
+
+
+class OrganizerTicketToolsTests(TestCase):
+    def setUp(self):
+        self.organizer = CustomUser.objects.create_user(username='organizer', password='pass', role='organizer')
+        self.event = Event.objects.create(
+            title='Gala, "annual"', description='Description', location='Addis Ababa',
+            date=timezone.now(), organizer=self.organizer, capacity=5,
+        )
+        CustomUser.objects.bulk_create(CustomUser(username=f'guest{n}', role='attendee') for n in range(6))
+        self.client = APIClient()
+        self.client.force_authenticate(self.organizer)
+
+    def comp(self, usernames, event=None):
+        return self.client.post(
+            '/api/organizer/tickets/bulk/',
+            {'event': (event or self.event).id, 'attendees': usernames},
+            format='json',
+        )
+
+    def test_bulk_comp_tickets(self):
+        response = self.comp(['guest0', 'guest1', 'guest1', 'nobody'])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {'created': 2, 'already_ticketed': [], 'unknown': ['nobody']})
+
+        response = self.comp(['guest1', 'guest2', 'guest3', 'guest4'])
+        self.assertEqual(response.json()['created'], 3)
+        self.assertEqual(response.json()['already_ticketed'], ['guest1'])
+        self.assertEqual(TicketInventory.objects.get(event=self.event).remaining, 0)
+
+        self.assertEqual(self.comp(['guest5']).status_code, 409)
+        self.assertEqual(Ticket.objects.filter(event=self.event).count(), 5)
+
+    def test_bulk_comp_tickets_need_own_event(self):
+        other = Event.objects.create(
+            title='Other', description='Description', location='Addis Ababa', date=timezone.now(),
+            organizer=CustomUser.objects.create_user(username='rival', password='pass', role='organizer'),
+        )
+        self.assertEqual(self.comp(['guest0'], event=other).status_code, 403)
+
+    def test_export_streams_csv_and_ndjson(self):
+        self.comp(['guest0', 'guest1'])
+        response = self.client.get('/api/organizer/tickets/export.csv')
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0][:5], ['ticket_id', 'event_id', 'event', 'attendee_id', 'username'])
+        self.assertEqual([row[4] for row in rows[1:]], ['guest0', 'guest1'])
+        self.assertEqual(rows[1][2], 'Gala, "annual"')
+
+        response = self.client.get('/api/organizer/tickets/export.ndjson', {'event': self.event.id})
+        records = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([record['username'] for record in records], ['guest0', 'guest1'])
+        self.assertIsNone(records[0]['tx_ref'])
+
+    async def test_export_streams_asynchronously_under_asgi(self):
+        await sync_to_async(self.comp)(['guest0', 'guest1'])
+        request = AsyncRequestFactory().get('/api/organizer/tickets/export.csv')
+        force_authenticate(request, self.organizer)
+        # As the ASGI handler runs a sync view
+        response = await sync_to_async(OrganizerTicketExportView.as_view())(request, fmt='csv')
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        rows = list(csv.reader(content.decode().splitlines()))
+        self.assertEqual([row[4] for row in rows[1:]], ['guest0', 'guest1'])
+
+    def test_export_is_for_organizers(self):
+        self.client.force_authenticate(CustomUser.objects.get(username='guest0'))
+        self.assertEqual(self.client.get('/api/organizer/tickets/export.csv').status_code, 403)
+
+
+@override_settings(WALLET_CACHE_TIMEOUT=3600)
+class TicketWalletTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        organizer = CustomUser.objects.create_user(username='organizer', password='pass', role='organizer')
+        self.attendee = CustomUser.objects.create_user(username='attendee', password='pass', role='attendee')
+        self.events = [
+            Event.objects.create(
+                title=f'Show {n}', description='Description', location='Addis Ababa',
+                date=timezone.now() + timedelta(days=3 - n), organizer=organizer, price=100,
+            )
+            for n in range(3)
+        ]
+        self.tickets = [Ticket.objects.create(event=event, attendee=self.attendee) for event in self.events[:2]]
+        self.client = APIClient()
+        self.client.force_authenticate(self.attendee)
+
+    def test_wallet_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/my-ticket-wallet/')
+        first, second = response.json()
+        # Soonest first
+        self.assertEqual(first['title'], 'Show 1')
+        self.assertEqual(first['organizer'], 'organizer')
+        self.assertEqual(first['ticket_ids'], [self.tickets[1].id])
+        self.assertEqual(second['id'], self.events[0].id)
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_cached_per_user_with_etag(self):
+        etag = self.client.get('/api/my-ticket-wallet/')['ETag']
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/my-ticket-wallet/').json()[0]['title'], 'Show 1')
+            response = self.client.get('/api/my-ticket-wallet/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # Someone else's wallet is built separately
+        self.client.force_authenticate(CustomUser.objects.get(username='organizer'))
+        self.assertEqual(self.client.get('/api/my-ticket-wallet/').json(), [])
+
+    def test_invalidated_by_own_tickets_and_event_edits_only(self):
+        etag = self.client.get('/api/my-ticket-wallet/')['ETag']
+        other = CustomUser.objects.create_user(username='other', password='pass', role='attendee')
+        Ticket.objects.create(event=self.events[0], attendee=other)
+        self.assertEqual(self.client.get('/api/my-ticket-wallet/')['ETag'], etag)
+
+        Ticket.objects.create(event=self.events[2], attendee=self.attendee)
+        response = self.client.get('/api/my-ticket-wallet/')
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.json()), 3)
+
+        self.events[2].title = 'Renamed'
+        self.events[2].save()
+        self.assertEqual(self.client.get('/api/my-ticket-wallet/').json()[0]['title'], 'Renamed')
+
+    def test_full_ticketed_events_query_count_is_flat(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/my-ticketed-events/')
+        self.assertEqual([event['title'] for event in response.json()], ['Show 0', 'Show 1'])
+
+    def test_bulk_issued_tickets_invalidate_wallets(self):
+        self.client.get('/api/my-ticket-wallet/')
+        issue_comp_tickets(self.events[2], ['attendee'])
+        self.assertEqual(len(self.client.get('/api/my-ticket-wallet/').json()), 3)
+
+
+class CheckInTests(TestCase):
+    def setUp(self):
+        self.organizer = CustomUser.objects.create_user(username='organizer', password='pass', role='organizer')
+        self.event, self.other = (
+            Event.objects.create(
+                title=title, description='Description', location='Addis Ababa',
+                date=timezone.now(), organizer=self.organizer,
+            )
+            for title in ('Final', 'Semi')
+        )
+        self.fans = [
+            CustomUser.objects.create_user(username=f'fan{n}', password='pass', role='attendee') for n in range(3)
+        ]
+        self.tickets = [Ticket.objects.create(event=self.event, attendee=fan) for fan in self.fans]
+        self.client = APIClient()
+        self.client.force_authenticate(self.organizer)
+
+    def test_codes_verify_offline_with_the_scanner_key(self):
+        response = self.client.get(f'/api/organizer/events/{self.event.id}/scanner-key/')
+        key = base64.b64decode(response.json()['key'])
+        code = self.tickets[0].code
+        with self.assertNumQueries(0):
+            self.assertEqual(verify_code(code, key=key, event_id=self.event.id), (self.event.id, self.tickets[0].id))
+            self.assertEqual(verify_code(code.lower(), key=key), (self.event.id, self.tickets[0].id))
+
+        forged = code.replace(f'.{self.tickets[0].id}.', f'.{self.tickets[1].id}.')
+        for bad, key_for in ((forged, self.event), (code, self.other), ('T1.1.1', self.event)):
+            with self.assertRaises(InvalidCode):
+                verify_code(bad, key=scanner_key(key_for.id), event_id=key_for.id)
+
+    def test_upload_deduplicates_scans(self):
+        now = timezone.now()
+        scans = [
+            {'code': self.tickets[0].code, 'scanned_at': (now + timedelta(seconds=9)).isoformat()},
+            {'code': self.tickets[0].code, 'scanned_at': now.isoformat()},
+            {'code': self.tickets[1].code, 'scanned_at': now.isoformat()},
+            {'code': 'T1.999.999.AAAAAAAAAAAAAAAA', 'scanned_at': now.isoformat()},
+        ]
+        response = self.client.post('/api/checkins/', {'event': self.event.id, 'scans': scans}, format='json')
+        self.assertEqual(response.json()['checked_in'], 2)
+        self.assertEqual(response.json()['duplicates'], 1)
+        self.assertEqual(response.json()['rejected'], [{'index': 3, 'reason': 'wrong event'}])
+        self.assertEqual(CheckIn.objects.get(ticket=self.tickets[0]).scanned_at, now)
+
+        # Re-uploading the same batch records nothing new
+        response = self.client.post('/api/checkins/', {'event': self.event.id, 'scans': scans}, format='json')
+        self.assertEqual((response.json()['checked_in'], response.json()['duplicates']), (0, 3))
+
+    def test_upload_needs_own_event(self):
+        self.client.force_authenticate(self.fans[0])
+        scans = [{'code': self.tickets[0].code, 'scanned_at': timezone.now().isoformat()}]
+        response = self.client.post('/api/checkins/', {'event': self.event.id, 'scans': scans}, format='json')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.client.get(f'/api/organizer/events/{self.event.id}/scanner-key/').status_code, 403)
+
+    def test_attendees_only_see_their_own_codes(self):
+        self.client.force_authenticate(self.fans[0])
+        tickets = self.client.get('/api/tickets/').json()['results']
+        self.assertEqual([ticket['code'] for ticket in tickets], [self.tickets[0].code])
+
+
+class TicketOversellStressTest(TransactionTestCase):
+    """Hundreds of concurrent checkouts on one event must never oversell."""
+    buyers = 200
+    capacity = 50
+
+    def test_concurrent_checkouts_never_oversell(self):
+        organizer = CustomUser.objects.create_user(username='organizer', password='pass', role='organizer')
+        event = Event.objects.create(
+            title='Hot sale', description='Description', location='Addis Ababa',
+            date=timezone.now(), organizer=organizer, capacity=self.capacity,
+        )
+        CustomUser.objects.bulk_create(
+            CustomUser(username=f'buyer{n}', role='attendee') for n in range(self.buyers)
+        )
+        buyers = list(CustomUser.objects.filter(role='attendee'))
+        start = threading.Barrier(16)
+
+        def retry_locked(operation):
+            # SQLite allows one writer at a time and reports the lock instead
+            # of waiting for it; PostgreSQL never takes this path
+            for attempt in range(50):
+                try:
+                    return operation()
+                except OperationalError:
+                    time.sleep(0.005 * (attempt + 1))
+            raise AssertionError('gave up retrying a locked database')
+
+        def checkout(user):
+            with transaction.atomic():
+                payment = Payment.objects.create(
+                    user=user, event=event, amount=0, chapa_tx_ref=f'tx-{user.id}',
+                )
+                hold_seat(event, payment)
+            return payment
+
+        def buy(user):
+            try:
+                payment = retry_locked(lambda: checkout(user))
+                retry_locked(lambda: issue_ticket(payment))
+                return True
+            except SoldOut:
+                return False
+            finally:
+                connection.close()
+
+        def worker(users):
+            start.wait()
+            return [buy(user) for user in users]
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = pool.map(worker, [buyers[n::16] for n in range(16)])
+            sold = sum(sum(outcomes) for outcomes in results)
+
+        self.assertEqual(sold, self.capacity)
+        self.assertEqual(Ticket.objects.filter(event=event).count(), self.capacity)
+        self.assertEqual(TicketInventory.objects.get(event=event).remaining, 0)
+        self.assertFalse(TicketHold.objects.exists())
@@ -1,8 +1,9 @@
-from django.urls import path, include
+from django.urls import path, re_path, include
 from rest_framework.routers import DefaultRouter
 from .views import TicketViewSet
-from .views import UserTicketedEventsView
-from .views import OrganizerTicketsView
+from .views import UserTicketedEventsView, TicketWalletView
+from .views import OrganizerTicketsView, OrganizerTicketExportView, OrganizerBulkTicketView
+from .views import ScannerKeyView, CheckInUploadView
 
 router = DefaultRouter()
 router.register(r'tickets', TicketViewSet)
@@ -10,5 +11,10 @@ router.register(r'tickets', TicketViewSet)
 urlpatterns = [
     path('', include(router.urls)),
     path('my-ticketed-events/', UserTicketedEventsView.as_view(), name='my-ticketed-events'),
+    path('my-ticket-wallet/', TicketWalletView.as_view(), name='ticket-wallet'),
     path('organizer/tickets/', OrganizerTicketsView.as_view(), name='organizer-tickets'),
+    re_path(r'^organizer/tickets/export\.(?P<fmt>csv|ndjson)$', OrganizerTicketExportView.as_view(), name='organizer-tickets-export'),
+    path('organizer/tickets/bulk/', OrganizerBulkTicketView.as_view(), name='organizer-tickets-bulk'),
+    path('organizer/events/<int:event_id>/scanner-key/', ScannerKeyView.as_view(), name='scanner-key'),
+    path('checkins/', CheckInUploadView.as_view(), name='checkin-upload'),
 ]
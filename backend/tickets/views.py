@@ -1,28 +1,106 @@
+import base64
+import csv
+import json
+from itertools import chain, islice
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_cache_control
 from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
+from .checkin import ingest_scans
+from .codes import VERSION, scanner_key
+from .inventory import SoldOut, issue_comp_tickets, return_seats, take_seat
 from .models import Ticket
-from .serializers import TicketSerializer
+from .serializers import BulkTicketSerializer, CheckInUploadSerializer, TicketSerializer
+from .wallet import wallet, wallet_generation
+from events.cache import INFO_GENERATION
+from events.models import Event
 from events.serializers import EventSerializer
+from feedback.models import Feedback
 from rest_framework.response import Response
+from core.cache import CachedResponseMixin
+from core.pagination import TicketCursorPagination
 
 class TicketViewSet(viewsets.ModelViewSet):
     queryset = Ticket.objects.all()
     serializer_class = TicketSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = TicketCursorPagination
+
+    def get_queryset(self):
+        # Tickets carry their entry code, so users only ever see their own
+        return Ticket.objects.filter(attendee=self.request.user).select_related(
+            'attendee', 'event__organizer', 'event__rating'
+        )
+
+    def create(self, request, *args, **kwargs):
+        try:
+            return super().create(request, *args, **kwargs)
+        except SoldOut:
+            return Response({"detail": "This event is sold out."}, status=409)
 
     def perform_create(self, serializer):
-        serializer.save(attendee=self.request.user)
+        # The seat is taken in the same transaction, so a sold out event rolls the ticket back
+        try:
+            with transaction.atomic():
+                ticket = serializer.save(attendee=self.request.user)
+                take_seat(ticket.event)
+        except IntegrityError:
+            raise ValidationError("You already have a ticket for this event.")
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            return_seats(instance.event_id)
+
 class UserTicketedEventsView(APIView):
+    """Full event representations for the user's tickets; see TicketWalletView for the light version."""
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         user = request.user
-        tickets = Ticket.objects.filter(attendee=user).select_related('event')
-        events = [ticket.event for ticket in tickets]
-        serializer = EventSerializer(events, many=True)
+        events = (
+            Event.objects.filter(tickets__attendee=user)
+            .order_by('tickets__id')
+            .select_related('organizer', 'rating', 'inventory')
+            .prefetch_related(Prefetch('feedbacks', queryset=Feedback.objects.select_related('attendee')))
+        )
+        serializer = EventSerializer(events, many=True, context={'request': request})
         return Response(serializer.data)
-    
+
+
+class TicketWalletView(CachedResponseMixin, APIView):
+    """
+    The user's ticketed events with their ticket ids (see tickets.wallet),
+    cached per user. Clients should poll with If-None-Match.
+    """
+    permission_classes = [IsAuthenticated]
+    cache_timeout_setting = 'WALLET_CACHE_TIMEOUT'
+
+    def response_is_cacheable(self, request):
+        # Unlike the public endpoints, the entry is the user's own: the
+        # generations below are per user
+        return settings.WALLET_CACHE_TIMEOUT and request.accepted_renderer.format == 'json'
+
+    def get(self, request):
+        user = request.user
+        response = self.cached_response(
+            request, [wallet_generation(user.id), INFO_GENERATION], lambda: Response(wallet(user)),
+        )
+        # Revalidated on every poll, and never stored by shared caches
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
 class OrganizerTicketsView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -32,6 +110,134 @@ class OrganizerTicketsView(APIView):
             return Response({"detail": "Not authorized."}, status=403)
 
         # Get tickets where the event's organizer is the current user
-        tickets = Ticket.objects.filter(event__organizer=user).select_related('event', 'attendee')
+        tickets = Ticket.objects.filter(event__organizer=user).select_related('event__organizer', 'event__rating', 'attendee')
         serializer = TicketSerializer(tickets, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+
+EXPORT_FIELDS = {
+    'ticket_id': 'id',
+    'event_id': 'event_id',
+    'event': 'event__title',
+    'attendee_id': 'attendee_id',
+    'username': 'attendee__username',
+    'email': 'attendee__email',
+    'purchase_date': 'purchase_date',
+    'tx_ref': 'payment__chapa_tx_ref',
+}
+
+
+class EchoBuffer:
+    """File-like object for csv.writer that hands each line back instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+async def aiterate(lines, size):
+    """
+    Hand a sync iterator of lines to an ASGI server `size` lines at a time.
+    Django would otherwise drain a sync iterator into a list before sending
+    it; each chunk is pulled in the thread that runs sync code, where the
+    rows' database cursor lives.
+    """
+    pull = sync_to_async(lambda: ''.join(islice(lines, size)))
+    while chunk := await pull():
+        yield chunk
+
+
+class OrganizerTicketExportView(APIView):
+    """
+    Stream all tickets for the organizer's events (or `?event=<id>`) as CSV
+    or NDJSON. Rows are read as plain values in chunks and written out as
+    they arrive, so memory stays flat however many tickets there are, under
+    WSGI and ASGI alike.
+    """
+    permission_classes = [IsAuthenticated]
+    chunk_size = 2000
+
+    def get(self, request, fmt):
+        user = request.user
+        if getattr(user, 'role', None) != 'organizer':
+            return Response({"detail": "Not authorized."}, status=403)
+
+        tickets = Ticket.objects.filter(event__organizer=user)
+        event_id = request.query_params.get('event')
+        if event_id:
+            tickets = tickets.filter(event_id=event_id)
+        rows = (
+            tickets.order_by('event_id', 'purchase_date', 'id')
+            .values_list(*EXPORT_FIELDS.values())
+            .iterator(chunk_size=self.chunk_size)
+        )
+
+        if fmt == 'csv':
+            writer = csv.writer(EchoBuffer())
+            lines = (writer.writerow(row) for row in rows)
+            content_type = 'text/csv'
+            header = [writer.writerow(EXPORT_FIELDS)]
+        else:
+            lines = (
+                json.dumps(dict(zip(EXPORT_FIELDS, row)), cls=DjangoJSONEncoder) + '\n' for row in rows
+            )
+            content_type = 'application/x-ndjson'
+            header = []
+
+        content = chain(header, lines)
+        if isinstance(request._request, ASGIRequest):
+            content = aiterate(content, self.chunk_size)
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="tickets.{fmt}"'
+        return response
+
+
+class OrganizerBulkTicketView(APIView):
+    """Issue complimentary tickets for one of the organizer's events to many attendees at once."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        user = request.user
+        if getattr(user, 'role', None) != 'organizer':
+            return Response({"detail": "Not authorized."}, status=403)
+
+        serializer = BulkTicketSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        event = serializer.validated_data['event']
+        if event.organizer_id != user.id:
+            return Response({"detail": "Not authorized."}, status=403)
+
+        try:
+            result = issue_comp_tickets(event, serializer.validated_data['attendees'])
+        except SoldOut:
+            return Response({"detail": "Not enough tickets left for all attendees."}, status=409)
+        except IntegrityError:
+            return Response({"detail": "Some attendees were ticketed concurrently; please retry."}, status=409)
+        return Response(result, status=201)
+
+
+class ScannerKeyView(APIView):
+    """The per-event key door scanners use to verify ticket codes offline."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, event_id):
+        user = request.user
+        if not Event.objects.filter(pk=event_id, organizer=user).exists():
+            return Response({"detail": "Not authorized."}, status=403)
+        return Response({
+            'event': event_id,
+            'version': VERSION,
+            'key': base64.b64encode(scanner_key(event_id)).decode(),
+        })
+
+
+class CheckInUploadView(APIView):
+    """Batched upload of door scans; answers with what was recorded."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = CheckInUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        event = serializer.validated_data['event']
+        if event.organizer_id != request.user.id:
+            return Response({"detail": "Not authorized."}, status=403)
+        result = ingest_scans(event, serializer.validated_data['scans'], serializer.validated_data['device'])
+        return Response(result)
@@ -0,0 +1,43 @@
+"""
+The ticket wallet: the events a user holds tickets for, each with the ids
+of those tickets, read in one query over the user's tickets.
+
+Responses are cached per user (see core.cache) under two generations: the
+user's own, bumped when one of their tickets is issued or removed, and
+events.cache.INFO_GENERATION, bumped when any event is edited. Sales and
+ratings elsewhere do not touch either, so a client polling its wallet is
+answered from the cache, or with a 304 for its ETag. Tickets are issued by
+other processes too, so the cache is only on with a shared CACHE_BACKEND
+(see WALLET_CACHE_TIMEOUT).
+"""
+from core.cache import bump
+from .models import Ticket
+
+EVENT_FIELDS = ('id', 'title', 'date', 'location', 'category', 'price', 'organizer')
+
+
+def wallet_generation(user_id):
+    return f'wallet:{user_id}'
+
+
+def invalidate_wallets(*user_ids):
+    bump(*(wallet_generation(user_id) for user_id in user_ids))
+
+
+def wallet(user):
+    """The user's ticketed events, soonest first, as plain dicts."""
+    rows = (
+        Ticket.objects.filter(attendee=user)
+        .order_by('event__date', 'event_id', 'id')
+        .values_list(
+            'id', 'event_id', 'event__title', 'event__date', 'event__location', 'event__category',
+            'event__price', 'event__organizer__username',
+        )
+    )
+    events = {}
+    for ticket_id, *event in rows:
+        entry = events.get(event[0])
+        if entry is None:
+            entry = events[event[0]] = dict(zip(EVENT_FIELDS, event), ticket_ids=[])
+        entry['ticket_ids'].append(ticket_id)
+    return list(events.values())
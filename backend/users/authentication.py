@@ -0,0 +1,134 @@
+"""
+Token authentication without a database round-trip per request.
+
+DRF's TokenAuthentication joins authtoken_token to the user table on every
+authenticated call. CachedTokenAuthentication remembers token -> user for
+AUTH_TOKEN_CACHE_TTL seconds, either in a bounded in-process LRU
+(AUTH_TOKEN_CACHE='local') or in the shared Django cache
+(AUTH_TOKEN_CACHE='shared'), so every gunicorn worker sees the same entries.
+'off' falls back to a plain lookup.
+
+Entries are dropped as soon as the token is deleted (logout) or the user is
+saved, e.g. deactivated. That eviction only reaches the process that made
+the change when the cache is per process, so a system check
+(core.checks.check_token_cache) refuses such a cache when WEB_CONCURRENCY
+runs more than one worker.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+
+class LRUCache:
+    """A thread-safe mapping holding at most `maxsize` entries for `ttl` seconds each."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_tokens = LRUCache(settings.AUTH_TOKEN_CACHE_SIZE, settings.AUTH_TOKEN_CACHE_TTL)
+
+
+def shared_key(key):
+    return f'authtoken:{key}'
+
+
+def shared_user_key(user_id):
+    return f'authtoken-user:{user_id}'
+
+
+def cached_token(key):
+    if settings.AUTH_TOKEN_CACHE == 'shared':
+        return cache.get(shared_key(key))
+    if settings.AUTH_TOKEN_CACHE == 'local':
+        return local_tokens.get(key)
+    return None
+
+
+def remember_token(token):
+    # Also index the key by user, so user changes can evict it without a query
+    if settings.AUTH_TOKEN_CACHE == 'shared':
+        cache.set_many(
+            {shared_key(token.key): token, shared_user_key(token.user_id): token.key},
+            settings.AUTH_TOKEN_CACHE_TTL,
+        )
+    elif settings.AUTH_TOKEN_CACHE == 'local':
+        local_tokens.set(token.key, token)
+        local_tokens.set(('user', token.user_id), token.key)
+
+
+def forget_token(key):
+    local_tokens.delete(key)
+    cache.delete(shared_key(key))
+
+
+def forget_user(user_id):
+    for key in {local_tokens.get(('user', user_id)), cache.get(shared_user_key(user_id))} - {None}:
+        forget_token(key)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        token = cached_token(key)
+        if token is None:
+            model = self.get_model()
+            try:
+                token = model.objects.select_related('user').get(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            remember_token(token)
+
+        # Hand each request its own copies; views are free to modify request.user
+        token = copy.copy(token)
+        token.user = copy.copy(token.user)
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        return (token.user, token)
+
+
+async def aauthenticate(request):
+    """
+    Token-authenticate a plain Django request from an async view. Returns
+    the user, or None without credentials; raises AuthenticationFailed for
+    bad ones.
+    """
+    result = await sync_to_async(CachedTokenAuthentication().authenticate)(request)
+    return result[0] if result else None
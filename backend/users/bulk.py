@@ -0,0 +1,113 @@
+"""
+Bulk user onboarding.
+
+import_users() creates users with bulk_create in batches instead of one
+save() per user. Rows may carry a `password_hash` (any hash Django can
+verify, stored as is), a plain `password` (hashed here, on a thread pool:
+PBKDF2 releases the GIL and dominates the cost), or neither, in which case
+the account gets an unusable password until the user resets it.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from .models import CustomUser
+
+ROLES = {role for role, _ in CustomUser.ROLE_CHOICES}
+
+
+def clean_row(row):
+    """Return (fields, error) for one CSV row."""
+    username = (row.get('username') or '').strip()
+    email = (row.get('email') or '').strip()
+    role = (row.get('role') or 'attendee').strip()
+    if not username:
+        return None, 'missing username'
+    if role not in ROLES:
+        return None, f'unknown role {role!r}'
+    if email:
+        try:
+            validate_email(email)
+        except ValidationError:
+            return None, f'invalid email {email!r}'
+    password_hash = (row.get('password_hash') or '').strip()
+    if password_hash:
+        try:
+            identify_hasher(password_hash)
+        except ValueError:
+            return None, 'unrecognised password hash'
+    return {
+        'username': username,
+        'email': email,
+        'role': role,
+        'first_name': (row.get('first_name') or '').strip(),
+        'last_name': (row.get('last_name') or '').strip(),
+        'password_hash': password_hash,
+        'password': row.get('password') or '',
+    }, None
+
+
+def hash_passwords(rows, workers):
+    def password_for(row):
+        if row['password_hash']:
+            return row['password_hash']
+        # make_password(None) gives an unusable password
+        return make_password(row['password'] or None)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(password_for, rows))
+
+
+def import_users(rows, batch_size=1000, workers=4):
+    """
+    Create users from an iterable of dicts (e.g. csv.DictReader). Usernames
+    that already exist, or repeat within the input, are skipped. Returns
+    (created, skipped) where skipped is a list of (line, reason).
+    """
+    created = 0
+    skipped = []
+    seen = set()
+    batch = []
+
+    def flush():
+        nonlocal created
+        existing = set(
+            CustomUser.objects.filter(username__in=[row['username'] for _, row in batch])
+            .values_list('username', flat=True)
+        )
+        fresh = []
+        for line, row in batch:
+            if row['username'] in existing:
+                skipped.append((line, f"username {row['username']!r} already exists"))
+            else:
+                fresh.append(row)
+        passwords = hash_passwords(fresh, workers)
+        CustomUser.objects.bulk_create([
+            CustomUser(
+                username=row['username'], email=row['email'], role=row['role'],
+                first_name=row['first_name'], last_name=row['last_name'], password=password,
+            )
+            for row, password in zip(fresh, passwords)
+        ])
+        created += len(fresh)
+        batch.clear()
+
+    with transaction.atomic():
+        # Line 1 is the CSV header
+        for line, raw in enumerate(rows, start=2):
+            row, error = clean_row(raw)
+            if error is None and row['username'] in seen:
+                error = f"duplicate username {row['username']!r}"
+            if error:
+                skipped.append((line, error))
+                continue
+            seen.add(row['username'])
+            batch.append((line, row))
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    return created, sorted(skipped)
@@ -0,0 +1,46 @@
+import time
+
+from django.db import connection, transaction
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+
+from users.authentication import local_tokens
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test token-authenticated requests with the token cache off, "
+        "local and shared, reporting database queries per request and "
+        "requests/s. The sample user is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        with transaction.atomic():
+            user = CustomUser.objects.create_user(username='bench-user', role='attendee')
+            token = Token.objects.create(user=user)
+            client = Client(HTTP_HOST='localhost', HTTP_AUTHORIZATION=f'Token {token.key}')
+            for mode in ('off', 'local', 'shared'):
+                local_tokens.clear()
+                with override_settings(AUTH_TOKEN_CACHE=mode):
+                    self.report(mode, total, client)
+            token.delete()
+            transaction.set_rollback(True)
+
+    def report(self, mode, total, client):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for _ in range(total):
+                response = client.get('/api/users/profile/')
+                assert response.status_code == 200, response.status_code
+            elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"token cache {mode:<7} {total:>5} requests  {len(queries) / total:5.2f} queries/request  "
+            f"{total / elapsed:8.1f} req/s"
+        )
@@ -0,0 +1,27 @@
+import csv
+
+from django.core.management.base import BaseCommand
+
+from users.bulk import import_users
+
+
+class Command(BaseCommand):
+    help = (
+        "Create users in bulk from a CSV with a header row. Columns: username "
+        "(required), email, role (default attendee), first_name, last_name, and "
+        "either password_hash (stored as is) or password (hashed on import)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=4, help="Threads hashing plain passwords.")
+
+    def handle(self, *args, **options):
+        with open(options['csv_file'], newline='', encoding='utf-8-sig') as handle:
+            created, skipped = import_users(
+                csv.DictReader(handle), batch_size=options['batch_size'], workers=options['workers']
+            )
+        for line, reason in skipped:
+            self.stderr.write(f"line {line}: {reason}")
+        self.stdout.write(f"Created {created} users, skipped {len(skipped)}.")
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from users.role_guard import install_role_guard, uninstall_role_guard
+
+
+def install(apps, schema_editor):
+    install_role_guard(schema_editor)
+
+
+def uninstall(apps, schema_editor):
+    uninstall_role_guard(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -12,9 +12,20 @@ class CustomUser(AbstractUser):
     def __str__(self):
         return f"{self.username} ({self.role})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The role as stored, so save() can refuse changes without a query
+        instance._loaded_role = instance.__dict__.get('role')
+        return instance
+
     def save(self, *args, **kwargs):
-        if self.pk:
-            old_role = CustomUser.objects.get(pk=self.pk).role
-            if old_role and self.role != old_role:
-                raise ValidationError("Role cannot be changed once set.")
+        update_fields = kwargs.get('update_fields')
+        checks_role = update_fields is None or 'role' in update_fields
+        # Instances not loaded from the database are left to the DB trigger
+        old_role = getattr(self, '_loaded_role', None)
+        if checks_role and old_role and self.role != old_role:
+            raise ValidationError("Role cannot be changed once set.")
         super().save(*args, **kwargs)
+        if checks_role:
+            self._loaded_role = self.role
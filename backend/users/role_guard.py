@@ -0,0 +1,66 @@
+"""
+Database-level guard that keeps a user's role from changing once set.
+
+CustomUser.save already refuses role changes, but queryset.update(), raw
+SQL and other services bypass it. A BEFORE UPDATE trigger rejects any write
+that changes a non-empty role. Like the event search triggers, it must be
+re-installed by any migration that rebuilds users_customuser on SQLite.
+"""
+MESSAGE = 'Role cannot be changed once set.'
+
+POSTGRES_INSTALL = [
+    f"""
+    CREATE OR REPLACE FUNCTION users_customuser_role_guard() RETURNS trigger AS $$
+    BEGIN
+        IF OLD.role <> '' AND NEW.role IS DISTINCT FROM OLD.role THEN
+            RAISE EXCEPTION '{MESSAGE}' USING ERRCODE = 'integrity_constraint_violation';
+        END IF;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS users_customuser_role_guard ON users_customuser",
+    """
+    CREATE TRIGGER users_customuser_role_guard
+    BEFORE UPDATE OF role ON users_customuser
+    FOR EACH ROW EXECUTE FUNCTION users_customuser_role_guard()
+    """,
+]
+
+POSTGRES_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS users_customuser_role_guard ON users_customuser",
+    "DROP FUNCTION IF EXISTS users_customuser_role_guard()",
+]
+
+SQLITE_INSTALL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS users_customuser_role_guard
+    BEFORE UPDATE OF role ON users_customuser
+    WHEN OLD.role <> '' AND NEW.role IS NOT OLD.role
+    BEGIN
+        SELECT RAISE(ABORT, '{MESSAGE}');
+    END
+    """,
+]
+
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS users_customuser_role_guard",
+]
+
+
+def install_role_guard(schema_editor):
+    statements = {
+        'postgresql': POSTGRES_INSTALL,
+        'sqlite': SQLITE_INSTALL,
+    }.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement, params=None)
+
+
+def uninstall_role_guard(schema_editor):
+    statements = {
+        'postgresql': POSTGRES_UNINSTALL,
+        'sqlite': SQLITE_UNINSTALL,
+    }.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement, params=None)
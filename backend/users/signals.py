@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import forget_token, forget_user
+from .models import CustomUser
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    forget_token(instance.key)
+
+
+@receiver(post_save, sender=CustomUser)
+def forget_user_tokens(sender, instance, **kwargs):
+    # Cached tokens carry a snapshot of the user; drop it on any change
+    forget_user(instance.pk)
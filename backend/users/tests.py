@@ -1,3 +1,127 @@
-from django.test import TestCase
+import time
 
-# Create your tests here.
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from .authentication import LRUCache, local_tokens
+from .bulk import import_users
+from .models import CustomUser
+
+
+@override_settings(AUTH_TOKEN_CACHE='local')
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        local_tokens.clear()
+        self.user = CustomUser.objects.create_user(username='attendee', password='pass', role='attendee')
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_repeat_requests_skip_the_token_lookup(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/api/users/profile/').status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/users/profile/')
+        self.assertEqual(response.json()['username'], 'attendee')
+
+    @override_settings(AUTH_TOKEN_CACHE='shared')
+    def test_shared_cache(self):
+        self.client.get('/api/users/profile/')
+        local_tokens.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/users/profile/').status_code, 200)
+        self.client.post('/api/users/logout/')
+        self.assertEqual(self.client.get('/api/users/profile/').status_code, 401)
+
+    def test_logout_evicts_the_token(self):
+        self.client.get('/api/users/profile/')
+        self.assertEqual(self.client.post('/api/users/logout/').status_code, 200)
+        self.assertEqual(self.client.get('/api/users/profile/').status_code, 401)
+
+    def test_deactivation_evicts_the_user(self):
+        self.client.get('/api/users/profile/')
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/users/profile/').status_code, 401)
+
+    def test_profile_changes_are_not_served_stale(self):
+        self.client.get('/api/users/profile/')
+        self.client.patch('/api/users/profile/', {'email': 'new@example.com'})
+        self.assertEqual(self.client.get('/api/users/profile/').json()['email'], 'new@example.com')
+
+
+class LRUCacheTests(TestCase):
+    def test_bounded_size_and_ttl(self):
+        lru = LRUCache(maxsize=2, ttl=0.05)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertEqual((lru.get('a'), lru.get('b'), lru.get('c')), (1, None, 3))
+        time.sleep(0.06)
+        self.assertIsNone(lru.get('a'))
+
+
+class RoleImmutabilityTests(TestCase):
+    def setUp(self):
+        CustomUser.objects.create_user(username='organizer', password='pass', role='organizer')
+        self.user = CustomUser.objects.get(username='organizer')
+
+    def test_save_does_not_reread_the_user(self):
+        self.user.email = 'organizer@example.com'
+        with self.assertNumQueries(1):
+            self.user.save()
+        with self.assertNumQueries(1):
+            self.user.save(update_fields=['last_login'])
+
+    def test_role_change_is_refused(self):
+        self.user.role = 'attendee'
+        with self.assertRaises(ValidationError):
+            self.user.save()
+        # update_fields without role never writes it, so it is not checked
+        self.user.save(update_fields=['email'])
+
+    def test_database_refuses_role_change(self):
+        with self.assertRaises(DatabaseError), transaction.atomic():
+            CustomUser.objects.filter(pk=self.user.pk).update(role='attendee')
+        self.assertEqual(CustomUser.objects.get(pk=self.user.pk).role, 'organizer')
+
+    def test_unset_role_can_be_set_once(self):
+        user = CustomUser.objects.create_user(username='pending', password='pass')
+        user = CustomUser.objects.get(pk=user.pk)
+        user.role = 'attendee'
+        user.save()
+        user.role = 'organizer'
+        with self.assertRaises(ValidationError):
+            user.save()
+
+
+class ImportUsersTests(TestCase):
+    def test_bulk_import(self):
+        CustomUser.objects.create_user(username='existing', password='pass', role='attendee')
+        rows = [
+            {'username': 'alice', 'email': 'alice@example.com', 'password': 'secret-1'},
+            {'username': 'bob', 'role': 'organizer', 'password_hash': make_password('secret-2')},
+            {'username': 'carol'},
+            {'username': 'alice'},
+            {'username': 'existing'},
+            {'username': 'dave', 'role': 'admin'},
+            {'username': 'erin', 'email': 'not-an-email'},
+        ]
+        # Savepoint, one username lookup and one INSERT for the batch, release
+        with self.assertNumQueries(4):
+            created, skipped = import_users(rows)
+
+        self.assertEqual(created, 3)
+        self.assertEqual([line for line, _ in skipped], [5, 6, 7, 8])
+        self.assertTrue(CustomUser.objects.get(username='alice').check_password('secret-1'))
+        bob = CustomUser.objects.get(username='bob')
+        self.assertEqual(bob.role, 'organizer')
+        self.assertTrue(bob.check_password('secret-2'))
+        carol = CustomUser.objects.get(username='carol')
+        self.assertEqual(carol.role, 'attendee')
+        self.assertFalse(carol.has_usable_password())
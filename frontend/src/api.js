@@ -0,0 +1,74 @@
+import { useCallback, useEffect, useRef, useState } from 'react';
+
+// List endpoints are cursor-paginated ({ next, previous, results }); fetch
+// one page and return its items with the URL of the next page (null on the
+// last one). Plain array responses come back as a single page.
+export const fetchPage = async (url, options) => {
+  const response = await fetch(url, options);
+  if (!response.ok) throw new Error(`Request failed: ${response.status}`);
+  const payload = await response.json();
+  if (Array.isArray(payload)) return { items: payload, next: null };
+  return { items: payload.results || [], next: payload.next };
+};
+
+// The first page of a list endpoint, with `loadMore` to append the next one
+// on demand. Changing `url` (or the token) starts over from the first page;
+// pass a null `url` to skip fetching.
+export const usePagedList = (url, token) => {
+  const [items, setItems] = useState([]);
+  const [next, setNext] = useState(null);
+  const [loading, setLoading] = useState(false);
+  const [error, setError] = useState('');
+  // Only the latest request for the current url may update the state
+  const latest = useRef(0);
+
+  const load = useCallback(async (pageUrl, append) => {
+    const request = ++latest.current;
+    setLoading(true);
+    setError('');
+    try {
+      const options = token ? { headers: { Authorization: `Token ${token}` } } : undefined;
+      const page = await fetchPage(pageUrl, options);
+      if (request !== latest.current) return;
+      setItems(previous => (append ? [...previous, ...page.items] : page.items));
+      setNext(page.next);
+    } catch (err) {
+      if (request !== latest.current) return;
+      if (!append) setItems([]);
+      setError(err.message);
+    }
+    setLoading(false);
+  }, [token]);
+
+  const reload = useCallback(() => {
+    if (url) {
+      load(url, false);
+    } else {
+      latest.current += 1;
+      setItems([]);
+      setNext(null);
+      setLoading(false);
+    }
+  }, [url, load]);
+
+  useEffect(() => {
+    reload();
+  }, [reload]);
+
+  const loadMore = useCallback(() => {
+    if (next && !loading) load(next, true);
+  }, [next, loading, load]);
+
+  return { items, setItems, next, loading, error, loadMore, reload };
+};
+
+// `value`, once it has stopped changing for `delay` ms; keeps search-as-you-type
+// inputs from sending a request per keystroke.
+export const useDebouncedValue = (value, delay = 300) => {
+  const [debounced, setDebounced] = useState(value);
+  useEffect(() => {
+    const timer = setTimeout(() => setDebounced(value), delay);
+    return () => clearTimeout(timer);
+  }, [value, delay]);
+  return debounced;
+};
@@ -1,5 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import Navbar from './Navbar';
+import LoadMoreButton from './LoadMoreButton';
+import { usePagedList } from '../api';
 
 // Change from import.meta.env.VITE_API_URL to process.env.REACT_APP_API_URL
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://127.0.0.1:8000';
@@ -7,7 +9,6 @@ const API_URL = `${API_BASE_URL}/api/events/`;
 
 const Dashboard = () => {
   const [user, setUser] = useState(null);
-  const [events, setEvents] = useState([]);
   const [showCreate, setShowCreate] = useState(false);
   const [showEdit, setShowEdit] = useState(false);
   const [form, setForm] = useState({
@@ -21,23 +22,18 @@ const Dashboard = () => {
   const [editId, setEditId] = useState(null);
   const [loading, setLoading] = useState(false);
 
+  const token = localStorage.getItem('token');
+  // The organizer's events a page at a time; the stats cover what is loaded
+  const eventList = usePagedList(API_URL, token);
+  const events = eventList.items;
+  const more = eventList.next ? '+' : '';
+
   useEffect(() => {
-    const fetchUserAndEvents = async () => {
-      const storedUser = localStorage.getItem('user');
-      if (storedUser) {
-        setUser(JSON.parse(storedUser));
-      }
-      setLoading(true);
-      const token = localStorage.getItem('token');
-      const res = await fetch(API_URL, {
-        headers: { Authorization: `Token ${token}` },
-      });
-      const data = await res.json();
-      setEvents(Array.isArray(data) ? data : data.results || []);
-      setLoading(false);
-    };
-    fetchUserAndEvents();
-  }, [showCreate, showEdit]);
+    const storedUser = localStorage.getItem('user');
+    if (storedUser) {
+      setUser(JSON.parse(storedUser));
+    }
+  }, []);
 
   const totalEvents = events.length;
   const upcomingEvents = events.filter(e => new Date(e.date) > new Date()).length;
@@ -58,6 +54,7 @@ const Dashboard = () => {
     });
     if (res.ok) {
       setShowCreate(false);
+      eventList.reload();
       setForm({ title: '', description: '', date: '', location: '', category: '' });
     } else {
       const errorData = await res.json();
@@ -92,6 +89,7 @@ const Dashboard = () => {
     });
     if (res.ok) {
       setShowEdit(false);
+      eventList.reload();
       setEditId(null);
       setForm({ title: '', description: '', date: '', location: '', category: '' });
     } else {
@@ -116,7 +114,7 @@ const Dashboard = () => {
       alert('Failed to delete event: ' + (errorData.detail || JSON.stringify(errorData)));
     }
     setLoading(false);
-    setEvents(events.filter(event => event.id !== id));
+    eventList.setItems(items => items.filter(event => event.id !== id));
   };
 
   if (!user) {
@@ -152,17 +150,17 @@ const Dashboard = () => {
           <div className="grid gap-6">
         <div className="bg-white rounded-xl shadow-lg p-6 flex flex-col items-center border-t-4 border-blue-500">
           <span className="text-4xl mb-2">📅</span>
-          <div className="text-2xl font-bold text-blue-700">{totalEvents}</div>
+          <div className="text-2xl font-bold text-blue-700">{totalEvents}{more}</div>
           <div className="text-gray-600 text-sm">Total Events</div>
         </div>
         <div className="bg-white rounded-xl shadow-lg p-6 flex flex-col items-center border-t-4 border-green-500">
           <span className="text-4xl mb-2">⏳</span>
-          <div className="text-2xl font-bold text-green-700">{upcomingEvents}</div>
+          <div className="text-2xl font-bold text-green-700">{upcomingEvents}{more}</div>
           <div className="text-gray-600 text-sm">Upcoming Events</div>
         </div>
         <div className="bg-white rounded-xl shadow-lg p-6 flex flex-col items-center border-t-4 border-yellow-500">
           <span className="text-4xl mb-2">🎟️</span>
-          <div className="text-2xl font-bold text-yellow-600">{totalTickets}</div>
+          <div className="text-2xl font-bold text-yellow-600">{totalTickets}{more}</div>
           <div className="text-gray-600 text-sm">Purchased Tickets</div>
         </div>
       </div>
@@ -173,7 +171,7 @@ const Dashboard = () => {
 <div className="bg-white rounded-2xl shadow-lg p-8 mb-12">
   <h2 className="text-2xl font-bold text-blue-700 mb-6">My Events</h2>
 
-  {loading ? (
+  {loading || (eventList.loading && events.length === 0) ? (
     <div className="text-blue-600 text-center">Loading...</div>
   ) : events.length === 0 ? (
     <div className="text-gray-500 text-center">No events found.</div>
@@ -254,6 +252,7 @@ const Dashboard = () => {
       
     ))
   )}
+  <LoadMoreButton list={eventList} label="Load more events" className="flex justify-center mt-4" />
 </div>
 
 
@@ -0,0 +1,48 @@
+import React, { useState } from 'react';
+import { usePagedList, useDebouncedValue } from '../api';
+import LoadMoreButton from './LoadMoreButton';
+
+const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://127.0.0.1:8000';
+const PAGE_SIZE = 10;
+
+// Typeahead over the event list: searches the API as the user types instead
+// of downloading every event up front. `fields` are passed to ?fields= and
+// must include id and title.
+const EventPicker = ({ onSelect, selectedId, token, fields = 'id,title' }) => {
+  const [query, setQuery] = useState('');
+  const search = useDebouncedValue(query.trim());
+  const params = new URLSearchParams({ fields, page_size: PAGE_SIZE });
+  if (search) params.set('search', search);
+  const list = usePagedList(`${API_BASE_URL}/api/events/?${params}`, token);
+
+  return (
+    <div>
+      <input
+        type="text"
+        value={query}
+        onChange={(e) => setQuery(e.target.value)}
+        placeholder="🔍 Search events"
+        className="w-full p-2 border rounded mb-2"
+      />
+      <ul className="max-h-60 overflow-auto border rounded">
+        {list.items.map((event) => (
+          <li
+            key={event.id}
+            onClick={() => onSelect(event)}
+            className={`px-3 py-2 cursor-pointer hover:bg-blue-50 ${event.id === selectedId ? 'bg-blue-100 font-semibold' : ''}`}
+          >
+            {event.title}
+          </li>
+        ))}
+        {!list.loading && list.items.length === 0 && (
+          <li className="px-3 py-2 text-gray-500">{list.error ? 'Failed to load events.' : 'No events found.'}</li>
+        )}
+        <li>
+          <LoadMoreButton list={list} label="More events" className="flex justify-center py-2" />
+        </li>
+      </ul>
+    </div>
+  );
+};
+
+export default EventPicker;
@@ -1,62 +1,31 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState } from 'react';
 import Navbar from './Navbar'; 
+import LoadMoreButton from './LoadMoreButton';
+import { usePagedList, useDebouncedValue } from '../api';
 
 // === 1. ADD THIS LINE RIGHT HERE ===
 // Change from import.meta.env.VITE_API_URL to process.env.REACT_APP_API_URL
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://127.0.0.1:8000';
-const EVENTS_PER_PAGE = 3;
+const EVENTS_PER_PAGE = 9;
+// Sort menu value -> the API's ?ordering=
+const SORT_ORDERING = { date: 'date', popularity: '-rating_count', price: 'price' };
 
 const Events = () => {
-  const [events, setEvents] = useState([]);
   const [search, setSearch] = useState('');
   const [category, setCategory] = useState('');
   const [location, setLocation] = useState('');
   const [sort, setSort] = useState('date');
-  const [page, setPage] = useState(1);
   const [selectedEvent, setSelectedEvent] = useState(null);
-  const [loading, setLoading] = useState(true);
 
-  // Fetch events from backend
-  useEffect(() => {
-    const fetchEvents = async () => {
-      setLoading(true);
-      try {
-        // === 2. MODIFY THIS FETCH LINE TO USE BACKTICKS AND THE VARIABLE ===
-        const response = await fetch(`${API_BASE_URL}/api/events/`);
-        
-        if (!response.ok) throw new Error('Failed to fetch events');
-        const data = await response.json();
-        setEvents(data);
-      } catch (err) {
-        setEvents([]);
-      }
-      setLoading(false);
-    };
-    fetchEvents();
-  }, []);
-
- 
-  let filteredEvents = events.filter(event =>
-    (event.title.toLowerCase().includes(search.toLowerCase()) ||
-      event.description.toLowerCase().includes(search.toLowerCase())) &&
-    (category === '' || (event.category && event.category.toLowerCase() === category.toLowerCase())) &&
-    (location === '' || (event.location && event.location.toLowerCase().includes(location.toLowerCase())))
-  );
-
-  // Sorting
-  filteredEvents = filteredEvents.sort((a, b) => {
-    if (sort === 'date') return new Date(a.date) - new Date(b.date);
-    if (sort === 'popularity') return (b.popularity || 0) - (a.popularity || 0);
-    if (sort === 'price') return (a.price || 0) - (b.price || 0);
-    return 0;
-  });
-
-  // Pagination
-  const totalPages = Math.ceil(filteredEvents.length / EVENTS_PER_PAGE);
-  const paginatedEvents = filteredEvents.slice(
-    (page - 1) * EVENTS_PER_PAGE,
-    page * EVENTS_PER_PAGE
-  );
+  // Category, sort order and the search terms (the full-text search covers
+  // the location too) are applied server-side, a page at a time
+  const terms = useDebouncedValue(`${search} ${location}`.trim());
+  const params = new URLSearchParams({ ordering: SORT_ORDERING[sort] || 'date', page_size: EVENTS_PER_PAGE });
+  if (category) params.set('category', category);
+  if (terms) params.set('search', terms);
+  // === 2. MODIFY THIS FETCH LINE TO USE BACKTICKS AND THE VARIABLE ===
+  const eventList = usePagedList(`${API_BASE_URL}/api/events/?${params}`);
+  const events = eventList.items;
 
   return (
     <div className="font-sans text-gray-800 bg-blue-50 min-h-screen">
@@ -69,12 +38,12 @@ const Events = () => {
           type="text"
           placeholder="🔍 Search events"
           value={search}
-          onChange={e => { setSearch(e.target.value); setPage(1); }}
+          onChange={e => setSearch(e.target.value)}
           className="flex-1 px-4 py-2 rounded-lg border border-blue-200 focus:outline-none focus:ring-2 focus:ring-blue-400"
         />
         <select
           value={category}
-          onChange={e => { setCategory(e.target.value); setPage(1); }}
+          onChange={e => setCategory(e.target.value)}
           className="px-4 py-2 rounded-lg border border-blue-200 focus:outline-none focus:ring-2 focus:ring-blue-400"
         >
           <option value="">All Categories</option>
@@ -87,7 +56,7 @@ const Events = () => {
           type="text"
           placeholder="📍 Location"
           value={location}
-          onChange={e => { setLocation(e.target.value); setPage(1); }}
+          onChange={e => setLocation(e.target.value)}
           className="px-4 py-2 rounded-lg border border-blue-200 focus:outline-none focus:ring-2 focus:ring-blue-400"
         />
         <select
@@ -103,16 +72,16 @@ const Events = () => {
 
       {/* Event Cards Grid */}
       <div className="max-w-6xl mx-auto grid gap-8 md:grid-cols-3">
-        {loading ? (
+        {eventList.loading && events.length === 0 ? (
           <div className="col-span-3 text-center text-blue-700 font-semibold text-lg py-12">
             Loading events...
           </div>
-        ) : paginatedEvents.length === 0 ? (
+        ) : events.length === 0 ? (
           <div className="col-span-3 text-center text-blue-700 font-semibold text-lg py-12">
             No events found.
           </div>
         ) : (
-          paginatedEvents.map(event => (
+          events.map(event => (
             <div
               key={event.id}
               className="relative bg-white rounded-2xl shadow-lg border-t-4 border-blue-500 p-6 flex flex-col items-start hover:shadow-2xl hover:-translate-y-1 transition-all duration-300"
@@ -142,32 +111,7 @@ const Events = () => {
         )}
       </div>
 
-      {/* Pagination */}
-      <div className="flex justify-center items-center mt-10 mb-16 space-x-2">
-        <button
-          onClick={() => setPage(page - 1)}
-          disabled={page === 1}
-          className="px-4 py-2 rounded bg-blue-200 text-blue-700 font-bold disabled:opacity-50"
-        >
-          Prev
-        </button>
-        {[...Array(totalPages)].map((_, idx) => (
-          <button
-            key={idx}
-            onClick={() => setPage(idx + 1)}
-            className={`px-3 py-1 rounded-full font-bold ${page === idx + 1 ? 'bg-blue-600 text-white' : 'bg-blue-100 text-blue-700'}`}
-          >
-            {idx + 1}
-          </button>
-        ))}
-        <button
-          onClick={() => setPage(page + 1)}
-          disabled={page === totalPages}
-          className="px-4 py-2 rounded bg-blue-200 text-blue-700 font-bold disabled:opacity-50"
-        >
-          Next
-        </button>
-      </div>
+      <LoadMoreButton list={eventList} label="Load more events" />
 
       {/* Event Details Modal */}
       {selectedEvent && (
@@ -1,5 +1,6 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState } from 'react';
 import Navbar from './Navbar';
+import EventPicker from './EventPicker';
 
 // === 1. DEFINE THE DYNAMIC ENV SETUP AT THE TOP ===
 // Change from import.meta.env.VITE_API_URL to process.env.REACT_APP_API_URL
@@ -8,36 +9,13 @@ const FeedbackForm = ({ onFeedbackSubmitted }) => {
   const [comment, setComment] = useState('');
   const [rating, setRating] = useState(5);
   const [selectedEventId, setSelectedEventId] = useState('');
-  const [events, setEvents] = useState([]);
   const [error, setError] = useState('');
   const [success, setSuccess] = useState('');
-
-  useEffect(() => {
-    const fetchUserEvents = async () => {
-      const token = localStorage.getItem('token');
-      try {
-        // === 2. UPDATE THE EVENT GET REQUEST WITH BACKTICKS ===
-        const response = await fetch(`${API_BASE_URL}/api/events/`, {
-          headers: {
-            'Authorization': `Token ${token}`,
-          }
-        });
-        if (!response.ok) throw new Error('Failed to load events');
-        const data = await response.json();
-        setEvents(data);
-      } catch (err) {
-        setEvents([]);
-        setError('Failed to load your events.');
-      }
-    };
-
-    fetchUserEvents();
-  }, []);
+  const token = localStorage.getItem('token');
 
   const handleSubmit = async (e) => {
     e.preventDefault();
 
-    const token = localStorage.getItem('token');
     if (!token || !selectedEventId) {
       setError('Please select an event and make sure you are logged in.');
       return;
@@ -86,17 +64,11 @@ const FeedbackForm = ({ onFeedbackSubmitted }) => {
         <form onSubmit={handleSubmit}>
           <div className="mb-4">
             <label className="block mb-1 font-medium">Select Event</label>
-            <select
-              value={selectedEventId}
-              onChange={(e) => setSelectedEventId(e.target.value)}
-              required
-              className="w-full p-2 border rounded"
-            >
-              <option value="">-- Choose an Event --</option>
-              {events.map((event) => (
-                <option key={event.id} value={event.id}>{event.title}</option>
-              ))}
-            </select>
+            <EventPicker
+              token={token}
+              selectedId={selectedEventId}
+              onSelect={(event) => setSelectedEventId(event.id)}
+            />
           </div>
 
           <div className="mb-4">
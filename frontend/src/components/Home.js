@@ -1,7 +1,9 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useMemo } from 'react';
 import { Link, useNavigate } from 'react-router-dom';
 import Navbar from './Navbar';
 import BuyTicketModal from './BuyTicketModal';
+import LoadMoreButton from './LoadMoreButton';
+import { usePagedList } from '../api';
 
 // === 1. REPLACE THE HARDCODED STAGING STRINGS WITH THIS SETUP ===
 // Change from import.meta.env.VITE_API_URL to process.env.REACT_APP_API_URL
@@ -10,10 +12,7 @@ const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://127.0.0.1:8000';
 const Home = () => {
   const [profileDropdown, setProfileDropdown] = useState(false);
   const [searchInput, setSearchInput] = useState('');
-  const [allEvents, setAllEvents] = useState([]);
-  const [upcomingEvents, setUpcomingEvents] = useState([]);
   const [carouselIndex, setCarouselIndex] = useState(0);
-  const [categoryEvents, setCategoryEvents] = useState({});
   const [showAllEvents, setShowAllEvents] = useState(false);
   const [showBuyModal, setShowBuyModal] = useState(false);
   const [selectedEvent, setSelectedEvent] = useState(null);
@@ -25,46 +24,33 @@ const Home = () => {
     return new Date(event.date) < new Date().setHours(0,0,0,0);
   };
 
-  // Fetch all events and categorize them
-  useEffect(() => {
-    const fetchEvents = async () => {
-      try {
-        // === 2. INJECT THE VARIABLE INTO YOUR SEED GET REQUEST ===
-        const response = await fetch(`${API_BASE_URL}/api/events/`);
-        if (!response.ok) throw new Error('Failed to fetch events');
-        const data = await response.json();
-        setAllEvents(data);
-
-        // Filter for upcoming events (today or future)
-        const upcoming = data.filter(event => !isPastEvent(event));
-        setUpcomingEvents(upcoming);
-
-        // Group events by category
-        const grouped = {};
-        data.forEach(event => {
-          const cat = event.category || 'Other';
-          if (!grouped[cat]) grouped[cat] = [];
-          grouped[cat].push(event);
-        });
-        setCategoryEvents(grouped);
-      } catch (err) {
-        setAllEvents([]);
-        setUpcomingEvents([]);
-        setCategoryEvents({});
-      }
-    };
-    fetchEvents();
-  }, []);
+  // === 2. INJECT THE VARIABLE INTO YOUR SEED GET REQUEST ===
+  // The first page of upcoming (or all) events, with only what the cards
+  // render; later pages are loaded on demand
+  const eventList = usePagedList(
+    `${API_BASE_URL}/api/events/?fields=id,title,date,location,category,description`
+      + (showAllEvents ? '' : '&upcoming=true')
+  );
+  const eventsToShow = eventList.items;
 
+  // Group the loaded events by category
+  const categoryEvents = useMemo(() => {
+    const grouped = {};
+    eventsToShow.forEach(event => {
+      const cat = event.category || 'Other';
+      if (!grouped[cat]) grouped[cat] = [];
+      grouped[cat].push(event);
+    });
+    return grouped;
+  }, [eventsToShow]);
 
   useEffect(() => {
-    const eventsToShow = showAllEvents ? allEvents : upcomingEvents;
     if (eventsToShow.length === 0) return;
     const interval = setInterval(() => {
       setCarouselIndex((prev) => (prev + 1) % eventsToShow.length);
     }, 4000);
     return () => clearInterval(interval);
-  }, [upcomingEvents, allEvents, showAllEvents]);
+  }, [eventsToShow]);
 
   useEffect(() => {
     const handleClick = (e) => {
@@ -76,8 +62,6 @@ const Home = () => {
 
   // ✅ REPLACE YOUR CURRENT HELPER WITH THIS ROBUST GUARD VERSION
 const getCarouselEvents = () => {
-  const eventsToShow = showAllEvents ? allEvents : upcomingEvents;
-  
   // 1. Bulletproof check: If array is empty, uninitialized, or zero-length, stop immediately!
   if (!eventsToShow || eventsToShow.length === 0) {
     return [];
@@ -158,7 +142,7 @@ const getCarouselEvents = () => {
         <h2 className="text-2xl font-semibold mb-6 text-center animate-fade-in-up">
           {showAllEvents ? 'All Events' : 'Upcoming Events'}
         </h2>
-        {(showAllEvents ? allEvents : upcomingEvents).length === 0 ? (
+        {eventsToShow.length === 0 ? (
           <div className="col-span-3 text-center text-gray-500">
             No {showAllEvents ? 'events' : 'upcoming events'} found.
           </div>
@@ -168,7 +152,6 @@ const getCarouselEvents = () => {
               <button
                 className="p-2 rounded-full bg-blue-100 hover:bg-blue-200 text-blue-700 mr-4"
                 onClick={() => {
-                  const eventsToShow = showAllEvents ? allEvents : upcomingEvents;
                   setCarouselIndex((prev) =>
                     prev === 0 ? eventsToShow.length - 1 : prev - 1
                   );
@@ -211,7 +194,6 @@ const getCarouselEvents = () => {
               <button
                 className="p-2 rounded-full bg-blue-100 hover:bg-blue-200 text-blue-700 ml-4"
                 onClick={() => {
-                  const eventsToShow = showAllEvents ? allEvents : upcomingEvents;
                   setCarouselIndex((prev) =>
                     prev === eventsToShow.length - 1 ? 0 : prev + 1
                   );
@@ -223,7 +205,7 @@ const getCarouselEvents = () => {
             </div>
             {/* Carousel indicators */}
             <div className="flex justify-center mt-4 space-x-2">
-              {(showAllEvents ? allEvents : upcomingEvents).map((_, idx) => (
+              {eventsToShow.map((_, idx) => (
                 <button
                   key={idx}
                   className={`w-3 h-3 rounded-full ${carouselIndex === idx ? 'bg-blue-600' : 'bg-blue-200'}`}
@@ -232,6 +214,7 @@ const getCarouselEvents = () => {
                 />
               ))}
             </div>
+            <LoadMoreButton list={eventList} label="Load more events" className="flex justify-center mt-6" />
           </div>
         )}
       </section>
@@ -0,0 +1,20 @@
+import React from 'react';
+
+// "Load more" for a usePagedList list; hidden once the last page is loaded.
+const LoadMoreButton = ({ list, label = 'Load more', className = 'flex justify-center mt-8 mb-16' }) => {
+  if (!list.next) return null;
+  return (
+    <div className={className}>
+      <button
+        type="button"
+        onClick={list.loadMore}
+        disabled={list.loading}
+        className="px-6 py-2 rounded-full bg-blue-100 hover:bg-blue-200 text-blue-700 font-semibold shadow transition disabled:opacity-50"
+      >
+        {list.loading ? 'Loading...' : label}
+      </button>
+    </div>
+  );
+};
+
+export default LoadMoreButton;
@@ -19,6 +19,7 @@ const PaymentSuccess = () => {
       return;
     }
 
+    let retryTimer;
     const verifyPayment = async () => {
       try {
         // === 2. INJECT THE DYNAMIC ENVIRONMENT VARIABLE HERE ===
@@ -27,7 +28,10 @@ const PaymentSuccess = () => {
         );
         const data = await response.json();
 
-        if (response.ok) {
+        if (response.status === 202) {
+          // Chapa has not settled the payment yet; ask again shortly
+          retryTimer = setTimeout(verifyPayment, 3000);
+        } else if (response.ok) {
           setDetails(data);
           setStatus('paid');
         } else {
@@ -40,6 +44,7 @@ const PaymentSuccess = () => {
     };
 
     verifyPayment();
+    return () => clearTimeout(retryTimer);
   }, [location.search]);
 
   const renderContent = () => {
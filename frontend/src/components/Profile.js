@@ -1,6 +1,9 @@
-import React, { useEffect, useState, useCallback } from 'react';
+import React, { useEffect, useState } from 'react';
 import Navbar from './Navbar';
 import BuyTicketModal from './BuyTicketModal';
+import EventPicker from './EventPicker';
+import LoadMoreButton from './LoadMoreButton';
+import { usePagedList } from '../api';
 
 // === 1. CONFIGURE THE ENVIRONMENT BASE VARIABLE AT THE TOP ===
 // Change from import.meta.env.VITE_API_URL to process.env.REACT_APP_API_URL
@@ -8,13 +11,10 @@ const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://127.0.0.1:8000';
 
 const Profile = () => {
   const [user, setUser] = useState(null);
-  const [tickets, setTickets] = useState([]);
-  const [loadingTickets, setLoadingTickets] = useState(true);
-  const [ticketError, setTicketError] = useState('');
   const [showEventPicker, setShowEventPicker] = useState(false);
   const [showBuyModal, setShowBuyModal] = useState(false);
   const [selectedEvent, setSelectedEvent] = useState(null);
-  const [allEvents, setAllEvents] = useState([]);
+  const token = localStorage.getItem('token');
 
   useEffect(() => {
     const storedUser = localStorage.getItem('user');
@@ -23,55 +23,12 @@ const Profile = () => {
     }
   }, []);
 
-  useEffect(() => {
-    const fetchEvents = async () => {
-      try {
-        // === 2. UPDATE THE STATIC FETCH WITH BACKTICKS ===
-        const response = await fetch(`${API_BASE_URL}/api/events/`);
-        if (!response.ok) throw new Error('Failed to fetch events');
-        const data = await response.json();
-        setAllEvents(data);
-      } catch {
-        setAllEvents([]);
-      }
-    };
-    fetchEvents();
-  }, []);
-
-  // Memorize fetchTickets using useCallback
-  const fetchTickets = useCallback(async () => {
-    setLoadingTickets(true);
-    setTicketError('');
-    const token = localStorage.getItem('token');
-    if (!token) {
-      setTickets([]);
-      setLoadingTickets(false);
-      return;
-    }
-    try {
-      // === 3. UPDATE THE TICKETS NETWORK PATH WITH BACKTICKS ===
-      const res = await fetch(`${API_BASE_URL}/api/tickets/`, {
-        headers: { Authorization: `Token ${token}` },
-      });
-      if (!res.ok) throw new Error('Failed to fetch tickets');
-      const data = await res.json();
-      const filtered = Array.isArray(data)
-        ? data.filter(t => t.attendee && t.attendee.id === user?.id)
-        : data;
-      setTickets(filtered);
-    } catch {
-      setTicketError('Could not load tickets.');
-    }
-    setLoadingTickets(false);
-  }, [user?.id]); // Only recreate if user ID changes
-
-  // Safely include fetchTickets in dependencies now
-  useEffect(() => {
-    if (user) fetchTickets();
-  }, [user, fetchTickets]);
+  // The first page of tickets; older ones are loaded on demand
+  const ticketList = usePagedList(user && token ? `${API_BASE_URL}/api/tickets/` : null, token);
+  const tickets = ticketList.items.filter(t => t.attendee && t.attendee.id === user?.id);
 
   const handleBuySuccess = () => {
-    fetchTickets();
+    ticketList.reload();
   };
 
   
@@ -98,7 +55,6 @@ const Profile = () => {
           <button
             className="mt-6 md:mt-0 bg-gradient-to-r from-blue-600 to-blue-400 hover:from-blue-700 hover:to-blue-500 text-white px-6 py-3 rounded-full font-semibold shadow transition"
             onClick={() => setShowEventPicker(true)}
-            disabled={allEvents.length === 0}
           >
             Buy Ticket
           </button>
@@ -108,9 +64,9 @@ const Profile = () => {
       {/* My Tickets Section */}
       <div className="max-w-2xl mx-auto mt-8 p-8 bg-white rounded-2xl shadow-lg">
         <h3 className="text-2xl font-bold mb-4 text-blue-700">My Tickets</h3>
-        {loadingTickets && <div>Loading tickets...</div>}
-        {ticketError && <div className="text-red-500">{ticketError}</div>}
-        {!loadingTickets && tickets.length === 0 && (
+        {ticketList.loading && tickets.length === 0 && <div>Loading tickets...</div>}
+        {ticketList.error && <div className="text-red-500">Could not load tickets.</div>}
+        {!ticketList.loading && !ticketList.error && tickets.length === 0 && (
           <div className="text-gray-500">You have not purchased any tickets yet.</div>
         )}
         <div className="flex flex-row gap-6 overflow-x-auto pb-2">
@@ -134,6 +90,7 @@ const Profile = () => {
             </div>
           ))}
         </div>
+        <LoadMoreButton list={ticketList} label="Load more tickets" className="flex justify-center mt-4" />
       </div>
 
       {/* Event Picker Modal */}
@@ -141,19 +98,14 @@ const Profile = () => {
         <div className="fixed inset-0 bg-black bg-opacity-40 flex justify-center items-center z-50">
           <div className="bg-white p-6 rounded shadow-xl max-w-sm w-full">
             <h3 className="text-xl font-bold mb-4">Select an Event</h3>
-            <select
-              className="w-full mb-4 p-2 border rounded"
-              onChange={(e) => {
-                const selected = allEvents.find(ev => ev.id === parseInt(e.target.value));
-                setSelectedEvent(selected);
-              }}
-              defaultValue=""
-            >
-              <option value="" disabled>Select an event</option>
-              {allEvents.map(ev => (
-                <option key={ev.id} value={ev.id}>{ev.title}</option>
-              ))}
-            </select>
+            <div className="mb-4">
+              <EventPicker
+                token={token}
+                fields="id,title,price"
+                selectedId={selectedEvent?.id}
+                onSelect={setSelectedEvent}
+              />
+            </div>
             <button
               onClick={() => {
                 if (selectedEvent) {
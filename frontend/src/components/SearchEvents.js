@@ -2,94 +2,55 @@ import React, { useState, useEffect, useRef } from 'react';
 import { useLocation } from 'react-router-dom';
 import Navbar from './Navbar';
 import BuyTicketModal from './BuyTicketModal';
+import LoadMoreButton from './LoadMoreButton';
+import { usePagedList, useDebouncedValue } from '../api';
 
 // === 1. DEFINE YOUR UNIFIED ENV FALLBACK AT THE TOP ===
 // Change from import.meta.env.VITE_API_URL to process.env.REACT_APP_API_URL
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://127.0.0.1:8000';
+const EVENTS_URL = `${API_BASE_URL}/api/events/`;
+const SUGGESTION_COUNT = 7;
 
 const SearchEvents = () => {
   const location = useLocation();
   const params = new URLSearchParams(location.search);
   const initialQuery = params.get('q') || '';
   const [query, setQuery] = useState(initialQuery);
-  const [events, setEvents] = useState([]);
-  const [loading, setLoading] = useState(false);
-  const [error, setError] = useState('');
-  const [allEvents, setAllEvents] = useState([]);
+  const [searchTerm, setSearchTerm] = useState(initialQuery);
   const [showDropdown, setShowDropdown] = useState(false);
   const [showBuyModal, setShowBuyModal] = useState(false);
   const [selectedEvent, setSelectedEvent] = useState(null);
   const [successMsg, setSuccessMsg] = useState('');
   const dropdownRef = useRef(null);
 
-  // Fetch all events for suggestions
-  useEffect(() => {
-    const fetchAllEvents = async () => {
-      try {
-        // === 2. UPDATE SUGGESTIONS ENDPOINT WITH BACKTICKS ===
-        const response = await fetch(`${API_BASE_URL}/api/events/`);
-        if (!response.ok) throw new Error('Failed to fetch events');
-        const data = await response.json();
-        setAllEvents(data);
-      } catch (err) {
-        // Ignore error for all events listing
-      }
-    };
-    fetchAllEvents();
-  }, []);
+  // === 2. UPDATE SUGGESTIONS ENDPOINT WITH BACKTICKS ===
+  // Suggestions come from the API as the user types, with only what they show
+  const suggestionQuery = useDebouncedValue(query.trim());
+  const suggestionList = usePagedList(suggestionQuery ? `${EVENTS_URL}?${new URLSearchParams({
+    search: suggestionQuery, fields: 'id,title,category,location,price', page_size: SUGGESTION_COUNT,
+  })}` : null);
+  const suggestions = suggestionList.items;
 
   useEffect(() => {
-    const fetchEvents = async () => {
-      setLoading(true);
-      setError('');
-      try {
-        // === 3. UPDATE QUERY INGESTION LINK WITH BACKTICKS ===
-        let url = `${API_BASE_URL}/api/events/`;
-        if (initialQuery) {
-          url += `?search=${encodeURIComponent(initialQuery)}`;
-        }
-        const response = await fetch(url);
-        if (!response.ok) throw new Error('Failed to fetch events');
-        const data = await response.json();
-        setEvents(data);
-      } catch (err) {
-        setError('Error fetching events.');
-      }
-      setLoading(false);
-    };
-
-    fetchEvents();
-    // eslint-disable-next-line
+    setSearchTerm(initialQuery);
   }, [initialQuery]);
 
-  const handleSearch = async (e, customQuery) => {
+  // === 3. UPDATE QUERY INGESTION LINK WITH BACKTICKS ===
+  // The first page of results; more are loaded on demand
+  const eventList = usePagedList(
+    searchTerm ? `${EVENTS_URL}?search=${encodeURIComponent(searchTerm)}` : EVENTS_URL
+  );
+  const events = eventList.items;
+  const loading = eventList.loading && events.length === 0;
+  const error = eventList.error ? 'Error fetching events.' : '';
+
+  const handleSearch = (e, customQuery) => {
     if (e) e.preventDefault();
-    setLoading(true);
-    setError('');
-    try {
-      const q = customQuery !== undefined ? customQuery : query;
-      // === 4. UPDATE EVENT SEARCH DISPATCH WITH BACKTICKS ===
-      const response = await fetch(
-        `${API_BASE_URL}/api/events/?search=${encodeURIComponent(q)}`
-      );
-      if (!response.ok) throw new Error('Failed to fetch events');
-      const data = await response.json();
-      setEvents(data);
-    } catch (err) {
-      setError('Error fetching events.');
-    }
-    setLoading(false);
+    // === 4. UPDATE EVENT SEARCH DISPATCH WITH BACKTICKS ===
+    setSearchTerm(customQuery !== undefined ? customQuery : query);
     setShowDropdown(false);
   };
 
-  // Filter suggestions based on query
-  const suggestions = allEvents.filter(
-    (event) =>
-      event.title.toLowerCase().includes(query.toLowerCase()) ||
-      (event.category && event.category.toLowerCase().includes(query.toLowerCase())) ||
-      (event.location && event.location.toLowerCase().includes(query.toLowerCase()))
-  ).slice(0, 7); // Limit to 7 suggestions
-
   // Hide dropdown when clicking outside
   useEffect(() => {
     const handleClickOutside = (event) => {
@@ -209,6 +170,7 @@ const SearchEvents = () => {
             </div>
           ))}
         </div>
+        <LoadMoreButton list={eventList} label="Load more events" />
       </div>
       {showBuyModal && selectedEvent && (
         <BuyTicketModal